@@ -0,0 +1,143 @@
+"""
+Compare rebuilding abstracts one by one (`utils.parse_inverted_abstract`) with the batch versions: the flattened
+array scatter of `utils.parse_inverted_abstracts`, and `frames.abstracts` on both shapes of polars column.
+
+    uv run python -m benchmarks.bench_abstracts --rows 100000
+
+The inverted indexes are synthetic, with lengths and a Zipf-like word frequency close to those of real abstracts.
+The list column has the shape of a map column read from parquet. The struct column polars infers from the dicts
+has a field per distinct word of the whole column, which makes it slow to build and to read; it is measured on
+the first `--struct-rows` rows only.
+"""
+
+import argparse
+import io
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+
+import msgspec
+import polars as pl
+
+from aletheca import frames, utils
+
+VOCABULARY = 50_000
+
+
+def make_indexes(rows: int, seed: int = 0) -> list[dict[str, list[int]] | None]:
+    rng = random.Random(seed)
+    vocabulary = [f"word{n}" for n in range(VOCABULARY)]
+    weights = [1 / (n + 1) for n in range(VOCABULARY)]
+    indexes: list[dict[str, list[int]] | None] = []
+    for _ in range(rows):
+        # about a third of the works have no abstract
+        if rng.random() < 0.3:
+            indexes.append(None)
+            continue
+        index: dict[str, list[int]] = {}
+        length = int(rng.lognormvariate(5.2, 0.4))
+        for position, word in enumerate(rng.choices(vocabulary, weights, k=length)):
+            index.setdefault(word, []).append(position)
+        indexes.append(index)
+    return indexes
+
+
+def list_column(indexes: list[dict[str, list[int]] | None]) -> pl.Series:
+    """The indexes as a list of (word, positions) per row, see `frames.INVERTED_INDEX_DTYPE`."""
+    tokens = pl.DataFrame(
+        [
+            (row, word, position)
+            for row, index in enumerate(indexes)
+            for word, positions in (index or {}).items()
+            for position in positions
+        ],
+        schema={"row": pl.UInt32, "word": pl.String, "position": pl.Int64},
+        orient="row",
+    )
+    entries = (
+        tokens.group_by("row", "word", maintain_order=True)
+        .agg(positions="position")
+        .group_by("row", maintain_order=True)
+        .agg(abstract_inverted_index=pl.struct("word", "positions"))
+    )
+    return (
+        pl.DataFrame({"row": pl.int_range(len(indexes), dtype=pl.UInt32, eager=True)})
+        .join(entries, on="row", how="left", maintain_order="left")
+        .get_column("abstract_inverted_index")
+    )
+
+
+def best_of(repeat: int, function: Callable[[], Any]) -> tuple[float, Any]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--struct-rows", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    indexes = make_indexes(args.rows)
+    inverted = list_column(indexes)
+    # the struct column as polars reads it from raw works, with every word in the schema
+    struct_indexes = indexes[: args.struct_rows]
+    struct = pl.read_json(
+        io.BytesIO(
+            msgspec.json.encode(
+                [{"abstract_inverted_index": index} for index in struct_indexes]
+            )
+        ),
+        infer_schema_length=None,
+    )["abstract_inverted_index"]
+
+    words = sum(len(index) for index in indexes if index)
+    print(f"{args.rows:,} works, {words:,} (work, word) entries, best of {args.repeat}")
+    print(f"{'method':<40}{'rows':>10}{'time':>10}{'speedup':>10}")
+
+    def report(name: str, rows: int, seconds: float, scalar: float) -> None:
+        print(f"{name:<40}{rows:>10,}{seconds:>9.3f}s{scalar / seconds:>9.1f}x")
+
+    scalar_time, expected = best_of(
+        args.repeat, lambda: list(map(utils.parse_inverted_abstract, indexes))
+    )
+    cases: list[tuple[str, Callable[[], Any]]] = [
+        (
+            "utils.parse_inverted_abstracts",
+            lambda: utils.parse_inverted_abstracts(indexes),
+        ),
+        (
+            "frames.abstracts (list column)",
+            lambda: frames.abstracts(inverted).to_list(),
+        ),
+    ]
+    report("utils.parse_inverted_abstract", args.rows, scalar_time, scalar_time)
+    for name, function in cases:
+        seconds, result = best_of(args.repeat, function)
+        if result != expected:
+            raise AssertionError(f"{name}: results differ from the scalar function")
+        report(name, args.rows, seconds, scalar_time)
+
+    # the struct column against the scalar function on the same rows
+    scalar_time, expected = best_of(
+        args.repeat, lambda: list(map(utils.parse_inverted_abstract, struct_indexes))
+    )
+    seconds, result = best_of(args.repeat, lambda: frames.abstracts(struct).to_list())
+    if result != expected:
+        raise AssertionError("struct column: results differ from the scalar function")
+    report(
+        f"frames.abstracts ({len(struct.dtype.fields):,} field struct)",
+        len(struct_indexes),
+        seconds,
+        scalar_time,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Benchmark client throughput and resilience against the local mock API (see `tests/support/mock_server.py`),
+without network.
+
+Each scenario runs a client workload against the same in-process `MockOpenAlex`, with its own latency and faults:
+sequential and prefetching pagination, a sharded crawl on the async client, many concurrent counts, and
+pagination while the server fails and throttles requests. For every scenario this reports the wall time, the
+request and entity throughput, the p50/p95 request time (from `metrics.MetricsCollector`), the retries and
+the responses per status, and whether every expected result was received.
+
+    uv run python -m benchmarks.bench_client --results 5000 --latency 0.05 --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from aletheca import crawl
+from aletheca.api import AsyncClient, Client
+from aletheca.config import BaseAlethecaConfig
+from aletheca.endpoints import WORKS
+from aletheca.metrics import MetricsCollector
+from tests.support.mock_server import Faults, MockOpenAlex
+
+
+@dataclass(slots=True, kw_only=True)
+class Scenario:
+    name: str
+    # runs the workload with a client config and a metrics hook, and returns the number of results
+    # (or of answered counts)
+    run: Callable[[BaseAlethecaConfig, MetricsCollector], int]
+    expected: int
+    faults: Faults
+
+
+def _paginate(prefetch: bool) -> Callable[[BaseAlethecaConfig, MetricsCollector], int]:
+    def run(config: BaseAlethecaConfig, metrics: MetricsCollector) -> int:
+        with Client(config, hooks=[metrics]) as client:
+            return sum(1 for _ in client.iterate(WORKS.query(), prefetch=prefetch))
+
+    return run
+
+
+def _crawl(config: BaseAlethecaConfig, metrics: MetricsCollector) -> int:
+    async def run() -> int:
+        async with AsyncClient(config, hooks=[metrics]) as client:
+            return sum([1 async for _ in crawl.crawl(client, WORKS.query(), streams=8)])
+
+    return asyncio.run(run())
+
+
+def _counts(config: BaseAlethecaConfig, metrics: MetricsCollector) -> int:
+    async def run() -> int:
+        async with AsyncClient(config, hooks=[metrics]) as client:
+            queries = [
+                WORKS.query(publication_year=year, type=work_type)
+                for year in range(1950, 2026)
+                for work_type in ("article", "preprint")
+            ]
+            return len(await client.count_many(queries))
+
+    return asyncio.run(run())
+
+
+def scenarios(args: argparse.Namespace) -> list[Scenario]:
+    latency = Faults(latency=args.latency, jitter=args.latency / 2)
+    faulty = Faults(
+        latency=args.latency,
+        jitter=args.latency / 2,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=0.1,
+    )
+    return [
+        Scenario(
+            name="paginate", run=_paginate(False), expected=args.results, faults=latency
+        ),
+        Scenario(
+            name="paginate_prefetch",
+            run=_paginate(True),
+            expected=args.results,
+            faults=latency,
+        ),
+        Scenario(name="crawl", run=_crawl, expected=args.results, faults=latency),
+        # articles and preprints of every year in the mock data, see `mock_server._vary`
+        Scenario(name="count_many", run=_counts, expected=76 * 2, faults=latency),
+        Scenario(
+            name="paginate_faults",
+            run=_paginate(True),
+            expected=args.results,
+            faults=faulty,
+        ),
+    ]
+
+
+def measure(
+    server: MockOpenAlex, scenario: Scenario, config: BaseAlethecaConfig
+) -> dict[str, Any]:
+    server.faults = scenario.faults
+    before = Counter(server.stats)
+    metrics = MetricsCollector()
+    start = time.perf_counter()
+    received = scenario.run(config, metrics)
+    seconds = time.perf_counter() - start
+    statuses = Counter(server.stats)
+    statuses.subtract(before)
+    totals = metrics.summary().get("total_seconds", {})
+    return {
+        "scenario": scenario.name,
+        "faults": asdict(scenario.faults),
+        "seconds": seconds,
+        "requests": metrics.totals["requests"],
+        "requests_per_s": metrics.totals["requests"] / seconds,
+        "results": received,
+        "results_per_s": received / seconds,
+        "complete": received == scenario.expected,
+        "retries": metrics.totals["retries"],
+        "statuses": {str(status): n for status, n in sorted(statuses.items()) if n},
+        "p50_request_seconds": totals.get("p50"),
+        "p95_request_seconds": totals.get("p95"),
+        "breakdown": metrics.breakdown(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--results", type=int, default=5000, help="works served")
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="seconds per request"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--throttle-rate", type=float, default=0.05)
+    parser.add_argument(
+        "--rate-limit", type=int, default=100, help="client requests per second"
+    )
+    parser.add_argument("--scenario", action="append")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    args = parser.parse_args()
+
+    rows = []
+    print(
+        f"{'scenario':<20}{'seconds':>9}{'req/s':>9}{'results/s':>11}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'retries':>9}  complete"
+    )
+    with MockOpenAlex(results=args.results) as server:
+        config = BaseAlethecaConfig(
+            api_base_url=server.url,
+            rate_limit=args.rate_limit,
+            backoff_factor=0.05,
+            max_retries=8,
+        )
+        for scenario in scenarios(args):
+            if args.scenario and scenario.name not in args.scenario:
+                continue
+            row = measure(server, scenario, config)
+            rows.append(row)
+            print(
+                f"{row['scenario']:<20}{row['seconds']:>9.2f}{row['requests_per_s']:>9.1f}"
+                f"{row['results_per_s']:>11,.0f}"
+                f"{(row['p50_request_seconds'] or 0) * 1000:>9.1f}"
+                f"{(row['p95_request_seconds'] or 0) * 1000:>9.1f}"
+                f"{row['retries']:>9}  {row['complete']}"
+            )
+
+    if args.output:
+        report = {
+            "created": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "arguments": {k: v for k, v in vars(args).items() if k != "output"},
+            "benchmarks": rows,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
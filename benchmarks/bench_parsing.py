@@ -0,0 +1,188 @@
+"""
+Benchmark the parse backends on response pages, one per entity type, built from the recorded pages in
+`tests/fixtures/pages` (see `tests/support/pages.py`).
+
+For every entity type and backend, this measures the parse throughput (entities/s, best of `--repeat`), the
+peak and retained memory of parsing one page (Python allocations, traced with `tracemalloc`; memory held by
+polars is not included), and the number of memory blocks that the parsed page keeps alive. Every backend
+starts from the raw response body, as returned by `httpx.Response.content`.
+
+All entity types are measured at the same page size: fixture pages are filled up to `--results` results with
+varied copies of the recorded ones, with their own ids and nested ids, null optional fields and list sizes.
+Pages recorded with `--record` hold `--results` real results, and are used as they are; the number of recorded
+results per entity type is part of the output, so runs on synthetic and on real pages are told apart. Results are printed as a table, and written as JSON with
+`--output`, to compare across releases. Run from the root of the repository:
+
+    uv run python -m benchmarks.bench_parsing --output results.json
+    uv run python -m benchmarks.bench_parsing --record  # refresh the fixtures from the live API
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import UTC, datetime
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+import dacite
+
+from aletheca import frames
+from aletheca.api import Client
+from aletheca.endpoints import ENDPOINTS
+from aletheca.entities import Meta, Response, default_dacite_config
+from aletheca.identity import IdentityMap
+from tests.support.pages import ENTITY_TYPES, FIXTURES, load_page, recorded_page
+
+
+def _dacite(body: bytes, result_type: type) -> Any:
+    # the original parser, before the generated builders
+    data = json.loads(body)
+    return Response(
+        meta=dacite.from_dict(Meta, data["meta"], config=default_dacite_config),
+        results=[
+            dacite.from_dict(result_type, result, config=default_dacite_config)
+            for result in data["results"]
+        ],
+    )
+
+
+def _with_identity_map(body: bytes, result_type: type) -> Any:
+    with IdentityMap().active():
+        return Response.from_dict(json.loads(body), result_type)
+
+
+BACKENDS: dict[str, Callable[[bytes, type], Any]] = {
+    "dacite": _dacite,
+    "from_dict": lambda body, tp: Response.from_dict(json.loads(body), tp),
+    "from_dict_lazy": lambda body, tp: Response.from_dict(
+        json.loads(body), tp, lazy=True
+    ),
+    "from_dict_identity_map": _with_identity_map,
+    "from_json": lambda body, tp: Response.from_json(body, tp),
+    "polars": lambda body, tp: frames.frame_from_json(body, tp),
+}
+
+
+def measure(
+    backend: Callable[[bytes, type], Any], body: bytes, result_type: type, repeat: int
+) -> dict[str, float]:
+    # warm up: generated builders, decoders and schemas are cached on first use
+    backend(body, result_type)
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        backend(body, result_type)
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    parsed = backend(body, result_type)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    retained_blocks = sys.getallocatedblocks() - blocks
+    del parsed
+    return {
+        "seconds": best,
+        "peak_bytes": peak,
+        "retained_bytes": retained,
+        "retained_blocks": retained_blocks,
+    }
+
+
+def _version() -> str | None:
+    try:
+        return version("aletheca")
+    except PackageNotFoundError:
+        return None
+
+
+def record(results: int, seed: int) -> None:
+    """Replace the fixtures by seeded random samples from the live API."""
+    with Client() as client:
+        for entity_type in ENTITY_TYPES:
+            params = {
+                "sample": str(results),
+                "seed": str(seed),
+                "per-page": str(results),
+            }
+            response = client.request(f"/{entity_type}", params)
+            (FIXTURES / f"{entity_type}.json").write_bytes(response.content)
+            print(f"recorded {entity_type}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--results", type=int, default=200, help="results per page")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--entity", action="append", choices=ENTITY_TYPES)
+    parser.add_argument("--backend", action="append", choices=list(BACKENDS))
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument(
+        "--record", action="store_true", help="refresh the fixtures from the API"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="sample seed for --record")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.results, args.seed)
+        return
+
+    recorded = {
+        entity_type: len(recorded_page(entity_type)["results"])
+        for entity_type in args.entity or ENTITY_TYPES
+    }
+    if any(count < args.results for count in recorded.values()):
+        print(
+            f"pages filled with varied copies of {sum(recorded.values())} recorded "
+            "results (see tests/support/pages.py)"
+        )
+    rows = []
+    print(
+        f"{'entity':<14}{'backend':<24}{'entities/s':>12}{'peak KiB':>11}"
+        f"{'kept KiB':>11}{'blocks/entity':>15}"
+    )
+    for entity_type in args.entity or ENTITY_TYPES:
+        body = load_page(entity_type, args.results)
+        result_type = ENDPOINTS[entity_type].entity
+        for name in args.backend or BACKENDS:
+            stats = measure(BACKENDS[name], body, result_type, args.repeat)
+            row = {
+                "entity": entity_type,
+                "backend": name,
+                "results": args.results,
+                "entities_per_s": args.results / stats["seconds"],
+                **stats,
+            }
+            rows.append(row)
+            print(
+                f"{entity_type:<14}{name:<24}{row['entities_per_s']:>12,.0f}"
+                f"{stats['peak_bytes'] / 1024:>11,.0f}"
+                f"{stats['retained_bytes'] / 1024:>11,.0f}"
+                f"{stats['retained_blocks'] / args.results:>15,.1f}"
+            )
+
+    if args.output:
+        report = {
+            "created": datetime.now(UTC).isoformat(timespec="seconds"),
+            "aletheca": _version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results_per_page": args.results,
+            "recorded_results": recorded,
+            "repeat": args.repeat,
+            "benchmarks": rows,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,7 @@
 """
 Docstring for aletheca
 """
+
+from aletheca.lazy import Authors, Institutions, Sources, Works
+
+__all__ = ["Authors", "Institutions", "Sources", "Works"]
@@ -3,3 +3,1170 @@ aletheca.api
 
 contains classes and methods to directly interact with the OpenAlex API, define request/response models, parameter handling, pagination, error management, etc
 """
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime
+from typing import Generic, Self, TypeVar
+from urllib.parse import quote
+
+import httpx
+import polars as pl
+
+from aletheca import frames, parsing, utils
+from aletheca.cache import ResponseCache, is_cacheable
+from aletheca.config import BaseAlethecaConfig
+from aletheca.endpoints import MAX_OR_VALUES, Endpoint, GroupBy, Query
+from aletheca.entities import BaseOpenAlex, Group, GroupedResponse, Meta, Response
+from aletheca.identity import IdentityMap
+from aletheca.metrics import RequestHook, RequestMetrics, Trace
+
+T = TypeVar("T", bound=BaseOpenAlex)
+
+# ----------------------------------------------------------------------------------------------------------------
+# Rate limiting
+# ----------------------------------------------------------------------------------------------------------------
+
+
+class RateLimiter:
+    """
+    Token bucket that spaces out requests to `rate` per second, shared by every request of a client
+    (and by several clients, threads or event loops if the same instance is passed to them).
+
+    Each call to `reserve` takes a token. When the bucket is empty, tokens are handed out in advance and the
+    caller is told how long to wait for its slot, so concurrent callers queue up at exactly the configured rate
+    instead of all retrying at once. `burst` tokens can be used back-to-back after an idle period.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, and return the number of seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._refill()
+            self._tokens -= 1
+            # while paused, `_updated` is the moment the bucket starts refilling again
+            paused = max(0.0, self._updated - now)
+            return paused + (0.0 if self._tokens >= 0 else -self._tokens / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hand out no tokens for `seconds` (e.g. for a `Retry-After` header): callers that reserve a token
+        in the meantime wait for the pause to end, and then resume one by one at the normal rate.
+        """
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = self._refill()
+            self._tokens = min(self._tokens, 1.0)
+            self._updated = max(self._updated, now + seconds)
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        if now > self._updated:
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+        return now
+
+    def acquire(self) -> None:
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+# ----------------------------------------------------------------------------------------------------------------
+# Retries
+# ----------------------------------------------------------------------------------------------------------------
+
+# responses worth retrying: rate limited, or a (probably) temporary server error
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class Backoff:
+    """
+    Delays between the retries of a single request, with "decorrelated jitter": each delay is drawn
+    uniformly between `base` and three times the previous delay, capped at `cap`. Retries of concurrent
+    requests spread out instead of hitting the API again in lockstep.
+    """
+
+    def __init__(self, retries: int, base: float, cap: float):
+        self.retries = retries
+        self.base = base
+        self.cap = cap
+        self._delay = base
+
+    def next(self) -> float | None:
+        """Return the delay before the next retry, or None if no retries are left."""
+        if self.retries <= 0:
+            return None
+        self.retries -= 1
+        self._delay = min(self.cap, random.uniform(self.base, self._delay * 3))
+        return self._delay
+
+
+def retry_after(response: httpx.Response) -> float | None:
+    """Return the number of seconds from the `Retry-After` header of a response (in seconds or as a date)."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (moment - datetime.now(moment.tzinfo or UTC)).total_seconds())
+
+
+class CircuitBreaker:
+    """
+    Keeps track of the outcome of the last `window` requests of the clients that share it. When at least
+    `threshold` of them failed (errors that are retried, see `RETRY_STATUSES`), the circuit opens for
+    `cooldown` seconds: the clients pause their rate limiter, so all their workers stop sending requests.
+
+    After the cooldown, the outcome of the next request decides: a success closes the circuit, a failure
+    opens it again, for twice as long (up to `max_cooldown`).
+    """
+
+    def __init__(
+        self,
+        *,
+        window: int = 20,
+        threshold: float = 0.5,
+        cooldown: float = 10.0,
+        max_cooldown: float = 300.0,
+    ):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._open_until: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._open_until is not None and time.monotonic() < self._open_until
+
+    def record(self, success: bool) -> float:
+        """Record the outcome of a request; return the cooldown if this opened the circuit, else 0."""
+        with self._lock:
+            now = time.monotonic()
+            if self._open_until is not None:
+                if now < self._open_until:
+                    # requests that were sent before the circuit opened
+                    return 0.0
+                if success:
+                    self._open_until = None
+                    self.cooldown = self.base_cooldown
+                    return 0.0
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._open_until = now + self.cooldown
+                return self.cooldown
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(
+                self._outcomes
+            ) == self._outcomes.maxlen and failures >= self.threshold * len(
+                self._outcomes
+            ):
+                self._outcomes.clear()
+                self._open_until = now + self.cooldown
+                return self.cooldown
+            return 0.0
+
+
+# ----------------------------------------------------------------------------------------------------------------
+# Batched id lookups
+# ----------------------------------------------------------------------------------------------------------------
+
+# filter to use for each type of id in `get_many`; not every endpoint supports every filter
+LOOKUP_FILTERS: dict[utils.IdType, str] = {
+    "openalex": "openalex",
+    "doi": "doi",
+    "orcid": "orcid",
+    "ror": "ror",
+    "issn": "issn",
+    "pmid": "ids.pmid",
+    "pmcid": "ids.pmcid",
+    "mag": "ids.mag",
+}
+
+# budget for the (url-encoded) ids in a single lookup request, well below common url length limits
+MAX_LOOKUP_URL_LENGTH = 4000
+
+_Key = tuple[utils.IdType, str]
+
+
+@dataclass(slots=True)
+class Lookup(Generic[T]):
+    """Results of `get_many`, in the order of the requested ids."""
+
+    ids: list[str]
+    # the entity for each id, or None if it wasn't found or is invalid
+    results: list[T | None]
+    # ids that are valid, but did not match any entity
+    missing: list[str] = field(default_factory=list)
+    # ids of an unknown type, or of a type that can't be looked up in bulk
+    invalid: list[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class _LookupBatch:
+    id_type: utils.IdType
+    short_ids: list[str]
+    query: Query
+
+    def next_cursor(
+        self, page: Response, received: int, found: dict[_Key, BaseOpenAlex]
+    ) -> str | None:
+        """
+        Return the cursor of the next page of this batch, or None when there is nothing left to look up: all
+        `meta.count` results are in, or every id of the batch was found. A batch matches more results than fit
+        in a page if its ids match several entities each, like a doi shared by works.
+        """
+        if received >= page.meta.count or not page.results:
+            return None
+        if all((self.id_type, short) in found for short in self.short_ids):
+            return None
+        return page.meta.next_cursor
+
+
+@dataclass(slots=True)
+class _LookupPlan:
+    keys: list[_Key | None]
+    batches: list[_LookupBatch]
+    # ids with characters that can't be used in an OR-filter (`|`, `,`), fetched one by one
+    singles: list[_Key]
+
+
+def _entity_keys(entity: BaseOpenAlex, id_type: utils.IdType) -> Iterator[str]:
+    """Yield the short ids of type `id_type` of an entity, to match it with the requested ids."""
+    if id_type == "openalex":
+        values = [entity.id]
+    else:
+        values = [
+            getattr(entity, id_type, None),
+            getattr(getattr(entity, "ids", None), id_type, None),
+        ]
+    for value in values:
+        for item in value if isinstance(value, list) else [value]:
+            if item is None:
+                continue
+            try:
+                yield utils.short_id(str(item), id_type)
+            except ValueError:
+                continue
+
+
+def _plan_lookup(endpoint: Endpoint, ids: list[str], per_page: int) -> _LookupPlan:
+    keys: list[_Key | None] = []
+    grouped: dict[utils.IdType, dict[str, None]] = {}
+    singles: dict[_Key, None] = {}
+    for id_str in ids:
+        try:
+            id_type = utils.determine_id_type(id_str)
+        except ValueError:
+            keys.append(None)
+            continue
+        if id_type not in LOOKUP_FILTERS:
+            keys.append(None)
+            continue
+        key = (id_type, utils.short_id(id_str, id_type))
+        keys.append(key)
+        if "|" in key[1] or "," in key[1]:
+            singles[key] = None
+        else:
+            grouped.setdefault(id_type, {})[key[1]] = None
+
+    batches: list[_LookupBatch] = []
+    limit = min(MAX_OR_VALUES, per_page)
+    for id_type, short_ids in grouped.items():
+        batch: list[str] = []
+        length = 0
+        for short in short_ids:
+            encoded = len(quote(short, safe="")) + 3  # plus the encoded `|`
+            if batch and (
+                len(batch) == limit or length + encoded > MAX_LOOKUP_URL_LENGTH
+            ):
+                batches.append(_lookup_batch(endpoint, id_type, batch))
+                batch, length = [], 0
+            batch.append(short)
+            length += encoded
+        if batch:
+            batches.append(_lookup_batch(endpoint, id_type, batch))
+    return _LookupPlan(keys, batches, list(singles))
+
+
+def _lookup_batch(
+    endpoint: Endpoint, id_type: utils.IdType, batch: list[str]
+) -> _LookupBatch:
+    # some ids (like a doi) can match more than one entity, so ask for full pages
+    query = endpoint.query(**{LOOKUP_FILTERS[id_type]: batch})
+    return _LookupBatch(id_type, batch, query)
+
+
+def _finish_lookup(
+    ids: list[str], plan: _LookupPlan, found: dict[_Key, BaseOpenAlex]
+) -> Lookup:
+    results = [found.get(key) if key is not None else None for key in plan.keys]
+    return Lookup(
+        ids=ids,
+        results=results,
+        missing=[
+            id_str
+            for id_str, key, result in zip(ids, plan.keys, results, strict=True)
+            if key is not None and result is None
+        ],
+        invalid=[
+            id_str for id_str, key in zip(ids, plan.keys, strict=True) if key is None
+        ],
+    )
+
+
+def _collect(
+    found: dict[_Key, BaseOpenAlex], id_type: utils.IdType, page: Response
+) -> None:
+    for result in page.results:
+        if result is not None:
+            for short in _entity_keys(result, id_type):
+                found.setdefault((id_type, short), result)
+
+
+# ----------------------------------------------------------------------------------------------------------------
+# Counts
+# ----------------------------------------------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class _Counted:
+    # only the metadata of a count request is decoded, the single result is skipped
+    meta: Meta
+
+
+_CountKey = tuple[str, tuple[tuple[str, str], ...]]
+
+# ----------------------------------------------------------------------------------------------------------------
+# Clients
+# ----------------------------------------------------------------------------------------------------------------
+
+
+class BaseClient:
+    """
+    Logic shared by the sync and async clients: settings, request parameters, retries, caching and parsing
+    responses.
+
+    Failed requests (see `RETRY_STATUSES`, and connection errors) are retried up to `BaseAlethecaConfig.max_retries`
+    times. Every attempt takes a token from the rate limiter, so retries use the same budget as new requests.
+    A `Retry-After` header pauses the rate limiter, and with it all requests that share it; otherwise the retry
+    waits a jittered backoff delay (see `Backoff`). The `CircuitBreaker` pauses the rate limiter as well, when
+    too many recent requests failed.
+
+    Responses are cached on disk if a `cache` is passed, or if `BaseAlethecaConfig.cache_path` is set.
+    Parsed entities are shared by id if an `IdentityMap` is passed, or if `BaseAlethecaConfig.identity_map_size` is set.
+    Entities fetched with `get` are then served from the map until the cache TTL of their endpoint expires
+    (`BaseAlethecaConfig.cache_ttl`, also without a cache).
+    Result counts (see `Client.count`) are kept in memory for the lifetime of the client.
+
+    Every request (including cache hits and failed requests) is reported to the `hooks` as a
+    `metrics.RequestMetrics`, with the time spent in the rate limiter, the network, the API's database and
+    parsing; see `metrics.MetricsCollector`.
+    """
+
+    def __init__(
+        self,
+        config: BaseAlethecaConfig | None = None,
+        *,
+        rate_limiter: RateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        cache: ResponseCache | None = None,
+        identity_map: IdentityMap | None = None,
+        hooks: Iterable[RequestHook] = (),
+    ):
+        self.config = config or BaseAlethecaConfig()
+        self.rate_limiter = rate_limiter or RateLimiter(self.config.rate_limit)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            window=self.config.breaker_window,
+            threshold=self.config.breaker_threshold,
+            cooldown=self.config.breaker_cooldown,
+        )
+        self._owns_cache = cache is None
+        self.cache = cache or ResponseCache.from_config(self.config)
+        if identity_map is None and self.config.identity_map_size:
+            identity_map = IdentityMap(self.config.identity_map_size)
+        self.identity_map = identity_map
+        self.hooks = list(hooks)
+        self._counts: dict[_CountKey, int] = {}
+        # when the entities in the identity map were fetched with `get`, oldest first
+        self._fetched: dict[tuple[type, str], float] = {}
+
+    def _http_settings(self) -> dict:
+        return {
+            "base_url": self.config.api_base_url,
+            "timeout": self.config.default_timeout,
+            "headers": {"User-Agent": self.config.user_agent},
+        }
+
+    def _request_params(self, params: Mapping[str, str] | None) -> dict[str, str]:
+        params = dict(params or {})
+        if self.config.email:
+            params.setdefault("mailto", self.config.email)
+        return params
+
+    def _backoff(self) -> Backoff:
+        return Backoff(
+            self.config.max_retries, self.config.backoff_factor, self.config.max_backoff
+        )
+
+    def _retry_delay(
+        self, response: httpx.Response | None, backoff: Backoff
+    ) -> float | None:
+        """
+        Record the outcome of an attempt (`response` is None after a connection error), and return the
+        number of seconds to sleep before retrying it, or None if it should not be retried.
+        """
+        failed = response is None or response.status_code in RETRY_STATUSES
+        if cooldown := self.circuit_breaker.record(not failed):
+            self.rate_limiter.pause(cooldown)
+        if not failed:
+            return None
+        wait = retry_after(response) if response is not None else None
+        if wait is None:
+            return backoff.next()
+        if wait > self.config.max_backoff or backoff.next() is None:
+            return None
+        if self.rate_limiter.rate <= 0:
+            # no rate limit to pause: only this request waits
+            return wait
+        # the retry (like every other request) waits for its token in the paused rate limiter
+        self.rate_limiter.pause(wait)
+        return 0.0
+
+    def _cached(self, path: str, params: Mapping[str, str]) -> httpx.Response | None:
+        if self.cache is None or not is_cacheable(params):
+            return None
+        body = self.cache.get(path, params)
+        if body is None:
+            return None
+        return httpx.Response(
+            200,
+            content=body,
+            headers={"Content-Type": "application/json", "X-Aletheca-Cache": "hit"},
+            request=httpx.Request(
+                "GET", f"{self.config.api_base_url}{path}", params=params
+            ),
+        )
+
+    def _store(
+        self, path: str, params: Mapping[str, str], response: httpx.Response
+    ) -> None:
+        if self.cache is not None and is_cacheable(params):
+            self.cache.set(path, params, response.content)
+
+    def _received(self, metrics: RequestMetrics, response: httpx.Response) -> None:
+        metrics.status = response.status_code
+        metrics.content_bytes = len(response.content)
+
+    def _emit(self, metrics: RequestMetrics, started: float) -> None:
+        metrics.total_seconds = time.perf_counter() - started
+        for hook in self.hooks:
+            hook(metrics)
+
+    def _close_cache(self) -> None:
+        if self.cache is not None and self._owns_cache:
+            self.cache.close()
+
+    def page_params(
+        self, query: Query, cursor: str | None, page: int | None
+    ) -> dict[str, str]:
+        """Return the query string parameters to request a page of `query`."""
+        params = query.params()
+        params.setdefault("per-page", str(self.config.per_page))
+        if cursor is not None:
+            params["cursor"] = cursor
+        if page is not None:
+            params["page"] = str(page)
+        return params
+
+    def group_params(self, group: GroupBy, cursor: str | None) -> dict[str, str]:
+        """Return the query string parameters to request a page of groups of `group`."""
+        params = group.params()
+        params.setdefault("per-page", str(self.config.per_page))
+        if cursor is not None:
+            params["cursor"] = cursor
+        return params
+
+    def count_params(self, query: Query) -> dict[str, str]:
+        """Return the query string parameters to request the count of `query`, with the smallest possible page."""
+        params = replace(query, sort=None, select=None, per_page=None).params()
+        params.update({"per-page": "1", "select": "id"})
+        return params
+
+    def _known_count(
+        self, query: Query, refresh: bool
+    ) -> tuple[_CountKey, dict[str, str], int | None]:
+        params = self._request_params(self.count_params(query))
+        key = (query.endpoint.path, tuple(sorted(params.items())))
+        return key, params, None if refresh else self._counts.get(key)
+
+    def parse_count(
+        self, response: httpx.Response, metrics: RequestMetrics | None = None
+    ) -> int:
+        """Parse the count of a count request; the parse and server times are recorded in `metrics`, if passed."""
+        started = time.perf_counter()
+        meta = parsing.from_json(_Counted, response.content).meta
+        if metrics is not None:
+            _record_parse(metrics, started, None)
+            metrics.server_seconds = meta.db_response_time_ms / 1000
+        return meta.count
+
+    def parse_page(
+        self,
+        response: httpx.Response,
+        entity: type[T],
+        metrics: RequestMetrics | None = None,
+    ) -> Response[T]:
+        """Parse a page of results; the decode, parse and server times are recorded in `metrics`, if passed."""
+        started = time.perf_counter()
+        if self.config.strict_parsing:
+            data = response.json()
+            decoded = time.perf_counter()
+            if self.identity_map is None:
+                page = Response.from_dict(data, entity)
+            else:
+                with self.identity_map.active():
+                    page = Response.from_dict(data, entity)
+        else:
+            decoded = None
+            page = Response.from_json(response.content, entity)
+            if self.identity_map is not None:
+                self.identity_map.dedupe(page.results)
+        if metrics is not None:
+            _record_parse(metrics, started, decoded)
+            metrics.server_seconds = page.meta.db_response_time_ms / 1000
+        return page
+
+    def parse_entity(
+        self,
+        response: httpx.Response,
+        entity: type[T],
+        metrics: RequestMetrics | None = None,
+    ) -> T:
+        """Parse a single entity; the decode and parse times are recorded in `metrics`, if passed."""
+        started = time.perf_counter()
+        if self.config.strict_parsing:
+            data = response.json()
+            decoded = time.perf_counter()
+            if self.identity_map is None:
+                result = entity.from_dict(data)
+            else:
+                with self.identity_map.active():
+                    result = self.identity_map.put(entity.from_dict(data), replace=True)
+        else:
+            decoded = None
+            result = entity.from_json(response.content)
+            if self.identity_map is not None:
+                result = self.identity_map.put(
+                    self.identity_map.dedupe(result), replace=True
+                )
+        if self.identity_map is not None:
+            self._fetched_now(self.identity_map, entity, result)
+        if metrics is not None:
+            _record_parse(metrics, started, decoded)
+        return result
+
+    def parse_groups(
+        self, response: httpx.Response, metrics: RequestMetrics | None = None
+    ) -> GroupedResponse:
+        """Parse a page of groups; the parse and server times are recorded in `metrics`, if passed."""
+        started = time.perf_counter()
+        page = GroupedResponse.from_json(response.content)
+        if metrics is not None:
+            _record_parse(metrics, started, None)
+            metrics.server_seconds = page.meta.db_response_time_ms / 1000
+        return page
+
+    def _groups_frame(self, group: GroupBy, groups: list[Group]) -> pl.DataFrame:
+        key_dtype = frames.group_key_dtype(group.query.endpoint.entity, group.field)
+        return frames.frame_from_groups(groups, key_dtype)
+
+    def _known(self, endpoint: Endpoint[T], openalex_id: str) -> T | None:
+        """Return an entity that was fetched before from the identity map, if any and not expired."""
+        if self.identity_map is None:
+            return None
+        try:
+            if utils.determine_id_type(openalex_id) != "openalex":
+                return None
+        except ValueError:
+            return None
+        url = f"https://openalex.org/{utils.short_id(openalex_id, 'openalex')}"
+        fetched = self._fetched.get((endpoint.entity, url))
+        if fetched is None or time.time() - fetched > self._ttl(endpoint.path):
+            return None
+        return self.identity_map.get(endpoint.entity, url)
+
+    def _fetched_now(
+        self, identity_map: IdentityMap, entity: type, result: object
+    ) -> None:
+        openalex_id = getattr(result, "id", None)
+        if openalex_id is None:
+            return
+        key = (entity, openalex_id)
+        self._fetched.pop(key, None)
+        self._fetched[key] = time.time()
+        # entities evicted from the identity map can't be served anyway
+        while len(self._fetched) > identity_map.maxsize:
+            self._fetched.pop(next(iter(self._fetched)), None)
+
+    def _ttl(self, path: str) -> int:
+        if self.cache is not None:
+            return self.cache.ttl_for(path)
+        endpoint = path.strip("/").split("/", 1)[0]
+        return self.config.cache_ttls.get(endpoint, self.config.cache_ttl)
+
+
+def _record_parse(
+    metrics: RequestMetrics, started: float, decoded: float | None
+) -> None:
+    # `decoded` is None when bytes are parsed into entities in one step
+    now = time.perf_counter()
+    if decoded is not None:
+        metrics.decode_seconds = decoded - started
+        started = decoded
+    metrics.parse_seconds = now - started
+
+
+class Client(BaseClient):
+    """
+    Synchronous client for the OpenAlex API.
+    Wraps an `httpx.Client` set up from a `BaseAlethecaConfig` (base url, timeout, user agent, polite pool email),
+    and keeps to `BaseAlethecaConfig.rate_limit` requests per second.
+
+    Use as a context manager, or call `close()` when done:
+
+        with Client() as client:
+            for work in client.iterate(WORKS.query(publication_year=2024)):
+                ...
+    """
+
+    def __init__(
+        self,
+        config: BaseAlethecaConfig | None = None,
+        *,
+        http_client: httpx.Client | None = None,
+        rate_limiter: RateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        cache: ResponseCache | None = None,
+        identity_map: IdentityMap | None = None,
+        hooks: Iterable[RequestHook] = (),
+    ):
+        super().__init__(
+            config,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            cache=cache,
+            identity_map=identity_map,
+            hooks=hooks,
+        )
+        self._http = http_client or httpx.Client(**self._http_settings())
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._http.close()
+        self._close_cache()
+
+    # --------
+    # low-level access
+    # --------
+
+    def request(
+        self, path: str, params: Mapping[str, str] | None = None
+    ) -> httpx.Response:
+        """
+        Send a GET request to `path` (relative to the base url) and return the raw response.
+        Failed requests are retried (see `BaseClient`); raises `httpx.HTTPStatusError` for error responses
+        that are not retried or still fail after the last retry. Cached responses are returned without a request, and without using rate limit tokens.
+        """
+        started = time.perf_counter()
+        response, metrics = self._send(path, params)
+        self._emit(metrics, started)
+        return response
+
+    def _send(
+        self, path: str, params: Mapping[str, str] | None
+    ) -> tuple[httpx.Response, RequestMetrics]:
+        """`request`, returning the metrics of the request without reporting them (unless it fails)."""
+        started = time.perf_counter()
+        metrics = RequestMetrics(path=path, endpoint=path.strip("/").split("/")[0])
+        params = self._request_params(params)
+        if (cached := self._cached(path, params)) is not None:
+            metrics.cached = True
+            self._received(metrics, cached)
+            return cached, metrics
+        backoff = self._backoff()
+        while True:
+            waited = time.perf_counter()
+            self.rate_limiter.acquire()
+            metrics.wait_seconds += time.perf_counter() - waited
+            trace = Trace()
+            try:
+                response = self._http.get(
+                    path, params=params, extensions={"trace": trace}
+                )
+            except httpx.TransportError:
+                if (delay := self._retry_delay(None, backoff)) is None:
+                    self._emit(metrics, started)
+                    raise
+            else:
+                metrics.bytes_downloaded += response.num_bytes_downloaded
+                if (delay := self._retry_delay(response, backoff)) is None:
+                    break
+            metrics.retries += 1
+            metrics.wait_seconds += delay
+            time.sleep(delay)
+        trace.apply(metrics)
+        self._received(metrics, response)
+        if response.is_error:
+            self._emit(metrics, started)
+        response.raise_for_status()
+        self._store(path, params, response)
+        return response, metrics
+
+    # --------
+    # entities
+    # --------
+
+    def get(self, endpoint: Endpoint[T], openalex_id: str) -> T:
+        """
+        Fetch a single entity by its id (OpenAlex id, or any external id the endpoint supports).
+        With an identity map, entities fetched before by OpenAlex id are returned from memory until the cache
+        TTL of the endpoint expires.
+        """
+        if (known := self._known(endpoint, openalex_id)) is not None:
+            return known
+        started = time.perf_counter()
+        response, metrics = self._send(f"/{endpoint.path}/{openalex_id}", None)
+        result = self.parse_entity(response, endpoint.entity, metrics)
+        self._emit(metrics, started)
+        return result
+
+    def get_page(
+        self, query: Query[T], *, cursor: str | None = None, page: int | None = None
+    ) -> Response[T]:
+        """
+        Fetch and parse a single page of results for `query`, using either cursor or basic paging.
+        If the query selects fields, results are partial entities, see `entities.partial_type`.
+        """
+        params = self.page_params(query, cursor, page)
+        started = time.perf_counter()
+        response, metrics = self._send(f"/{query.endpoint.path}", params)
+        page = self.parse_page(response, query.result_type, metrics)
+        self._emit(metrics, started)
+        return page
+
+    def get_many(self, endpoint: Endpoint[T], ids: Iterable[str]) -> Lookup[T]:
+        """
+        Fetch many entities by id, packing up to `MAX_OR_VALUES` ids in a single request as an OR-filter.
+
+        Ids can be of any type in `LOOKUP_FILTERS` (and supported by the endpoint), in any form that
+        `utils.determine_id_type` recognizes, and can be mixed. Results are returned in the order of `ids`,
+        ids that did not match an entity are listed in `Lookup.missing`. When the ids of a request match more
+        entities than fit in a page (e.g. dois shared by several works), the next pages are fetched until every
+        id is found.
+        """
+        ids = list(ids)
+        plan = _plan_lookup(endpoint, ids, self.config.per_page)
+        found: dict[_Key, BaseOpenAlex] = {}
+        for batch in plan.batches:
+            cursor: str | None = "*"
+            received = 0
+            while cursor:
+                page = self.get_page(batch.query, cursor=cursor)
+                _collect(found, batch.id_type, page)
+                received += len(page.results)
+                cursor = batch.next_cursor(page, received, found)
+        for id_type, short in plan.singles:
+            try:
+                found[id_type, short] = self.get(endpoint, f"{id_type}:{short}")
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code != 404:
+                    raise
+        return _finish_lookup(ids, plan, found)
+
+    def paginate(
+        self, query: Query[T], *, prefetch: bool = True
+    ) -> Iterator[Response[T]]:
+        """
+        Yield every page of results for `query`, following `cursor=*` -> `Meta.next_cursor`.
+
+        With `prefetch`, the next page is fetched and parsed in a background thread while the caller is
+        still processing the current one. Cursors are sequential, so at most two pages (the current one and
+        the next one) are held at any time, no matter how large the result set is.
+        """
+        if not prefetch:
+            cursor: str | None = "*"
+            while cursor:
+                page = self.get_page(query, cursor=cursor)
+                yield page
+                cursor = page.meta.next_cursor if page.results else None
+            return
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aletheca")
+        upcoming: Future[Response[T]] | None = executor.submit(
+            self.get_page, query, cursor="*"
+        )
+        try:
+            while upcoming is not None:
+                page = upcoming.result()
+                cursor = page.meta.next_cursor if page.results else None
+                upcoming = (
+                    executor.submit(self.get_page, query, cursor=cursor)
+                    if cursor
+                    else None
+                )
+                yield page
+                # don't keep the current page alive while waiting for the next one
+                del page
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def iterate(self, query: Query[T], *, prefetch: bool = True) -> Iterator[T]:
+        """Yield every entity matching `query`, see `paginate`."""
+        for page in self.paginate(query, prefetch=prefetch):
+            for result in page.results:
+                if result is not None:
+                    yield result
+
+    # --------
+    # counts
+    # --------
+
+    def count(self, query: Query, *, refresh: bool = False) -> int:
+        """
+        Return the number of results of `query`, from `Meta.count` of a page with a single result that has
+        only its id (filters and search are kept; sorting and selected fields are dropped).
+        Counts are remembered by the client; pass `refresh` to request them again.
+        """
+        key, params, count = self._known_count(query, refresh)
+        if count is not None:
+            return count
+        started = time.perf_counter()
+        response, metrics = self._send(f"/{query.endpoint.path}", params)
+        count = self.parse_count(response, metrics)
+        self._emit(metrics, started)
+        if is_cacheable(params):
+            self._counts[key] = count
+        return count
+
+    def count_many(
+        self, queries: Iterable[Query], *, refresh: bool = False
+    ) -> list[int]:
+        """
+        Return the counts of all `queries` (e.g. variants of a filter), in order. Requests are sent from a pool
+        of threads, so they run concurrently at the rate limit instead of one round trip at a time.
+        """
+        queries = list(queries)
+        workers = max(1, min(len(queries), self.config.rate_limit))
+        with ThreadPoolExecutor(workers, thread_name_prefix="aletheca") as executor:
+            return list(
+                executor.map(lambda query: self.count(query, refresh=refresh), queries)
+            )
+
+    # --------
+    # groups
+    # --------
+
+    def get_groups(
+        self, group: GroupBy, *, cursor: str | None = None
+    ) -> GroupedResponse:
+        """Fetch and parse a single page of groups (at most `per_page`, most results first)."""
+        started = time.perf_counter()
+        params = self.group_params(group, cursor)
+        response, metrics = self._send(f"/{group.query.endpoint.path}", params)
+        page = self.parse_groups(response, metrics)
+        self._emit(metrics, started)
+        return page
+
+    def group_by(self, group: GroupBy) -> pl.DataFrame:
+        """
+        Count the results of a query per value of a field, e.g. `WORKS.query(...).grouped_by("publication_year")`.
+        The counts are computed by the API, and all groups are fetched with cursor paging, so this takes a
+        request per `per_page` groups instead of a crawl of all results.
+
+        Returns a DataFrame with the columns `key`, `key_display_name` and `count`, see `frames.frame_from_groups`:
+        keys have the dtype of the grouped field (e.g. integers for `publication_year`, an enum for `type`).
+        """
+        groups: list[Group] = []
+        cursor: str | None = "*"
+        while cursor:
+            page = self.get_groups(group, cursor=cursor)
+            groups += page.group_by
+            cursor = page.meta.next_cursor if page.group_by else None
+        return self._groups_frame(group, groups)
+
+
+class AsyncClient(BaseClient):
+    """
+    Asynchronous client for the OpenAlex API, wrapping an `httpx.AsyncClient`.
+
+    Any number of requests can run concurrently (e.g. with `asyncio.gather`); the shared `RateLimiter` makes
+    them start at `BaseAlethecaConfig.rate_limit` requests per second, so the full allowance is used without
+    running into 429 responses.
+
+        async with AsyncClient() as client:
+            pages = await asyncio.gather(*(client.get_page(query) for query in queries))
+    """
+
+    def __init__(
+        self,
+        config: BaseAlethecaConfig | None = None,
+        *,
+        http_client: httpx.AsyncClient | None = None,
+        rate_limiter: RateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        cache: ResponseCache | None = None,
+        identity_map: IdentityMap | None = None,
+        hooks: Iterable[RequestHook] = (),
+    ):
+        super().__init__(
+            config,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            cache=cache,
+            identity_map=identity_map,
+            hooks=hooks,
+        )
+        self._http = http_client or httpx.AsyncClient(**self._http_settings())
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+        self._close_cache()
+
+    # --------
+    # low-level access
+    # --------
+
+    async def request(
+        self, path: str, params: Mapping[str, str] | None = None
+    ) -> httpx.Response:
+        """See `Client.request`."""
+        started = time.perf_counter()
+        response, metrics = await self._send(path, params)
+        self._emit(metrics, started)
+        return response
+
+    async def _send(
+        self, path: str, params: Mapping[str, str] | None
+    ) -> tuple[httpx.Response, RequestMetrics]:
+        """See `Client._send`."""
+        started = time.perf_counter()
+        metrics = RequestMetrics(path=path, endpoint=path.strip("/").split("/")[0])
+        params = self._request_params(params)
+        if (cached := self._cached(path, params)) is not None:
+            metrics.cached = True
+            self._received(metrics, cached)
+            return cached, metrics
+        backoff = self._backoff()
+        while True:
+            waited = time.perf_counter()
+            await self.rate_limiter.acquire_async()
+            metrics.wait_seconds += time.perf_counter() - waited
+            trace = Trace()
+            try:
+                response = await self._http.get(
+                    path, params=params, extensions={"trace": trace.atrace}
+                )
+            except httpx.TransportError:
+                if (delay := self._retry_delay(None, backoff)) is None:
+                    self._emit(metrics, started)
+                    raise
+            else:
+                metrics.bytes_downloaded += response.num_bytes_downloaded
+                if (delay := self._retry_delay(response, backoff)) is None:
+                    break
+            metrics.retries += 1
+            metrics.wait_seconds += delay
+            await asyncio.sleep(delay)
+        trace.apply(metrics)
+        self._received(metrics, response)
+        if response.is_error:
+            self._emit(metrics, started)
+        response.raise_for_status()
+        self._store(path, params, response)
+        return response, metrics
+
+    # --------
+    # entities
+    # --------
+
+    async def get(self, endpoint: Endpoint[T], openalex_id: str) -> T:
+        """See `Client.get`."""
+        if (known := self._known(endpoint, openalex_id)) is not None:
+            return known
+        started = time.perf_counter()
+        response, metrics = await self._send(f"/{endpoint.path}/{openalex_id}", None)
+        result = self.parse_entity(response, endpoint.entity, metrics)
+        self._emit(metrics, started)
+        return result
+
+    async def get_page(
+        self, query: Query[T], *, cursor: str | None = None, page: int | None = None
+    ) -> Response[T]:
+        """See `Client.get_page`."""
+        params = self.page_params(query, cursor, page)
+        started = time.perf_counter()
+        response, metrics = await self._send(f"/{query.endpoint.path}", params)
+        page = self.parse_page(response, query.result_type, metrics)
+        self._emit(metrics, started)
+        return page
+
+    async def get_many(self, endpoint: Endpoint[T], ids: Iterable[str]) -> Lookup[T]:
+        """See `Client.get_many`: all batches are requested concurrently."""
+        ids = list(ids)
+        plan = _plan_lookup(endpoint, ids, self.config.per_page)
+        found: dict[_Key, BaseOpenAlex] = {}
+
+        async def lookup(batch: _LookupBatch) -> None:
+            cursor: str | None = "*"
+            received = 0
+            while cursor:
+                page = await self.get_page(batch.query, cursor=cursor)
+                _collect(found, batch.id_type, page)
+                received += len(page.results)
+                cursor = batch.next_cursor(page, received, found)
+
+        async def single(id_type: utils.IdType, short: str) -> None:
+            try:
+                found[id_type, short] = await self.get(endpoint, f"{id_type}:{short}")
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code != 404:
+                    raise
+
+        await asyncio.gather(
+            *map(lookup, plan.batches),
+            *(single(id_type, short) for id_type, short in plan.singles),
+        )
+        return _finish_lookup(ids, plan, found)
+
+    async def paginate(
+        self, query: Query[T], *, prefetch: bool = True
+    ) -> AsyncIterator[Response[T]]:
+        """See `Client.paginate`: with `prefetch`, the next page is requested in a background task."""
+        upcoming: asyncio.Task[Response[T]] | None = asyncio.ensure_future(
+            self.get_page(query, cursor="*")
+        )
+        try:
+            while upcoming is not None:
+                page = await upcoming
+                cursor = page.meta.next_cursor if page.results else None
+                upcoming = None
+                if cursor and prefetch:
+                    upcoming = asyncio.ensure_future(
+                        self.get_page(query, cursor=cursor)
+                    )
+                yield page
+                del page
+                if cursor and not prefetch:
+                    upcoming = asyncio.ensure_future(
+                        self.get_page(query, cursor=cursor)
+                    )
+        finally:
+            if upcoming is not None:
+                upcoming.cancel()
+
+    async def iterate(
+        self, query: Query[T], *, prefetch: bool = True
+    ) -> AsyncIterator[T]:
+        """See `Client.iterate`."""
+        async for page in self.paginate(query, prefetch=prefetch):
+            for result in page.results:
+                if result is not None:
+                    yield result
+
+    # --------
+    # counts
+    # --------
+
+    async def count(self, query: Query, *, refresh: bool = False) -> int:
+        """See `Client.count`."""
+        key, params, count = self._known_count(query, refresh)
+        if count is not None:
+            return count
+        started = time.perf_counter()
+        response, metrics = await self._send(f"/{query.endpoint.path}", params)
+        count = self.parse_count(response, metrics)
+        self._emit(metrics, started)
+        if is_cacheable(params):
+            self._counts[key] = count
+        return count
+
+    async def count_many(
+        self, queries: Iterable[Query], *, refresh: bool = False
+    ) -> list[int]:
+        """See `Client.count_many`: all counts are requested concurrently."""
+        return list(
+            await asyncio.gather(
+                *(self.count(query, refresh=refresh) for query in queries)
+            )
+        )
+
+    # --------
+    # groups
+    # --------
+
+    async def get_groups(
+        self, group: GroupBy, *, cursor: str | None = None
+    ) -> GroupedResponse:
+        """See `Client.get_groups`."""
+        started = time.perf_counter()
+        params = self.group_params(group, cursor)
+        response, metrics = await self._send(f"/{group.query.endpoint.path}", params)
+        page = self.parse_groups(response, metrics)
+        self._emit(metrics, started)
+        return page
+
+    async def group_by(self, group: GroupBy) -> pl.DataFrame:
+        """See `Client.group_by`; run several with `asyncio.gather` to count in many ways at once."""
+        groups: list[Group] = []
+        cursor: str | None = "*"
+        while cursor:
+            page = await self.get_groups(group, cursor=cursor)
+            groups += page.group_by
+            cursor = page.meta.next_cursor if page.group_by else None
+        return self._groups_frame(group, groups)
@@ -0,0 +1,196 @@
+"""
+aletheca.cache
+
+on-disk cache for API responses, stored in a single SQLite file
+
+Responses are keyed by the canonical form of the request (endpoint, sorted filters, select, paging), so the same
+query written in a different order hits the same entry. Entries expire after a per-endpoint TTL, and the least
+recently used entries are evicted in batches when the cache grows beyond its byte budget, down to
+`EVICT_TO` of the budget. Cache hits cost no network time and no rate limit tokens.
+
+The total size of the cached bodies is a running count in the database, kept up to date by triggers on every
+insert, update and delete. Writes read that count instead of summing the sizes of all entries, and several
+processes that share one cache file all see the same total.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from urllib.parse import urlencode
+
+from aletheca.config import BaseAlethecaConfig
+
+# parameters that don't change the response, and are left out of the cache key
+IGNORED_PARAMS = frozenset({"mailto", "api_key"})
+
+# share of the byte budget that is left after an eviction, so that not every write has to evict
+EVICT_TO = 0.9
+# entries that are evicted per query
+_EVICT_BATCH = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+-- finds the least recently used entries, and their sizes, without reading the bodies
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed, size);
+-- a single row with the total size of the responses
+CREATE TABLE IF NOT EXISTS total (id INTEGER PRIMARY KEY CHECK (id = 0), size INTEGER NOT NULL);
+INSERT OR IGNORE INTO total VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses
+BEGIN UPDATE total SET size = size + new.size; END;
+CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses
+BEGIN UPDATE total SET size = size + new.size - old.size; END;
+CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses
+BEGIN UPDATE total SET size = size - old.size; END;
+"""
+
+
+def cache_key(path: str, params: Mapping[str, str]) -> str:
+    """
+    Return the canonical cache key for a GET request: the path with its sorted query parameters, where the
+    terms of `filter=` and the fields of `select=` are sorted as well.
+    """
+    canonical: dict[str, str] = {}
+    for name, value in params.items():
+        if name in IGNORED_PARAMS:
+            continue
+        if name in ("filter", "select"):
+            value = ",".join(sorted(value.split(",")))
+        canonical[name] = value
+    query = urlencode(sorted(canonical.items()))
+    return hashlib.sha256(f"{path.strip('/')}?{query}".encode()).hexdigest()
+
+
+def is_cacheable(params: Mapping[str, str]) -> bool:
+    """Random samples without a seed differ on every request, and are never cached."""
+    return not ("sample" in params and "seed" not in params)
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of raw response bodies.
+    Safe to share between threads (e.g. the prefetch thread of `Client.paginate`) and between clients.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        ttl: int = 24 * 60 * 60,
+        ttls: Mapping[str, int] | None = None,
+        max_bytes: int = 1024**3,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: BaseAlethecaConfig) -> ResponseCache | None:
+        if config.cache_path is None:
+            return None
+        return cls(
+            config.cache_path,
+            ttl=config.cache_ttl,
+            ttls=config.cache_ttls,
+            max_bytes=config.cache_max_bytes,
+        )
+
+    def ttl_for(self, path: str) -> int:
+        endpoint = path.strip("/").split("/", 1)[0]
+        return self.ttls.get(endpoint, self.ttl)
+
+    def get(self, path: str, params: Mapping[str, str]) -> bytes | None:
+        """Return the cached body for a request, or None if it is missing or expired."""
+        key = cache_key(path, params)
+        now = time.time()
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT body, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            body, created = row
+            if now - created > self.ttl_for(path):
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+            )
+            return body
+
+    def set(self, path: str, params: Mapping[str, str], body: bytes) -> None:
+        """Store a response body, evicting the least recently used entries if over budget."""
+        if len(body) > self.max_bytes:
+            return
+        key = cache_key(path, params)
+        endpoint = path.strip("/").split("/", 1)[0]
+        now = time.time()
+        with self._lock, self._db:
+            # an upsert rather than INSERT OR REPLACE: the rows that REPLACE deletes don't fire the delete trigger
+            self._db.execute(
+                """
+                INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    body = excluded.body, size = excluded.size,
+                    created = excluded.created, accessed = excluded.accessed
+                """,
+                (key, endpoint, body, len(body), now, now),
+            )
+            if self._total_size() > self.max_bytes:
+                self._evict()
+
+    def size(self) -> int:
+        """Total size of the cached bodies in bytes, including those written by other processes."""
+        with self._lock:
+            return self._total_size()
+
+    def clear(self) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _total_size(self) -> int:
+        return self._db.execute("SELECT size FROM total").fetchone()[0]
+
+    def _evict(self) -> None:
+        # drop expired entries first, then the least recently used ones, a batch at a time, until the cache
+        # is within `EVICT_TO` of its budget
+        now = time.time()
+        for (endpoint,) in self._db.execute(
+            "SELECT DISTINCT endpoint FROM responses"
+        ).fetchall():
+            self._db.execute(
+                "DELETE FROM responses WHERE endpoint = ? AND created < ?",
+                (endpoint, now - self.ttls.get(endpoint, self.ttl)),
+            )
+        excess = self._total_size() - int(self.max_bytes * EVICT_TO)
+        while excess > 0:
+            rows = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed LIMIT ?",
+                (_EVICT_BATCH,),
+            ).fetchall()
+            if not rows:
+                break
+            stale: list[tuple[str]] = []
+            for key, size in rows:
+                if excess <= 0:
+                    break
+                stale.append((key,))
+                excess -= size
+            self._db.executemany("DELETE FROM responses WHERE key = ?", stale)
@@ -4,7 +4,7 @@ aletheca.config
 configuration classes and settings for the Aletheca library, defining default parameters, API settings, user preferences, ...
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 # TODO set up loguru here in the config module
 # from loguru import logger
@@ -24,8 +24,28 @@ class BaseAlethecaConfig:
 
     api_base_url: str = "https://api.openalex.org"
     default_timeout: int = 10  # seconds
+    # retries of failed requests (see `api.RETRY_STATUSES`), with backoff delays between `backoff_factor` and
+    # `max_backoff` seconds. A `Retry-After` of up to `max_backoff` seconds is honoured, longer ones raise.
     max_retries: int = 3
     backoff_factor: float = 0.3
+    max_backoff: float = 60.0
+    # pause all requests of a client for `breaker_cooldown` seconds when at least `breaker_threshold` of the
+    # last `breaker_window` requests failed (see `api.CircuitBreaker`)
+    breaker_window: int = 20
+    breaker_threshold: float = 0.5
+    breaker_cooldown: float = 10.0
     user_agent: str = "AlethecaClient/0.1.0"
     email: str = ""
     rate_limit: int = 10  # requests per second
+    per_page: int = 200  # results per page when paginating, max allowed by OpenAlex
+    # validate responses strictly (see `entities.default_dacite_config`) instead of the faster, lenient bytes decoder
+    strict_parsing: bool = False
+    # on-disk response cache (see `aletheca.cache`), disabled when no path is set
+    cache_path: str | None = None
+    cache_ttl: int = 24 * 60 * 60  # seconds
+    # per-endpoint overrides of `cache_ttl`, e.g. {"works": 3600}
+    cache_ttls: dict[str, int] = field(default_factory=dict)
+    cache_max_bytes: int = 1024**3
+    # share dehydrated entities by id between parsed results (see `aletheca.identity`), 0 to disable.
+    # With strict parsing this saves both time and memory; with the bytes decoder it saves memory at some extra time.
+    identity_map_size: int = 0
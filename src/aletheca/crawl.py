@@ -0,0 +1,205 @@
+"""
+aletheca.crawl
+
+sharded crawling: split a query into disjoint partitions and run their cursor streams concurrently
+
+A single cursor stream is strictly sequential, so one stream can never fetch faster than one page per round trip.
+`crawl` splits a query on one or more fields (e.g. `publication_year`, then `type`), probes `Meta.count` of each
+partition to build shards of roughly equal size, and runs several cursor streams at once on an `AsyncClient`.
+All streams share the rate limiter of the client, so the crawl as a whole stays at the configured rate.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass
+from typing import Any, Literal, TypeVar, get_args, get_origin, get_type_hints
+
+from aletheca import parsing
+from aletheca.api import AsyncClient
+from aletheca.endpoints import MAX_OR_VALUES, Query
+from aletheca.entities import BaseOpenAlex, Meta
+
+T = TypeVar("T", bound=BaseOpenAlex)
+
+# --------
+# count probes
+# --------
+
+
+@dataclass(slots=True)
+class _Probe:
+    meta: Meta
+    results: list[dict[str, Any]]
+
+
+async def _probe(
+    client: AsyncClient, query: Query, select: str = "id", sort: str | None = None
+) -> _Probe:
+    params = query.params()
+    params.update({"per-page": "1", "select": select})
+    if sort is not None:
+        params["sort"] = sort
+    response = await client.request(f"/{query.endpoint.path}", params)
+    return parsing.from_json(_Probe, response.content)
+
+
+async def probe_count(client: AsyncClient, query: Query) -> int:
+    """Return the number of results for `query`, see `AsyncClient.count`."""
+    return await client.count(query)
+
+
+# --------
+# partitioning
+# --------
+
+
+@dataclass(frozen=True, slots=True)
+class Shard:
+    """A disjoint part of a crawled query, with its result count at planning time."""
+
+    query: Query
+    count: int
+
+
+async def _field_values(client: AsyncClient, query: Query, field: str) -> list[Any]:
+    """
+    Return the values to partition `query` on for `field`: all options of a `Literal` field (like `Work.type`),
+    or the full range of an integer field (like `Work.publication_year`), found by sorting on it.
+    """
+    hint = get_type_hints(query.endpoint.entity).get(field)
+    if hint is None:
+        raise ValueError(
+            f"cannot partition {query.endpoint.path} on unknown field {field!r}"
+        )
+    if get_origin(hint) is Literal:
+        return list(get_args(hint))
+    if hint is int:
+        low, high = await asyncio.gather(
+            _probe(client, query, select=field, sort=field),
+            _probe(client, query, select=field, sort=f"{field}:desc"),
+        )
+        if not low.results:
+            return []
+        return list(range(low.results[0][field], high.results[0][field] + 1))
+    raise ValueError(
+        f"cannot partition on {field!r}: only Literal and int fields are supported"
+    )
+
+
+async def plan_shards(
+    client: AsyncClient,
+    query: Query[T],
+    by: Sequence[str],
+    target: int,
+    count: int | None = None,
+) -> list[Shard]:
+    """
+    Split `query` into disjoint shards of at most about `target` results.
+
+    The query is partitioned on the first field in `by`, and the count of each value is probed. Neighbouring
+    small values are combined into a single OR-filter shard; values with more than `target` results are split
+    further on the next field in `by`. Raises `ValueError` if the partition counts don't add up to the
+    count of the query, as the crawl would then miss (or duplicate) results.
+    """
+    if count is None:
+        count = await probe_count(client, query)
+    field, *rest = by
+    values = await _field_values(client, query, field)
+    counts = await client.count_many(query.where(**{field: value}) for value in values)
+    if sum(counts) != count:
+        raise ValueError(
+            f"partitions on {field!r} hold {sum(counts)} of the {count} results of the query"
+        )
+
+    shards: list[Shard] = []
+    group: list[Any] = []
+    size = 0
+
+    def flush() -> None:
+        nonlocal group, size
+        if group:
+            value = group[0] if len(group) == 1 else group
+            shards.append(Shard(query.where(**{field: value}), size))
+        group, size = [], 0
+
+    for value, value_count in zip(values, counts, strict=True):
+        if not value_count:
+            continue
+        if value_count > target and rest:
+            flush()
+            shards.extend(
+                await plan_shards(
+                    client, query.where(**{field: value}), rest, target, value_count
+                )
+            )
+            continue
+        if size + value_count > target or len(group) == MAX_OR_VALUES:
+            flush()
+        group.append(value)
+        size += value_count
+    flush()
+    return shards
+
+
+# --------
+# crawling
+# --------
+
+
+_DONE = object()
+
+
+async def crawl(
+    client: AsyncClient,
+    query: Query[T],
+    *,
+    by: Sequence[str] = ("publication_year", "type"),
+    streams: int = 8,
+    shards: Sequence[Shard] | None = None,
+) -> AsyncIterator[T]:
+    """
+    Yield every entity matching `query`, using `streams` concurrent cursor streams over disjoint shards.
+
+    Shards are planned with `plan_shards`, aiming at about 4 shards per stream, and are handed out largest
+    first, so that streams finish at about the same time. Results are yielded in arrival order; shards are
+    not interleaved within a page. Stopping the iteration cancels all running streams.
+    """
+    if shards is None:
+        count = await probe_count(client, query)
+        target = max(math.ceil(count / (streams * 4)), client.config.per_page)
+        shards = await plan_shards(client, query, by, target, count)
+    pending = sorted(shards, key=lambda shard: shard.count, reverse=True)
+    # finished pages wait here until the caller gets to them; bounded, so fast streams pause
+    pages: asyncio.Queue[Any] = asyncio.Queue(maxsize=streams * 2)
+
+    async def stream() -> None:
+        try:
+            while pending:
+                shard = pending.pop(0)
+                async for page in client.paginate(shard.query, prefetch=False):
+                    await pages.put(page.results)
+        except Exception as exc:  # noqa: BLE001 - re-raised in the consuming task
+            await pages.put(exc)
+        await pages.put(_DONE)
+
+    workers = [
+        asyncio.ensure_future(stream()) for _ in range(min(streams, len(pending)))
+    ]
+    try:
+        running = len(workers)
+        while running:
+            item = await pages.get()
+            if item is _DONE:
+                running -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                for result in item:
+                    if result is not None:
+                        yield result
+    finally:
+        for worker in workers:
+            worker.cancel()
@@ -3,3 +3,171 @@ aletheca.endpoints
 
 defines the various API endpoints available in the OpenAlex API, along with their paths, parameters, and usage guidelines.
 """
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field, replace
+from typing import Generic, TypeVar
+
+from aletheca.entities import (
+    Author,
+    BaseOpenAlex,
+    Concept,
+    Funder,
+    Institution,
+    Keyword,
+    Publisher,
+    Source,
+    Topic,
+    Work,
+    partial_type,
+)
+
+T = TypeVar("T", bound=BaseOpenAlex)
+
+FilterValue = str | int | float | bool | Iterable[str | int]
+
+# the API accepts up to 100 values in a single OR-filter, keep some room for other filters in the url
+MAX_OR_VALUES = 50
+
+# ----------------------------------------------------------------------------------------------------------------
+# Entity endpoints
+# ----------------------------------------------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class Endpoint(Generic[T]):
+    """An entity endpoint of the API, e.g. `/works`, and the dataclass its results are parsed into."""
+
+    path: str
+    entity: type[T]
+
+    def query(self, **filters: FilterValue) -> Query[T]:
+        return Query(endpoint=self, filter=filters)
+
+
+WORKS = Endpoint("works", Work)
+AUTHORS = Endpoint("authors", Author)
+SOURCES = Endpoint("sources", Source)
+INSTITUTIONS = Endpoint("institutions", Institution)
+TOPICS = Endpoint("topics", Topic)
+KEYWORDS = Endpoint("keywords", Keyword)
+PUBLISHERS = Endpoint("publishers", Publisher)
+FUNDERS = Endpoint("funders", Funder)
+CONCEPTS = Endpoint("concepts", Concept)
+
+ENDPOINTS: dict[str, Endpoint] = {
+    endpoint.path: endpoint
+    for endpoint in (
+        WORKS,
+        AUTHORS,
+        SOURCES,
+        INSTITUTIONS,
+        TOPICS,
+        KEYWORDS,
+        PUBLISHERS,
+        FUNDERS,
+        CONCEPTS,
+    )
+}
+
+# ----------------------------------------------------------------------------------------------------------------
+# Query parameters
+# ----------------------------------------------------------------------------------------------------------------
+
+
+def format_filter_value(value: FilterValue) -> str:
+    """Format a filter value for the `filter=` parameter; iterables become OR-filters (`a|b|c`)."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    return "|".join(str(v) for v in value)
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Query(Generic[T]):
+    """
+    Parameters for a list request on an entity endpoint.
+    Queries are immutable: the methods below return updated copies, so they can be reused and combined.
+
+    See https://docs.openalex.org/how-to-use-the-api/get-lists-of-entities
+    """
+
+    endpoint: Endpoint[T]
+    filter: Mapping[str, FilterValue] = field(default_factory=dict)
+    search: str | None = None
+    sort: str | None = None
+    select: tuple[str, ...] | None = None
+    per_page: int | None = None  # defaults to `BaseAlethecaConfig.per_page`
+    sample: int | None = None
+    seed: int | None = None
+
+    @property
+    def result_type(self) -> type:
+        """The type results are parsed into: the entity, or its partial variant when `select` is set."""
+        if self.select is None:
+            return self.endpoint.entity
+        return partial_type(self.endpoint.entity, self.select)
+
+    def where(self, **filters: FilterValue) -> Query[T]:
+        return replace(self, filter={**self.filter, **filters})
+
+    def searching(self, search: str) -> Query[T]:
+        return replace(self, search=search)
+
+    def sorted_by(self, sort: str) -> Query[T]:
+        return replace(self, sort=sort)
+
+    def selecting(self, *fields: str) -> Query[T]:
+        return replace(self, select=tuple(fields))
+
+    def grouped_by(self, field: str, *, include_unknown: bool = False) -> GroupBy[T]:
+        return GroupBy(query=self, field=field, include_unknown=include_unknown)
+
+    def params(self) -> dict[str, str]:
+        """Return the query string parameters for this query (without paging parameters)."""
+        params: dict[str, str] = {}
+        if self.filter:
+            params["filter"] = ",".join(
+                f"{key}:{format_filter_value(value)}"
+                for key, value in self.filter.items()
+            )
+        if self.search is not None:
+            params["search"] = self.search
+        if self.sort is not None:
+            params["sort"] = self.sort
+        if self.select is not None:
+            params["select"] = ",".join(self.select)
+        if self.per_page is not None:
+            params["per-page"] = str(self.per_page)
+        if self.sample is not None:
+            params["sample"] = str(self.sample)
+        if self.seed is not None:
+            params["seed"] = str(self.seed)
+        return params
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class GroupBy(Generic[T]):
+    """
+    A `group_by` request: the number of results of `query` for each value of `field` (e.g. `publication_year`,
+    `open_access.oa_status` or `authorships.institutions.country_code`), counted by the API.
+    With `include_unknown`, results without a value are counted in an `unknown` group.
+
+    See https://docs.openalex.org/how-to-use-the-api/get-groups-of-entities
+    """
+
+    query: Query[T]
+    field: str
+    include_unknown: bool = False
+
+    def params(self) -> dict[str, str]:
+        """Return the query string parameters for this request (without paging parameters)."""
+        # groups are counted over all results, sorting and selecting fields do not apply
+        params = replace(self.query, sort=None, select=None).params()
+        params["group_by"] = (
+            f"{self.field}:include_unknown" if self.include_unknown else self.field
+        )
+        return params
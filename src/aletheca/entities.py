@@ -5,15 +5,29 @@ dataclasses to represent data retrieved from OpenAlex
 
 based on the official docs: https://docs.openalex.org/api-entities/
 
+all entities are slotted dataclasses without a per-instance `__dict__`, as we often hold millions of them.
+Measured on CPython 3.12, not counting the field values themselves: a `Work` instance takes 512 bytes instead
+of 1632, and small nested objects like `Authorship` (136 -> 96), `Location` (160 -> 120) or `YearCountBasic`
+(81 -> 48) shrink by 30-40%.
+
+all entities are keyword-only dataclasses, and every field typed `X | None` defaults to None, as the bytes
+decoder of `parsing.from_json` needs defaults for the fields a response may leave out. Build entities with
+keyword arguments; optional fields left out are None. This does not loosen parsing: `from_dict` and
+`from_json` still reject data without one of the required (non-Optional) fields.
 """
 
 from __future__ import annotations
 
+import dataclasses
+import functools
+from collections.abc import Iterable
 from dataclasses import dataclass
-from typing import Generic, Literal, Self, TypeVar
+from typing import ClassVar, Generic, Literal, Self, TypeVar, get_type_hints
 
 from dacite import Config, from_dict
 
+from aletheca import parsing
+
 default_dacite_config = Config(strict=True)
 # ----------------------------------------------------------------------------------------------------------------
 # Type aliases
@@ -106,7 +120,7 @@ InstitutionType = Literal[
 # ----------------------------------------------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class BaseOpenAlex:
     """
     Base class for OpenAlex entities with an id.
@@ -114,30 +128,54 @@ class BaseOpenAlex:
     """
 
     # openalex id -- SOMETIMES THIS IS null for dehydrated entities?? e.g. in authorships for https://openalex.org/W7104996979
-    id: str | None
+    id: str | None = None
 
     # these fields below are all marked as optional -- but probably should not be in practice??
 
     # can be none, e.g. for works sometimes https://openalex.org/W4386670207
-    display_name: str | None
+    display_name: str | None = None
 
     # dunno what this is doing in the response -- got this when using the random sample query (?sample=10)
-    relevance_score: float | None
+    relevance_score: float | None = None
 
     # !! found missing creation/updated dates in api data, e.g. https://openalex.org/P4361727468. Should probably be non-nullable, could always default to created_date
-    created_date: str | None
-    updated_date: str | None
+    created_date: str | None = None
+    updated_date: str | None = None
 
     # not documented? often missing?
-    score: float | None
+    score: float | None = None
+
+    cited_by_count: int | None = None
+    works_count: int | None = None
+    works_api_url: str | None = None
+
+    # dehydrated entities that hold no context-specific data (like a `score`) are the same wherever they
+    # appear, so they can be built once per id and shared, see `aletheca.identity`
+    shared_by_id: ClassVar[bool] = False
 
-    cited_by_count: int | None
-    works_count: int | None
-    works_api_url: str | None
+    # fields with values from a small vocabulary (country codes, licenses, ...), stored once and shared by all
+    # instances, see `parsing.interned_strings`. The values of `Literal` fields are always shared.
+    # Ids and names only belong here for fixed vocabularies (the 4 domains, 26 fields, 252 subfields and 17 SDGs);
+    # those of topics, concepts or keywords would fill the bounded table.
+    interned_fields: ClassVar[frozenset[str]] = frozenset()
 
     @classmethod
-    def from_dict(cls, data: dict) -> Self:
-        return from_dict(data_class=cls, data=data, config=default_dacite_config)
+    def from_dict(cls, data: dict, lazy: bool = False) -> Self:
+        # lazy: keep the raw data and only parse fields on first access, see `parsing.lazy_from_dict`
+        if lazy:
+            return parsing.lazy_from_dict(cls, data, config=default_dacite_config)
+        return parsing.from_dict(
+            data_class=cls, data=data, config=default_dacite_config
+        )
+
+    @classmethod
+    def from_json(cls, data: bytes | str) -> Self:
+        return parsing.from_json(cls, data)
+
+    @classmethod
+    def partial(cls, *fields: str) -> type[Partial]:
+        """Return the partial variant of this entity with only `fields`, see `partial_type`."""
+        return partial_type(cls, fields)
 
 
 # ----------------------------------------------------------------------------------------------------------------
@@ -145,255 +183,278 @@ class BaseOpenAlex:
 # ----------------------------------------------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class WorkIds:
     openalex: str
-    doi: str | None
-    mag: int | str | None
-    pmid: str | None
-    pmcid: str | None
+    doi: str | None = None
+    mag: int | str | None = None
+    pmid: str | None = None
+    pmcid: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class AuthorIds:
     openalex: str
-    orcid: str | None
-    scopus: str | None
-    twitter: str | None
-    wikipedia: str | None
+    orcid: str | None = None
+    scopus: str | None = None
+    twitter: str | None = None
+    wikipedia: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class SourceIds:
     openalex: str
-    fatcat: str | None
-    issn: list[str | None] | None
-    issn_l: str | None
-    mag: int | str | None
-    wikidata: str | None
+    fatcat: str | None = None
+    issn: list[str | None] | None = None
+    issn_l: str | None = None
+    mag: int | str | None = None
+    wikidata: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class InstitutionIds:
     openalex: str
-    ror: str | None
-    grid: str | None
-    mag: int | str | None
-    wikidata: str | None
-    wikipedia: str | None
+    ror: str | None = None
+    grid: str | None = None
+    mag: int | str | None = None
+    wikidata: str | None = None
+    wikipedia: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class TopicIds:
     openalex: str
-    wikipedia: str | None
+    wikipedia: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class PublisherIds:
     openalex: str
-    ror: str | None
-    wikidata: str | None
+    ror: str | None = None
+    wikidata: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class FunderIds:
     openalex: str
-    doi: str | None
-    crossref: str | None
-    ror: str | None
-    wikidata: str | None
+    doi: str | None = None
+    crossref: str | None = None
+    ror: str | None = None
+    wikidata: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class ConceptIds:
     openalex: str
-    mag: int | str | None
-    umls_cui: list[str] | None
-    umls_aui: list[str] | None
-    wikidata: str | None
-    wikipedia: str | None
+    mag: int | str | None = None
+    umls_cui: list[str] | None = None
+    umls_aui: list[str] | None = None
+    wikidata: str | None = None
+    wikipedia: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Affiliation:
     raw_affiliation_string: str
     institution_ids: list[str | None]
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class DehydratedAuthor(BaseOpenAlex):
-    orcid: str | None
+    shared_by_id = True
 
+    orcid: str | None = None
 
-@dataclass
+
+@dataclass(slots=True, kw_only=True)
 class DehydratedInstitution(BaseOpenAlex):
-    country_code: str | None  # ISO 3166-1 alpha-2 country code
-    lineage: list[str | None] | None
-    ror: str | None
-    type: InstitutionType | None
+    shared_by_id = True
+    interned_fields = frozenset({"country_code"})
+
+    country_code: str | None = None  # ISO 3166-1 alpha-2 country code
+    lineage: list[str | None] | None = None
+    ror: str | None = None
+    type: InstitutionType | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class RelatedInstitution(DehydratedInstitution):
+    shared_by_id = False  # `relationship` depends on the institution it is listed in
+
     # undocumented value found: "successor"
-    relationship: Literal["parent", "child", "related", "successor"] | None
+    relationship: Literal["parent", "child", "related", "successor"] | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class DehydratedInstitutionWithYear:
     institution: DehydratedInstitution
     years: list[int | None]
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class DehydratedSource(BaseOpenAlex):
+    shared_by_id = True
+    interned_fields = frozenset({"raw_type"})
+
     is_core: bool
     is_in_doaj: bool
     is_oa: bool
     # undocumented field!! Also not always present, so nullable bool-type :(
-    is_indexed_in_scopus: bool | None
+    is_indexed_in_scopus: bool | None = None
     type: SourceType
-    issn_l: str | None
-    issn: list[str] | None
-    host_organization: str | None
+    issn_l: str | None = None
+    issn: list[str] | None = None
+    host_organization: str | None = None
     host_organization_lineage: list[str | None]
-    host_organization_name: str | None
+    host_organization_name: str | None = None
     # undocumented field!!
-    host_organization_lineage_names: list[str | None] | None
-    raw_type: (
-        str | None
-    )  # undocumented field!! e.g. 'journal-article', ex. https://openalex.org/W4382601591
+    host_organization_lineage_names: list[str | None] | None = None
+    # undocumented field!! e.g. 'journal-article', ex. https://openalex.org/W4382601591
+    raw_type: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Repository(BaseOpenAlex):
     # specific field for the 'repositories' field of Institution entity
-    host_organization: str | None
+    host_organization: str | None = None
     host_organization_lineage: list[str | None]
-    host_organization_name: str | None
+    host_organization_name: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class SimpleDehydratedConcept(BaseOpenAlex):
     # field is sometimes missing? happened for author in the x_concept field, here: https://openalex.org/A5011476733
-    level: int | None
-    wikidata: str | None
+    level: int | None = None
+    wikidata: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class DehydratedConcept(SimpleDehydratedConcept):
     score: float
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Authorship:
+    interned_fields: ClassVar[frozenset[str]] = frozenset({"countries"})
+
     author: DehydratedAuthor
     raw_author_name: str
     is_corresponding: bool
     countries: list[str]
-    author_position: Literal["first", "middle", "last"] | None
+    author_position: Literal["first", "middle", "last"] | None = None
     affiliations: list[Affiliation]
     institutions: list[DehydratedInstitution]
     raw_affiliation_strings: list[str]
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class APCData:
-    value: int | None
-    currency: str | None
-    value_usd: int | None
-    provenance: str | None
+    interned_fields: ClassVar[frozenset[str]] = frozenset({"currency", "provenance"})
+
+    value: int | None = None
+    currency: str | None = None
+    value_usd: int | None = None
+    provenance: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class APCEntry:
+    interned_fields: ClassVar[frozenset[str]] = frozenset({"currency"})
+
     price: int
     currency: str
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Biblio:
-    volume: str | None
-    issue: str | None
-    first_page: str | None
-    last_page: str | None
+    volume: str | None = None
+    issue: str | None = None
+    first_page: str | None = None
+    last_page: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Mesh:
     descriptor_ui: str
     descriptor_name: str
     is_major_topic: bool
-    qualifier_ui: str | None
-    qualifier_name: str | None
+    qualifier_ui: str | None = None
+    qualifier_name: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Location:
-    is_accepted: (
-        bool | None
-    )  # should not be None, but data from Datacite API does not have this field apparently
+    interned_fields: ClassVar[frozenset[str]] = frozenset({"license", "license_id"})
+
+    # should not be None, but data from Datacite API does not have this field apparently
+    is_accepted: bool | None = None
     is_oa: bool
-    is_published: (
-        bool | None
-    )  # sometimes none?? e.g. in the locations of https://openalex.org/W2939702801
-    landing_page_url: str | None
-    pdf_url: str | None
-    license: str | None
-    license_id: str | None  # undocumented field!!
-
-    source: DehydratedSource | None
-    version: Literal["publishedVersion", "acceptedVersion", "submittedVersion"] | None
-
-    raw_source_name: (
-        str | None
-    )  # undocumented field!! see https://openalex.org/W1980689546
-    id: (
-        str | None
-    )  # undocumented field!! e.g. 'doi:10.1115/pvp2009-77064', from same example as above
-
-
-@dataclass
+    # sometimes none?? e.g. in the locations of https://openalex.org/W2939702801
+    is_published: bool | None = None
+    landing_page_url: str | None = None
+    pdf_url: str | None = None
+    license: str | None = None
+    license_id: str | None = None  # undocumented field!!
+
+    source: DehydratedSource | None = None
+    version: (
+        Literal["publishedVersion", "acceptedVersion", "submittedVersion"] | None
+    ) = None
+
+    # undocumented field!! see https://openalex.org/W1980689546
+    raw_source_name: str | None = None
+    # undocumented field!! e.g. 'doi:10.1115/pvp2009-77064', from same example as above
+    id: str | None = None
+
+
+@dataclass(slots=True, kw_only=True)
 class OpenAccess:
     is_oa: bool
     oa_status: Literal["diamond", "gold", "green", "hybrid", "bronze", "closed"]
-    oa_url: str | None
+    oa_url: str | None = None
     any_repository_has_fulltext: bool
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Grant:
-    funder: str | None
-    funder_display_name: str | None
-    award_id: str | None
+    funder: str | None = None
+    funder_display_name: str | None = None
+    award_id: str | None = None
 
 
 # UNDOCUMENTED! work.funders field is a list of these?
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class DehydratedFunder:
-    id: str | None  # openalex id of the funder
-    display_name: str | None  # name of the funder
-    ror: str | None  # ror id of the funder
+    shared_by_id: ClassVar[bool] = True
 
+    id: str | None = None  # openalex id of the funder
+    display_name: str | None = None  # name of the funder
+    ror: str | None = None  # ror id of the funder
 
-@dataclass
-class Domain(BaseOpenAlex): ...
 
+@dataclass(slots=True, kw_only=True)
+class Domain(BaseOpenAlex):
+    shared_by_id = True
+    interned_fields = frozenset({"id", "display_name"})
 
-@dataclass
-class Field(BaseOpenAlex): ...
 
+@dataclass(slots=True, kw_only=True)
+class Field(BaseOpenAlex):
+    shared_by_id = True
+    interned_fields = frozenset({"id", "display_name"})
 
-@dataclass
-class Subfield(BaseOpenAlex): ...
 
+@dataclass(slots=True, kw_only=True)
+class Subfield(BaseOpenAlex):
+    shared_by_id = True
+    interned_fields = frozenset({"id", "display_name"})
 
-@dataclass
+
+@dataclass(slots=True, kw_only=True)
 class TopicMinimal(BaseOpenAlex): ...
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class DehydratedTopic(BaseOpenAlex):
     score: float
     subfield: Subfield
@@ -401,16 +462,16 @@ class DehydratedTopic(BaseOpenAlex):
     domain: Domain
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class TopicCount(BaseOpenAlex):
     count: int
-    score: float | None  # not documented? often missing?
+    score: float | None = None  # not documented? often missing?
     subfield: Subfield
     field: Field
     domain: Domain
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class TopicShare(BaseOpenAlex):
     value: float
     subfield: Subfield
@@ -418,38 +479,40 @@ class TopicShare(BaseOpenAlex):
     domain: Domain
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class SDG(BaseOpenAlex):
+    interned_fields = frozenset({"id", "display_name"})
+
     score: float
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class DehydratedKeyword(BaseOpenAlex):
     score: float
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class CitationNormalizedPercentile:
     value: float
     is_in_top_1_percent: bool
     is_in_top_10_percent: bool
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class YearCountBasic:
-    year: int | None
-    cited_by_count: int | None
+    year: int | None = None
+    cited_by_count: int | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class YearCount:
-    year: int | None
-    cited_by_count: int | None
-    works_count: int | None
-    oa_works_count: int | None  # undocumented field!!
+    year: int | None = None
+    cited_by_count: int | None = None
+    works_count: int | None = None
+    oa_works_count: int | None = None  # undocumented field!!
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class SummaryStats:
     """
     This class is not used directly:
@@ -463,31 +526,33 @@ class SummaryStats:
     i10_index: int
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Society:
-    url: str | None
-    organization: str | None
+    url: str | None = None
+    organization: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Geo:
-    city: str | None
-    geonames_city_id: str | None
-    region: str | None
-    country_code: str | None  # ISO 3166-1 alpha-2 country code
-    country: str | None
-    latitude: float | None
-    longitude: float | None
+    interned_fields: ClassVar[frozenset[str]] = frozenset({"country_code", "country"})
 
+    city: str | None = None
+    geonames_city_id: str | None = None
+    region: str | None = None
+    country_code: str | None = None  # ISO 3166-1 alpha-2 country code
+    country: str | None = None
+    latitude: float | None = None
+    longitude: float | None = None
 
-@dataclass
+
+@dataclass(slots=True, kw_only=True)
 class Role:
     role: Literal["funder", "publisher", "institution"]
     id: str
-    works_count: int | None
+    works_count: int | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class International:
     """
     Container for localized display labels in OpenAlex.
@@ -500,11 +565,11 @@ class International:
 
     """
 
-    display_name: dict[str, str] | None
-    description: dict[str, str] | None  # this 'description' key is undocumented!
+    display_name: dict[str, str] | None = None
+    description: dict[str, str] | None = None  # this 'description' key is undocumented!
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class HasContent:  # undocumented field for Work entity?
     pdf: bool
     grobid_xml: bool
@@ -515,11 +580,11 @@ class HasContent:  # undocumented field for Work entity?
 # ----------------------------------------------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Keyword(BaseOpenAlex): ...
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Topic(BaseOpenAlex):
     description: str
     ids: TopicIds
@@ -530,10 +595,10 @@ class Topic(BaseOpenAlex):
     siblings: list[TopicMinimal]
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Author(BaseOpenAlex):
     ids: AuthorIds
-    orcid: str | None
+    orcid: str | None = None
 
     summary_stats: dict[
         str, float | int
@@ -550,8 +615,10 @@ class Author(BaseOpenAlex):
     topic_share: list[TopicShare | None]
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Source(BaseOpenAlex):
+    interned_fields = frozenset({"country_code"})
+
     ids: SourceIds
     is_core: bool
     is_in_doaj: bool
@@ -561,40 +628,42 @@ class Source(BaseOpenAlex):
     ]  # see SummaryStats -- cannot use directly due to naming issue with 2yr_mean_citedness
     type: SourceType
 
-    abbreviated_title: str | None
-    alternate_titles: list[str | None] | None
-    apc_prices: list[APCEntry | None] | None
-    apc_usd: int | None
-    country_code: str | None  # ISO 3166-1 alpha-2 country code
+    abbreviated_title: str | None = None
+    alternate_titles: list[str | None] | None = None
+    apc_prices: list[APCEntry | None] | None = None
+    apc_usd: int | None = None
+    country_code: str | None = None  # ISO 3166-1 alpha-2 country code
     counts_by_year: list[YearCount | None]
-    homepage_url: str | None
-    host_organization: str | None
+    homepage_url: str | None = None
+    host_organization: str | None = None
     host_organization_lineage: list[str | None]
-    host_organization_name: str | None
-    issn: list[str | None] | None
-    issn_l: str | None
-    societies: list[Society | None] | None
+    host_organization_name: str | None = None
+    issn: list[str | None] | None = None
+    issn_l: str | None = None
+    societies: list[Society | None] | None = None
     # sometimes missing, e.g. https://openalex.org/S4210223070
-    x_concepts: list[DehydratedConcept | None] | None
+    x_concepts: list[DehydratedConcept | None] | None = None
 
     # UNDOCUMENTED FIELDS
-    is_indexed_in_scopus: bool | None
+    is_indexed_in_scopus: bool | None = None
     topics: list[TopicCount | None]
     topic_share: list[TopicShare | None]
-    relevance_score: float | None
-    oa_flip_year: int | None
-    is_high_oa_rate: bool | None
-    is_ojs: bool | None
-    is_in_scielo: bool | None
-    is_high_oa_rate_since_year: int | None
-    is_in_doaj_since_year: int | None
-    oa_works_count: int | None
-    last_publication_year: int | None
-    first_publication_year: int | None
-
-
-@dataclass
+    relevance_score: float | None = None
+    oa_flip_year: int | None = None
+    is_high_oa_rate: bool | None = None
+    is_ojs: bool | None = None
+    is_in_scielo: bool | None = None
+    is_high_oa_rate_since_year: int | None = None
+    is_in_doaj_since_year: int | None = None
+    oa_works_count: int | None = None
+    last_publication_year: int | None = None
+    first_publication_year: int | None = None
+
+
+@dataclass(slots=True, kw_only=True)
 class Institution(BaseOpenAlex):
+    interned_fields = frozenset({"country_code"})
+
     ids: InstitutionIds
     is_super_system: bool
     summary_stats: dict[
@@ -602,68 +671,69 @@ class Institution(BaseOpenAlex):
     ]  # see SummaryStats -- cannot use directly due to naming issue with 2yr_mean_citedness
     type: InstitutionType
 
-    associated_institutions: list[RelatedInstitution | None] | None
-    country_code: str | None  # ISO 3166-1 alpha-2 country code
+    associated_institutions: list[RelatedInstitution | None] | None = None
+    country_code: str | None = None  # ISO 3166-1 alpha-2 country code
     counts_by_year: list[YearCount | None]
     display_name_acronyms: list[str | None]
     display_name_alternatives: list[str | None]
-    geo: Geo | None
-    homepage_url: str | None
-    image_thumbnail_url: str | None
-    image_url: str | None
-    international: International | None
+    geo: Geo | None = None
+    homepage_url: str | None = None
+    image_thumbnail_url: str | None = None
+    image_url: str | None = None
+    international: International | None = None
 
-    lineage: list[str | None] | None
+    lineage: list[str | None] | None = None
 
     repositories: list[Repository | None]
     roles: list[Role | None]
-    ror: str | None
+    ror: str | None = None
 
     # sometimes missing, e.g. https://openalex.org/I4210128891
-    x_concepts: list[DehydratedConcept | None] | None
+    x_concepts: list[DehydratedConcept | None] | None = None
 
     # UNDOCUMENTED FIELDS
-    type_id: str | None
+    type_id: str | None = None
     topics: list[TopicCount | None]
     topic_share: list[TopicShare | None]
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Publisher(BaseOpenAlex):
-    hierarchy_level: (
-        int | None
-    )  # !! found 'None' value in api data, e.g. https://openalex.org/P4404660908
+    interned_fields = frozenset({"country_codes"})
+
+    # !! found 'None' value in api data, e.g. https://openalex.org/P4404660908
+    hierarchy_level: int | None = None
     ids: PublisherIds
     sources_api_url: str
-    summary_stats: (
-        dict[str, float | int] | None
-    )  # see SummaryStats -- cannot use directly due to naming issue with 2yr_mean_citedness
+    # see SummaryStats -- cannot use directly due to naming issue with 2yr_mean_citedness
     # also, seems to be missing sometimes? e.g. https://openalex.org/P4310316202
+    summary_stats: dict[str, float | int] | None = None
 
     alternate_titles: list[str | None]
-    country_codes: (
-        list[str | None] | None
-    )  # sometimes missing, e.g. https://openalex.org/P4361730451
+    # sometimes missing, e.g. https://openalex.org/P4361730451
+    country_codes: list[str | None] | None = None
 
     counts_by_year: list[YearCount | None]
-    image_thumbnail_url: str | None
-    image_url: str | None
+    image_thumbnail_url: str | None = None
+    image_url: str | None = None
 
     # sometimes missing, see https://openalex.org/P4320800631
-    lineage: list[str | None] | None
+    lineage: list[str | None] | None = None
 
     # !! undocumented value: not just the name -- but a dict with 'id' and 'display_name' keys!
-    parent_publisher: BaseOpenAlex | None
+    parent_publisher: BaseOpenAlex | None = None
 
     # sometimes missing completely, e.g. https://openalex.org/P4376884348
-    roles: list[Role | None] | None
+    roles: list[Role | None] | None = None
 
     # UNDOCUMENTED FIELDS
-    homepage_url: str | None
+    homepage_url: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Funder(BaseOpenAlex):
+    interned_fields = frozenset({"country_code"})
+
     ids: FunderIds
     grants_count: int
     summary_stats: dict[
@@ -671,47 +741,49 @@ class Funder(BaseOpenAlex):
     ]  # see SummaryStats -- cannot use directly due to naming issue with 2yr_mean_citedness
     # had to add | None because sometimes one of the stats is null, e.g. https://openalex.org/F4320319847
     alternate_titles: list[str | None]
-    country_code: str | None
+    country_code: str | None = None
     counts_by_year: list[YearCount | None]
-    description: str | None
-    homepage_url: str | None
-    image_thumbnail_url: str | None
-    image_url: str | None
+    description: str | None = None
+    homepage_url: str | None = None
+    image_thumbnail_url: str | None = None
+    image_url: str | None = None
     roles: list[Role | None]
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Concept(BaseOpenAlex):
     ids: ConceptIds
     level: int
-    summary_stats: dict[str, float | int] | None  # seems to be empty?
+    summary_stats: dict[str, float | int] | None = None  # seems to be empty?
     wikidata: str
 
-    counts_by_year: list[YearCount | None] | None  # seems to be empty?
-    description: str | None
+    counts_by_year: list[YearCount | None] | None = None  # seems to be empty?
+    description: str | None = None
 
-    international: International | None
+    international: International | None = None
 
     # !! Related concepts have 'wikidata' == None, shouldn't happen!
     # also, if empty, is None instead of [], e.g. https://openalex.org/C65148998
 
-    related_concepts: list[DehydratedConcept | None] | None
+    related_concepts: list[DehydratedConcept | None] | None = None
 
     # UNDOCUMENTED FIELDS
-    image_url: str | None
-    image_thumbnail_url: str | None
+    image_url: str | None = None
+    image_thumbnail_url: str | None = None
 
     # sometimes empty (null) even though not level 0, e.g. https://openalex.org/C94727143
-    ancestors: list[SimpleDehydratedConcept | None] | None
+    ancestors: list[SimpleDehydratedConcept | None] | None = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Work(BaseOpenAlex):
+    interned_fields = frozenset({"language", "license"})
+
     # core fields
-    title: str | None
+    title: str | None = None
     publication_year: int
     publication_date: str  # YYYY-MM-DD
-    doi: str | None
+    doi: str | None = None
     ids: WorkIds
     type: WorkType
     open_access: OpenAccess
@@ -719,7 +791,7 @@ class Work(BaseOpenAlex):
     # bools
     # should never be None, but got results with this missing, e.g. https://openalex.org/W3028709719
 
-    has_fulltext: bool | None
+    has_fulltext: bool | None = None
     is_paratext: bool
     is_retracted: bool
 
@@ -731,50 +803,59 @@ class Work(BaseOpenAlex):
 
     # UNDOCUMENTED FIELDS
     # examples with these fields: https://openalex.org/W2024107613
-    institution_assertions: list[str | None] | None
-    funders: list[DehydratedFunder | None] | None
-    institutions: list[DehydratedInstitution | None] | None
-    is_xpac: bool | None
-    awards: list[str | None] | None
+    institution_assertions: list[str | None] | None = None
+    funders: list[DehydratedFunder | None] | None = None
+    institutions: list[DehydratedInstitution | None] | None = None
+    is_xpac: bool | None = None
+    awards: list[str | None] | None = None
 
     # nested fields
-    abstract_inverted_index: dict[str, list[int]] | None
+    abstract_inverted_index: dict[str, list[int]] | None = None
     authorships: list[Authorship | None]
-    apc_list: APCData | None
-    apc_paid: APCData | None
-    best_oa_location: Location | None
-    biblio: Biblio | None
-    citation_normalized_percentile: CitationNormalizedPercentile | None
-    cited_by_api_url: str | None
+    apc_list: APCData | None = None
+    apc_paid: APCData | None = None
+    best_oa_location: Location | None = None
+    biblio: Biblio | None = None
+    citation_normalized_percentile: CitationNormalizedPercentile | None = None
+    cited_by_api_url: str | None = None
     concepts: list[DehydratedConcept | None]
     corresponding_author_ids: list[str | None]
     corresponding_institution_ids: list[str | None]
     counts_by_year: list[YearCountBasic | None]
-    fulltext_origin: Literal["pdf", "ngrams"] | None
-    fwci: float | None
+    fulltext_origin: Literal["pdf", "ngrams"] | None = None
+    fwci: float | None = None
     grants: list[Grant | None]
     indexed_in: list[
         Literal["arxiv", "crossref", "doaj", "pubmed", "datacite"] | None
     ]  # !! datacite is undocumented!
     keywords: list[DehydratedKeyword | None]
-    language: str | None
-    license: str | None
+    language: str | None = None
+    license: str | None = None
     locations: list[Location | None]
     mesh: list[Mesh | None]
-    primary_location: Location | None
-    primary_topic: DehydratedTopic | None
+    primary_location: Location | None = None
+    primary_topic: DehydratedTopic | None = None
     referenced_works: list[str | None]
     related_works: list[str | None]
     sustainable_development_goals: list[SDG | None]
     topics: list[DehydratedTopic | None]
-    type_crossref: WorkTypeCrossref | None
-    has_content: HasContent | None
+    type_crossref: WorkTypeCrossref | None = None
+    has_content: HasContent | None = None
 
     # is none when publication_year == current year apparently
-    cited_by_percentile_year: dict[str, int] | None
-    datasets: list | None  # ?
-    versions: list[str | None] | None  # ?
-    referenced_works_count: int | None
+    cited_by_percentile_year: dict[str, int] | None = None
+    datasets: list | None = None  # ?
+    versions: list[str | None] | None = None  # ?
+    referenced_works_count: int | None = None
+
+    def get_journals(self) -> list[DehydratedSource]:
+        """Return the journals this work is published in, taken from its locations (without duplicates)."""
+        journals: dict[str | None, DehydratedSource] = {}
+        for location in self.locations:
+            source = location.source if location is not None else None
+            if source is not None and source.type == "journal":
+                journals.setdefault(source.id, source)
+        return list(journals.values())
 
 
 # ----------------------------------------------------------------------------------------------------------------
@@ -783,40 +864,154 @@ class Work(BaseOpenAlex):
 T = TypeVar("T", bound=BaseOpenAlex)
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Meta:
     count: int
     db_response_time_ms: int
-    page: int
+    page: int | None = None  # null when using cursor paging
     per_page: int
-    groups_count: int | None
-    next_cursor: str | None
+    groups_count: int | None = None
+    next_cursor: str | None = None
 
     @classmethod
     def from_dict(cls, data: dict) -> Meta:
-        return from_dict(data_class=cls, data=data, config=default_dacite_config)
+        return parsing.from_dict(
+            data_class=cls, data=data, config=default_dacite_config
+        )
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Response(Generic[T]):
     meta: Meta
     results: list[T | None]
 
     @classmethod
-    def from_dict(cls, data: dict, result_type: type[T] | None) -> "Response[T]":
+    def from_dict(
+        cls, data: dict, result_type: type[T] | None, lazy: bool = False
+    ) -> Response[T]:
         raw_meta = data.get("meta")
         if raw_meta is None:
             raise ValueError("Missing 'meta' field in response data")
         meta = Meta.from_dict(raw_meta)
         raw_results = data.get("results", [])
         if result_type:
+            parse = parsing.lazy_from_dict if lazy else parsing.from_dict
             parsed = [
                 None
                 if r is None
-                else from_dict(
-                    data_class=result_type, data=r, config=default_dacite_config
-                )
+                else parse(result_type, r, config=default_dacite_config)
                 for r in raw_results
             ]
             return cls(meta=meta, results=parsed)  # pyright: ignore[reportArgumentType]
         return from_dict(data_class=cls, data=data, config=default_dacite_config)
+
+    @classmethod
+    def from_json(cls, data: bytes | str, result_type: type[T]) -> Response[T]:
+        """
+        Decode a raw response body straight into a page of `result_type` entities,
+        skipping the intermediate dict that `from_dict` works on. See `parsing.from_json`.
+        """
+        return parsing.from_json(Response[result_type], data)
+
+
+@dataclass(slots=True, kw_only=True)
+class Group:
+    """
+    A single group of a `group_by` query: the value of the grouped field, and the number of results with it.
+    Keys of entity fields are OpenAlex urls, with the name of the entity as `key_display_name`.
+    """
+
+    key: str | int | float | bool
+    key_display_name: str | None = None
+    count: int
+
+
+@dataclass(slots=True, kw_only=True)
+class GroupedResponse:
+    """A page of groups, see `endpoints.GroupBy`. `Meta.count` is the number of results over all groups."""
+
+    meta: Meta
+    group_by: list[Group]
+
+    @classmethod
+    def from_json(cls, data: bytes | str) -> GroupedResponse:
+        return parsing.from_json(cls, data)
+
+
+# ----------------------------------------------------------------------------------------------------------------
+# Partial entities
+# ----------------------------------------------------------------------------------------------------------------
+
+
+class Partial:
+    """
+    Base class of the partial entity types made by `partial_type`, for responses restricted with `select=`.
+    """
+
+    __slots__ = ()
+    # the full entity class this is a partial variant of
+    __partial_of__: ClassVar[type]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Self:
+        return parsing.from_dict(
+            data_class=cls, data=data, config=default_dacite_config
+        )
+
+    @classmethod
+    def from_json(cls, data: bytes | str) -> Self:
+        return parsing.from_json(cls, data)
+
+
+def partial_type(data_class: type, fields: Iterable[str]) -> type[Partial]:
+    """
+    Return a slotted dataclass with only the given fields of `data_class`, with the same types and defaults.
+    Fields that are required in the entity stay required, so a partial type validates a `select=` response
+    just as strictly as the full entity validates a complete one.
+
+    The types are generated once per entity and set of fields, e.g. `partial_type(Work, ["id", "doi"])`:
+    `PartialWork(id=..., doi=...)`.
+    """
+    wanted = set(fields)
+    unknown = wanted - {f.name for f in dataclasses.fields(data_class)}
+    if unknown:
+        raise ValueError(f"unknown fields for {data_class.__name__}: {sorted(unknown)}")
+    return _partial_type(
+        data_class,
+        tuple(f.name for f in dataclasses.fields(data_class) if f.name in wanted),
+    )
+
+
+@functools.cache
+def _partial_type(data_class: type, names: tuple[str, ...]) -> type[Partial]:
+    hints = get_type_hints(data_class)
+    specs = []
+    for f in dataclasses.fields(data_class):
+        if f.name not in names:
+            continue
+        if f.default is not dataclasses.MISSING:
+            specs.append((f.name, hints[f.name], dataclasses.field(default=f.default)))
+        elif f.default_factory is not dataclasses.MISSING:
+            specs.append(
+                (
+                    f.name,
+                    hints[f.name],
+                    dataclasses.field(default_factory=f.default_factory),
+                )
+            )
+        else:
+            specs.append((f.name, hints[f.name]))
+    partial = dataclasses.make_dataclass(
+        f"Partial{data_class.__name__}",
+        specs,
+        bases=(Partial,),
+        slots=True,
+        kw_only=True,
+        module=data_class.__module__,
+    )
+    partial.__qualname__ = f"Partial{data_class.__name__}[{', '.join(names)}]"
+    partial.__partial_of__ = data_class
+    partial.interned_fields = getattr(
+        data_class, "interned_fields", frozenset()
+    ) & frozenset(names)
+    return partial
@@ -0,0 +1,408 @@
+"""
+aletheca.frames
+
+convert OpenAlex data straight into polars DataFrames, without building per-row Python objects
+
+The schema of each frame is fixed, and derived once from the type hints of the dataclasses in `aletheca.entities`:
+nested dataclasses become struct columns, lists become list columns, and `Literal` types become `pl.Enum` columns.
+Raw response bodies are parsed by polars' own JSON reader directly into that schema.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import io
+import re
+from collections.abc import Iterable, Mapping
+from types import NoneType, UnionType
+from typing import Any, Literal, Union, get_args, get_origin, get_type_hints
+
+import msgspec
+import polars as pl
+
+from aletheca.entities import Group, SummaryStats
+from aletheca.utils import (
+    _ID_PATTERNS,
+    IdType,
+    _reading_order,
+)
+
+# Fields typed as `dict[str, ...]` in the entities, but with a fixed set of keys in the API data.
+# Other dict fields (like `abstract_inverted_index` or the `International` labels) have free-form keys:
+# they have no fixed schema and are left out of the frames.
+KNOWN_DICT_FIELDS: dict[str, pl.DataType] = {
+    "summary_stats": pl.Struct(
+        {
+            "2yr_mean_citedness": pl.Float64,  # `SummaryStats.two_yr_mean_citedness`
+            **{
+                f.name: pl.Int64
+                for f in dataclasses.fields(SummaryStats)
+                if f.name != "two_yr_mean_citedness"
+            },
+        }
+    ),
+    "cited_by_percentile_year": pl.Struct({"min": pl.Int64, "max": pl.Int64}),
+}
+
+_PRIMITIVES: dict[type, pl.DataType] = {
+    str: pl.String(),
+    int: pl.Int64(),
+    float: pl.Float64(),
+    bool: pl.Boolean(),
+}
+
+
+def polars_dtype(tp: Any) -> pl.DataType | None:
+    """
+    Return the polars dtype for a type hint as used in `aletheca.entities`,
+    or None if the type has no fixed columnar representation.
+    """
+    if tp in _PRIMITIVES:
+        return _PRIMITIVES[tp]
+    origin = get_origin(tp)
+    args = get_args(tp)
+    if origin is Literal:
+        if all(isinstance(arg, str) for arg in args):
+            return pl.Enum(list(args))
+        return polars_dtype(type(args[0]))
+    if origin is Union or origin is UnionType:
+        members = [arg for arg in args if arg is not NoneType]
+        if len(members) == 1:
+            return polars_dtype(members[0])
+        dtypes = [polars_dtype(member) for member in members]
+        if any(dtype is None for dtype in dtypes):
+            return None
+        # mixed scalars, like `int | str` ids or `float | int` stats: use the widest
+        if pl.String() in dtypes or any(isinstance(dtype, pl.Enum) for dtype in dtypes):
+            return pl.String()
+        if pl.Float64() in dtypes:
+            return pl.Float64()
+        return dtypes[0]
+    if origin is list:
+        inner = polars_dtype(args[0]) if args else None
+        return None if inner is None else pl.List(inner)
+    if dataclasses.is_dataclass(tp):
+        return pl.Struct(polars_schema(tp))
+    return None
+
+
+def _is_dict(tp: Any) -> bool:
+    if get_origin(tp) is Union or get_origin(tp) is UnionType:
+        return any(_is_dict(arg) for arg in get_args(tp))
+    return tp is dict or get_origin(tp) is dict
+
+
+@functools.cache
+def polars_schema(data_class: type) -> pl.Schema:
+    """
+    Return the polars schema for an entity dataclass. Fields without a fixed columnar representation
+    (free-form dicts, untyped lists) are left out, see `KNOWN_DICT_FIELDS`.
+    """
+    hints = get_type_hints(data_class)
+    schema: dict[str, pl.DataType] = {}
+    for f in dataclasses.fields(data_class):
+        if _is_dict(hints[f.name]):
+            dtype = KNOWN_DICT_FIELDS.get(f.name)
+        else:
+            dtype = polars_dtype(hints[f.name])
+        if dtype is not None:
+            schema[f.name] = dtype
+    return pl.Schema(schema)
+
+
+def _page_frame(body: bytes | str, schema: pl.Schema) -> pl.DataFrame:
+    if isinstance(body, str):
+        body = body.encode()
+    page = pl.read_json(
+        io.BytesIO(body), schema={"results": pl.List(pl.Struct(schema))}
+    )
+    return (
+        page.select(pl.col("results").explode())
+        .filter(pl.col("results").is_not_null())
+        .unnest("results")
+    )
+
+
+def frame_from_json(
+    pages: bytes | str | Iterable[bytes | str], result_type: type
+) -> pl.DataFrame:
+    """
+    Parse one or more raw API response bodies (`{"meta": ..., "results": [...]}`) into a single DataFrame
+    with one row per entity and the schema of `result_type`.
+
+    Values that do not fit the schema raise polars errors, e.g. an unknown value for a `Literal` field.
+    """
+    schema = polars_schema(result_type)
+    if isinstance(pages, (bytes, str)):
+        pages = [pages]
+    frames = [_page_frame(body, schema) for body in pages]
+    if not frames:
+        return pl.DataFrame(schema=schema)
+    return pl.concat(frames, how="vertical", rechunk=True)
+
+
+def frame_from_dicts(
+    records: Iterable[Mapping[str, Any]], result_type: type
+) -> pl.DataFrame:
+    """Build a DataFrame with the schema of `result_type` from already decoded API records."""
+    return pl.DataFrame(list(records), schema=polars_schema(result_type), strict=False)
+
+
+def frame_from_entities(entities: Iterable[Any], result_type: type) -> pl.DataFrame:
+    """Build a DataFrame with the schema of `result_type` from parsed entities (e.g. the results of a `Page`)."""
+    return frame_from_dicts(msgspec.to_builtins(list(entities)), result_type)
+
+
+# --------
+# abstracts
+# --------
+
+# an `abstract_inverted_index` column with a list of (word, positions) per row; a map column read from
+# parquet or arrow (a list of (key, value) structs) has the same shape
+INVERTED_INDEX_DTYPE = pl.List(
+    pl.Struct({"word": pl.String, "positions": pl.List(pl.Int64)})
+)
+
+# number of rows of a struct column that are unpivoted at once in `abstracts`
+_STRUCT_CHUNK_ROWS = 1024
+
+# (row, word, position) triples that `abstracts` scatters
+_WORDS_SCHEMA = {"row": pl.UInt32, "word": pl.String, "position": pl.Int64}
+
+
+def _by_row(frame: pl.DataFrame, n: int) -> pl.DataFrame:
+    """Left-join `frame` on its `row` column to the rows 0..n-1, rows it doesn't have are null."""
+    return pl.DataFrame({"row": pl.int_range(n, dtype=pl.UInt32, eager=True)}).join(
+        frame, on="row", how="left", maintain_order="left"
+    )
+
+
+def _list_words(inverted: pl.Series) -> pl.DataFrame:
+    entries = inverted.rename("entry").to_frame().with_row_index("row").explode("entry")
+    # the fields are taken by position, so map columns (key, value) work as well
+    word, positions = entries.schema["entry"].fields
+    return (
+        entries.unnest("entry")
+        .select("row", word=word.name, position=positions.name)
+        .explode("position")
+        .drop_nulls("position")
+        .cast({"position": pl.Int64})
+    )
+
+
+def _struct_words(inverted: pl.Series) -> pl.DataFrame:
+    # a struct column has a field for every word of the column: only the words that occur in a chunk are
+    # unpivoted, so the cells stay proportional to the words of the chunk rather than to the vocabulary
+    chunks = []
+    for start in range(0, len(inverted), _STRUCT_CHUNK_ROWS):
+        chunk = inverted.slice(start, _STRUCT_CHUNK_ROWS).struct.unnest()
+        present = [
+            name
+            for name, nulls in zip(
+                chunk.columns, chunk.null_count().row(0), strict=True
+            )
+            if nulls < chunk.height
+        ]
+        if present:
+            chunks.append(
+                chunk.select(present)
+                .with_row_index("row", offset=start)
+                .unpivot(index="row", variable_name="word", value_name="position")
+                .drop_nulls("position")
+                .explode("position")
+                .drop_nulls("position")
+            )
+    return pl.concat(chunks) if chunks else pl.DataFrame(schema=_WORDS_SCHEMA)
+
+
+def abstracts(inverted: pl.Series) -> pl.Series:
+    """
+    Rebuild the abstracts from an `abstract_inverted_index` column: either a list of (word, positions) per row
+    (`INVERTED_INDEX_DTYPE`, like a map column read from parquet), or the struct column polars infers when
+    reading raw works (one field per word, holding the list of positions of that word). Rows without an
+    index give null.
+
+    The column is flattened into (row, word, position) triples, and the words of all rows are scattered
+    straight to their positions in a single buffer, instead of sorting the words of every abstract (see
+    `utils.parse_inverted_abstracts`, which does the same for dicts). A list column is flattened in time
+    proportional to its number of words. A struct column is unpivoted in chunks of rows, over the words that
+    occur in each chunk; the struct itself has a field per word of the whole column though, so it grows with
+    rows x vocabulary when it is read, and the list column is the one to use for large batches.
+    """
+    n = len(inverted)
+    if isinstance(inverted.dtype, pl.List):
+        words = _list_words(inverted)
+    elif isinstance(inverted.dtype, pl.Struct) and inverted.dtype.fields:
+        words = _struct_words(inverted)
+    else:
+        words = pl.DataFrame(schema=_WORDS_SCHEMA)
+    if words.is_empty():
+        return pl.Series(inverted.name, [None] * n, dtype=pl.String)
+    rows = words["row"].to_numpy()
+    order, _ = _reading_order(rows, words["position"].to_numpy(), n)
+    text = (
+        pl.DataFrame({"row": rows[order], "word": words["word"].gather(order)})
+        .group_by("row", maintain_order=True)
+        .agg(pl.col("word").str.join(" "))
+    )
+    return _by_row(text, n)["word"].rename(inverted.name)
+
+
+def abstract_expr(column: str = "abstract_inverted_index") -> pl.Expr:
+    """
+    Expression that rebuilds the abstracts from an `abstract_inverted_index` column, see `abstracts`.
+
+        works.with_columns(abstract=abstract_expr())
+    """
+    return pl.col(column).map_batches(abstracts, return_dtype=pl.String)
+
+
+# --------
+# identifiers
+# --------
+
+# the patterns of `utils._ID_PATTERNS`, as full matches (ignoring surrounding whitespace) for polars' regex engine
+
+
+def _anchored(pattern: re.Pattern[str]) -> str:
+    return rf"(?i)^\s*(?:{pattern.pattern})\s*$"
+
+
+def _named(id_type: IdType, pattern: re.Pattern[str]) -> str:
+    # name the (single) capturing group after its id type
+    return re.sub(r"\((?!\?)", f"(?P<{id_type}>", pattern.pattern, count=1)
+
+
+# one alternation of all id types, tried in the order of `utils.determine_id_type`, so a single regex pass
+# gives both the type and the short id
+_ANY_ID = r"(?i)^\s*(?:{})\s*$".format(
+    "|".join(_named(id_type, pattern) for id_type, pattern in _ID_PATTERNS.items())
+)
+_DIGITS = r"^\s*\d+\s*$"
+
+ID_TYPE_DTYPE = pl.Enum(list(_ID_PATTERNS))
+
+
+def _column(column: str | pl.Expr) -> pl.Expr:
+    return pl.col(column) if isinstance(column, str) else column
+
+
+def _short_form(id_type: IdType, short: pl.Expr) -> pl.Expr:
+    # same casing rules as `utils.short_id`
+    if id_type == "pmcid":
+        return pl.concat_str(pl.lit("PMC"), short)
+    if id_type in ("doi", "ror"):
+        return short.str.to_lowercase()
+    return short.str.to_uppercase()
+
+
+def short_doi_expr(column: str | pl.Expr) -> pl.Expr:
+    """
+    Expression version of `utils.short_doi`: 10.xxxx/xxxxx, all lowercase. Values that are not a doi give null
+    instead of raising.
+    """
+    return (
+        _column(column)
+        .str.extract(_anchored(_ID_PATTERNS["doi"]), 1)
+        .str.to_lowercase()
+    )
+
+
+def normalize_doi_expr(column: str | pl.Expr) -> pl.Expr:
+    """Expression version of `utils.normalize_doi`; values that are not a doi give null."""
+    return pl.concat_str(pl.lit("https://doi.org/"), short_doi_expr(column))
+
+
+def id_type_expr(column: str | pl.Expr) -> pl.Expr:
+    """
+    Expression version of `utils.determine_id_type`, as a `pl.Enum` of the id types. Unknown and ambiguous
+    (bare number) ids give null instead of raising.
+    """
+    groups = _column(column).str.extract_groups(_ANY_ID)
+    found = pl.coalesce(
+        pl.when(groups.struct.field(id_type).is_not_null()).then(pl.lit(id_type))
+        for id_type in _ID_PATTERNS
+    )
+    return (
+        pl.when(~_column(column).str.contains(_DIGITS)).then(found).cast(ID_TYPE_DTYPE)
+    )
+
+
+def short_id_expr(column: str | pl.Expr, id_type: IdType | None = None) -> pl.Expr:
+    """
+    Expression version of `utils.short_id`. Without `id_type`, the type of each value is determined as in
+    `id_type_expr`, so a column can mix types. Invalid, unknown and ambiguous ids give null.
+    """
+    if id_type is not None:
+        short = _column(column).str.extract(_anchored(_ID_PATTERNS[id_type]), 1)
+        return _short_form(id_type, short)
+    groups = _column(column).str.extract_groups(_ANY_ID)
+    return pl.when(~_column(column).str.contains(_DIGITS)).then(
+        pl.coalesce(
+            _short_form(id_type, groups.struct.field(id_type))
+            for id_type in _ID_PATTERNS
+        )
+    )
+
+
+# --------
+# groups
+# --------
+
+
+def group_key_dtype(result_type: type, field: str) -> pl.DataType:
+    """
+    Return the dtype of the values of a (dotted) `group_by` field of `result_type`, found by following the
+    field through the schema of `result_type` (and into lists); unknown fields and ids are `pl.String`.
+    """
+    dtype: pl.DataType = pl.Struct(polars_schema(result_type))
+    for name in field.split("."):
+        while isinstance(dtype, pl.List):
+            dtype = dtype.inner
+        fields = (
+            {f.name: f.dtype for f in dtype.fields}
+            if isinstance(dtype, pl.Struct)
+            else {}
+        )
+        if name not in fields:
+            return pl.String()
+        dtype = fields[name]
+    while isinstance(dtype, pl.List):
+        dtype = dtype.inner
+    if isinstance(dtype, pl.Struct):
+        return pl.String()
+    return dtype
+
+
+def frame_from_groups(
+    groups: Iterable[Group], key_dtype: pl.DataType | None = None
+) -> pl.DataFrame:
+    """
+    Build a DataFrame with one row per group: `key` (a string, or cast to `key_dtype`, see `group_key_dtype`),
+    `key_display_name` and `count`. The `unknown` group of `include_unknown`, and keys that do not fit
+    `key_dtype`, get a null key.
+    """
+    frame = pl.DataFrame(
+        [
+            # boolean keys as the API writes them in urls
+            (
+                str(g.key).lower() if isinstance(g.key, bool) else str(g.key),
+                g.key_display_name,
+                g.count,
+            )
+            for g in groups
+        ],
+        schema={"key": pl.String, "key_display_name": pl.String, "count": pl.Int64},
+        orient="row",
+    )
+    key = pl.when(pl.col("key") != "unknown").then(pl.col("key"))
+    if key_dtype == pl.Boolean():
+        key = key.replace_strict(
+            {"true": True, "1": True, "false": False, "0": False},
+            default=None,
+            return_dtype=pl.Boolean,
+        )
+    elif key_dtype is not None:
+        key = key.cast(key_dtype, strict=False)
+    return frame.with_columns(key.alias("key"))
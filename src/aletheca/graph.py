@@ -0,0 +1,364 @@
+"""
+aletheca.graph
+
+citation graph of works in compressed sparse row (CSR) form, stored as numpy arrays that are memory-mapped from disk
+
+`GraphBuilder` streams works (entities, or DataFrames from `snapshot.read_snapshot_frames`), and spills their
+edges (`referenced_works`, or `related_works`) to disk in fixed-size chunks, so building never holds more than
+a chunk of edges plus the arrays of the final graph in memory. OpenAlex work ids (`W123`) are mapped to dense
+indices `0..n-1`, in the order of their numeric ids; works that are only referenced are nodes as well.
+
+The graph is saved as `.npy` files in a directory, and `CitationGraph.load` maps them into memory without
+reading them: degrees, neighbours and breadth-first search then only touch the pages they need.
+
+    with GraphBuilder("graph") as builder:
+        for frame in snapshot.read_snapshot_frames(root):
+            builder.add(frame)
+    graph = CitationGraph.load("graph")
+    graph.cited_by("W2741809807")
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from array import array
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Literal, Self
+
+import numpy as np
+import polars as pl
+
+from aletheca.entities import Work
+
+EdgeField = Literal["referenced_works", "related_works"]
+
+# default number of edges per spilled chunk, and per chunk while building the CSR arrays (256 MiB of int64 pairs)
+CHUNK_EDGES = 1 << 24
+
+_ID_PREFIX = "https://openalex.org/W"
+
+
+def _work_number(openalex_id: str) -> int:
+    # numeric part of a work id, in url or short form
+    number = openalex_id.rpartition("/")[2]
+    if number[:1] not in ("W", "w"):
+        raise ValueError(f"not an OpenAlex work id: {openalex_id!r}")
+    return int(number[1:])
+
+
+# --------
+# building
+# --------
+
+
+class GraphBuilder:
+    """
+    Build a `CitationGraph` in `path` from streamed works. Call `finish` (or use the builder as a context
+    manager) to write the graph; the spilled edges are removed afterwards.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        field: EdgeField = "referenced_works",
+        chunk_edges: int = CHUNK_EDGES,
+    ):
+        self.path = Path(path)
+        self.field = field
+        self.chunk_edges = chunk_edges
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._spill = self.path / "build"
+        self._spill.mkdir(exist_ok=True)
+        self._edges = (self._spill / "edges.bin").open("wb")
+        self._works = (self._spill / "works.bin").open("wb")
+        self._edge_buffer = array("q")
+        self._work_buffer = array("q")
+        self.works = 0
+        self.edges = 0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.finish()
+        else:
+            self._close()
+
+    def add(self, works: Iterable[Work] | pl.DataFrame) -> None:
+        """
+        Add a batch of works: entities, or a DataFrame with `id` and the edge field (e.g. from
+        `snapshot.read_snapshot_frames`), which is converted without per-edge Python calls.
+        """
+        if isinstance(works, pl.DataFrame):
+            self._add_frame(works)
+            return
+        for work in works:
+            source = _work_number(work.id)
+            self._work_buffer.append(source)
+            for target in getattr(work, self.field) or ():
+                if target is not None:
+                    self._edge_buffer.append(source)
+                    self._edge_buffer.append(_work_number(target))
+            if len(self._edge_buffer) >= 2 * self.chunk_edges:
+                self._flush()
+        self._flush()
+
+    def _add_frame(self, frame: pl.DataFrame) -> None:
+        number = r"[Ww](\d+)$"
+        edges = (
+            frame.select(
+                source=pl.col("id").str.extract(number).cast(pl.Int64),
+                target=pl.col(self.field),
+            )
+            .explode("target")
+            .drop_nulls("target")
+            .select(
+                "source",
+                target=pl.col("target").str.extract(number).cast(pl.Int64),
+            )
+        )
+        if edges["source"].null_count() or edges["target"].null_count():
+            raise ValueError(f"id or {self.field} holds ids that are not work ids")
+        self._flush()
+        self._works.write(
+            frame["id"].str.extract(number).cast(pl.Int64).to_numpy().tobytes()
+        )
+        self._edges.write(edges.to_numpy(order="c").astype(np.int64).tobytes())
+        self.works += len(frame)
+        self.edges += len(edges)
+
+    def _flush(self) -> None:
+        self._works.write(self._work_buffer.tobytes())
+        self._edges.write(self._edge_buffer.tobytes())
+        self.works += len(self._work_buffer)
+        self.edges += len(self._edge_buffer) // 2
+        self._work_buffer = array("q")
+        self._edge_buffer = array("q")
+
+    def _close(self) -> None:
+        self._edges.close()
+        self._works.close()
+        shutil.rmtree(self._spill, ignore_errors=True)
+
+    def finish(self) -> CitationGraph:
+        """Build the CSR arrays from the spilled edges, write them to `path`, and load the graph."""
+        self._flush()
+        self._edges.close()
+        self._works.close()
+        if self.edges:
+            edges = np.memmap(self._spill / "edges.bin", dtype=np.int64, mode="r")
+            edges = edges.reshape(-1, 2)
+        else:
+            edges = np.empty((0, 2), dtype=np.int64)
+        works = np.fromfile(self._spill / "works.bin", dtype=np.int64)
+
+        # dense indices: the sorted numeric ids of all works, with or without a record
+        ids = np.unique(works)
+        del works
+        for start in range(0, len(edges), self.chunk_edges):
+            ids = np.union1d(ids, edges[start : start + self.chunk_edges, 1])
+        np.save(self.path / "ids.npy", ids)
+        index_dtype = np.int32 if len(ids) < 2**31 else np.int64
+
+        # edges as dense (source, target) indices, chunk by chunk
+        dense = np.lib.format.open_memmap(
+            self._spill / "dense.npy", mode="w+", dtype=index_dtype, shape=edges.shape
+        )
+        for start in range(0, len(edges), self.chunk_edges):
+            chunk = edges[start : start + self.chunk_edges]
+            dense[start : start + len(chunk)] = np.searchsorted(ids, chunk)
+        del edges
+        for direction, (row, column) in (("out", (0, 1)), ("in", (1, 0))):
+            _write_csr(
+                self.path, direction, dense, row, column, len(ids), self.chunk_edges
+            )
+        del dense
+        self._close()
+        return CitationGraph.load(self.path)
+
+
+def _write_csr(
+    path: Path,
+    direction: str,
+    dense: np.ndarray,
+    row: int,
+    column: int,
+    nodes: int,
+    chunk_edges: int,
+) -> None:
+    # counting sort of the edges on their `row` column, one chunk at a time
+    counts = np.zeros(nodes, dtype=np.int64)
+    for start in range(0, len(dense), chunk_edges):
+        counts += np.bincount(dense[start : start + chunk_edges, row], minlength=nodes)
+    indptr = np.zeros(nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    del counts
+    indices = np.lib.format.open_memmap(
+        path / f"{direction}_indices.npy",
+        mode="w+",
+        dtype=dense.dtype,
+        shape=(len(dense),),
+    )
+    cursor = indptr[:-1].copy()
+    for start in range(0, len(dense), chunk_edges):
+        chunk = np.asarray(dense[start : start + chunk_edges])
+        order = np.argsort(chunk[:, row], kind="stable")
+        rows = chunk[order, row]
+        # rank of each edge within its row in this chunk, added to where the row is filled up to so far
+        first = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        sizes = np.diff(np.r_[first, len(rows)])
+        rank = np.arange(len(rows)) - np.repeat(first, sizes)
+        indices[cursor[rows] + rank] = chunk[order, column]
+        cursor[rows[first]] += sizes
+    indices.flush()
+    np.save(path / f"{direction}_indptr.npy", indptr)
+
+
+# --------
+# the graph
+# --------
+
+
+class CitationGraph:
+    """
+    A directed graph of works: edges point from a work to the works it references (or is related to).
+    Nodes are dense indices; `index` and `openalex_id` convert between them and work ids.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        out_indptr: np.ndarray,
+        out_indices: np.ndarray,
+        in_indptr: np.ndarray,
+        in_indices: np.ndarray,
+    ):
+        self.ids = ids
+        self.out_indptr = out_indptr
+        self.out_indices = out_indices
+        self.in_indptr = in_indptr
+        self.in_indices = in_indices
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str], *, mmap: bool = True) -> CitationGraph:
+        """Load a graph written by `GraphBuilder`; with `mmap`, the arrays are mapped instead of read."""
+        mode: Any = "r" if mmap else None
+        return cls(
+            *(
+                np.load(Path(path, f"{name}.npy"), mmap_mode=mode)
+                for name in (
+                    "ids",
+                    "out_indptr",
+                    "out_indices",
+                    "in_indptr",
+                    "in_indices",
+                )
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.out_indices)
+
+    def index(self, openalex_id: str) -> int:
+        """Return the node index of a work id; raises `KeyError` for works that are not in the graph."""
+        number = _work_number(openalex_id)
+        position = int(np.searchsorted(self.ids, number))
+        if position == len(self.ids) or self.ids[position] != number:
+            raise KeyError(openalex_id)
+        return position
+
+    def openalex_id(self, index: int) -> str:
+        return f"{_ID_PREFIX}{self.ids[index]}"
+
+    def openalex_ids(self, indices: np.ndarray) -> list[str]:
+        return [f"{_ID_PREFIX}{number}" for number in self.ids[indices].tolist()]
+
+    def out_degree(self, index: int | None = None) -> int | np.ndarray:
+        """The number of references of a node, or of all nodes as an array."""
+        if index is None:
+            return np.diff(self.out_indptr)
+        return int(self.out_indptr[index + 1] - self.out_indptr[index])
+
+    def in_degree(self, index: int | None = None) -> int | np.ndarray:
+        """The number of citations of a node within the graph, or of all nodes as an array."""
+        if index is None:
+            return np.diff(self.in_indptr)
+        return int(self.in_indptr[index + 1] - self.in_indptr[index])
+
+    def successors(self, index: int) -> np.ndarray:
+        """The indices of the works that a node references."""
+        return self.out_indices[self.out_indptr[index] : self.out_indptr[index + 1]]
+
+    def predecessors(self, index: int) -> np.ndarray:
+        """The indices of the works that reference a node."""
+        return self.in_indices[self.in_indptr[index] : self.in_indptr[index + 1]]
+
+    def references(self, openalex_id: str) -> list[str]:
+        return self.openalex_ids(self.successors(self.index(openalex_id)))
+
+    def cited_by(self, openalex_id: str) -> list[str]:
+        """The works in the graph that cite a work: replaces paging through its `cited_by_api_url`."""
+        return self.openalex_ids(self.predecessors(self.index(openalex_id)))
+
+    def bfs(
+        self,
+        sources: int | Iterable[int],
+        *,
+        direction: Literal["out", "in", "both"] = "out",
+        max_depth: int | None = None,
+    ) -> Iterator[np.ndarray]:
+        """
+        Breadth-first search from one or more node indices: yield the nodes at each depth as an array, starting
+        with the sources at depth 0. Each level is expanded with array operations over the whole frontier.
+        """
+        adjacency = []
+        if direction in ("out", "both"):
+            adjacency.append((self.out_indptr, self.out_indices))
+        if direction in ("in", "both"):
+            adjacency.append((self.in_indptr, self.in_indices))
+        visited = np.zeros(len(self.ids), dtype=bool)
+        if isinstance(sources, int | np.integer):
+            sources = [sources]
+        elif not isinstance(sources, np.ndarray):
+            # generators and other iterators, which `np.asarray` doesn't consume
+            sources = np.fromiter(sources, dtype=np.int64)
+        frontier = np.unique(np.asarray(sources, dtype=np.int64))
+        visited[frontier] = True
+        depth = 0
+        while len(frontier):
+            yield frontier
+            if depth == max_depth:
+                return
+            reached = np.concatenate(
+                [
+                    _neighbours(indptr, indices, frontier)
+                    for indptr, indices in adjacency
+                ]
+            )
+            frontier = np.unique(reached[~visited[reached]])
+            visited[frontier] = True
+            depth += 1
+
+
+def _neighbours(
+    indptr: np.ndarray, indices: np.ndarray, nodes: np.ndarray
+) -> np.ndarray:
+    # all neighbours of `nodes`, gathered with a single fancy index
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return np.asarray(indices[offsets + np.arange(int(lengths.sum()))], dtype=np.int64)
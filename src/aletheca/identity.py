@@ -0,0 +1,144 @@
+"""
+aletheca.identity
+
+identity map that shares one instance per OpenAlex id between all parsed entities
+
+A page of works repeats the same dehydrated sources, institutions, authors, funders and domain/field/subfield
+objects many times. Entity classes marked with `shared_by_id` hold no context-specific data, so within an
+identity map each of them is built once per id and then reused: the generated builders in `aletheca.parsing`
+skip validating and building records they have seen before, and every work holds a reference to the same object.
+
+Full entities (e.g. a `Source` fetched with `Client.get`) can be stored in the same map, so later fetches
+of the same id are served from memory.
+
+Shared instances are the same object everywhere they appear: don't modify them in place.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import functools
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from types import UnionType
+from typing import Any, TypeVar, Union, get_args, get_origin, get_type_hints
+
+from aletheca import parsing
+
+T = TypeVar("T")
+
+
+class IdentityMap:
+    """
+    Maps (entity class, OpenAlex id) to a single instance, keeping the `maxsize` most recently used entries.
+    Safe to share between threads, e.g. with the prefetch thread of `Client.paginate`.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[type, str], Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, data_class: type[T], openalex_id: str | None) -> T | None:
+        if openalex_id is None:
+            return None
+        key = (data_class, openalex_id)
+        with self._lock:
+            obj = self._entries.get(key)
+            if obj is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return obj
+
+    def put(self, obj: T, *, replace: bool = False) -> T:
+        """
+        Store `obj` (if it has an id), and return the instance that is now shared for its id.
+        With `replace`, `obj` takes the place of an instance stored before, e.g. when an entity is fetched again.
+        """
+        openalex_id = getattr(obj, "id", None)
+        if openalex_id is None:
+            return obj
+        key = (type(obj), openalex_id)
+        with self._lock:
+            if replace:
+                self._entries[key] = obj
+            shared = self._entries.setdefault(key, obj)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return shared
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @contextlib.contextmanager
+    def active(self) -> Iterator[IdentityMap]:
+        """Use this map in `parsing.from_dict` (and lazy parsing) within the block."""
+        token = parsing.active_identity_map.set(self)
+        try:
+            yield self
+        finally:
+            parsing.active_identity_map.reset(token)
+
+    def dedupe(self, obj: T) -> T:
+        """
+        Replace the shared entities nested in `obj` (in place) by the instances in this map, storing new ones.
+        Used for entities that were not built by the generated builders, e.g. decoded with `parsing.from_json`:
+        this saves the memory of the duplicates, though not the time to decode them.
+        """
+        return self._dedupe(obj)
+
+    def _dedupe(self, obj: Any) -> Any:
+        if isinstance(obj, list):
+            for index, item in enumerate(obj):
+                obj[index] = self._dedupe(item)
+            return obj
+        data_class = type(obj)
+        if getattr(data_class, "shared_by_id", False):
+            shared = self.get(data_class, obj.id)
+            if shared is not None:
+                return shared
+        for name in _shared_fields(data_class):
+            value = getattr(obj, name)
+            if value is not None:
+                setattr(obj, name, self._dedupe(value))
+        if getattr(data_class, "shared_by_id", False):
+            return self.put(obj)
+        return obj
+
+
+def _may_hold_shared(tp: Any, seen: frozenset[type] = frozenset()) -> bool:
+    origin = get_origin(tp)
+    if origin is Union or origin is UnionType or origin is list:
+        return any(_may_hold_shared(arg, seen) for arg in get_args(tp))
+    if dataclasses.is_dataclass(tp) and tp not in seen:
+        if getattr(tp, "shared_by_id", False):
+            return True
+        hints = get_type_hints(tp)
+        return any(
+            _may_hold_shared(hints[f.name], seen | {tp}) for f in dataclasses.fields(tp)
+        )
+    return False
+
+
+@functools.cache
+def _shared_fields(data_class: type) -> tuple[str, ...]:
+    # the fields of `data_class` that can (indirectly) contain shared entities
+    if not dataclasses.is_dataclass(data_class):
+        return ()
+    hints = get_type_hints(data_class)
+    return tuple(
+        f.name
+        for f in dataclasses.fields(data_class)
+        if _may_hold_shared(hints[f.name], frozenset({data_class}))
+    )
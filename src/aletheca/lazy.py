@@ -0,0 +1,285 @@
+"""
+aletheca.lazy
+
+lazy query objects for common tasks, that only fetch the fields that are actually used
+
+    from aletheca import Works
+
+    works = Works.from_institution(name="University of Twente")
+    journals = []
+    for work in works:
+        journals.extend(work.get_journals())
+
+Creating a query object does not send any request. When iterated, results are requested with a minimal
+`select=` parameter (only `id`, plus any fields named with `.select()`), and yielded as projected entities:
+lazy instances of the entity class that build each field on first access. When a field that was not selected
+is read, the query object records it, fetches it for the current page (by repeating the page request with the
+extended selection), and includes it in the selection of all following pages. In the example above, only
+`id` and `locations` are ever transferred, instead of the full works.
+
+Collection-level helpers (like `Works.get_journals()`) name the fields they need upfront, so even the first
+page is fetched with the right selection.
+"""
+
+from __future__ import annotations
+
+import functools
+from collections.abc import Iterable, Iterator
+from typing import Any, ClassVar, Generic, Self, TypeVar
+
+import msgspec
+
+from aletheca import parsing
+from aletheca.api import Client
+from aletheca.endpoints import (
+    AUTHORS,
+    INSTITUTIONS,
+    SOURCES,
+    WORKS,
+    Endpoint,
+    FilterValue,
+    Query,
+)
+from aletheca.entities import (
+    Author,
+    BaseOpenAlex,
+    DehydratedSource,
+    Institution,
+    Source,
+    Work,
+    default_dacite_config,
+)
+
+T = TypeVar("T", bound=BaseOpenAlex)
+
+_default_client: Client | None = None
+
+
+def default_client() -> Client:
+    """The client used by query objects that were not given one, created on first use."""
+    global _default_client
+    if _default_client is None:
+        _default_client = Client()
+    return _default_client
+
+
+# --------
+# projected entities
+# --------
+
+
+class _Page:
+    """One page of raw results, shared by its projected entities, that can fetch more fields for all of them."""
+
+    def __init__(self, lazy_query: LazyQuery, cursor: str):
+        self.lazy_query = lazy_query
+        self.cursor = cursor
+        self.selected: frozenset[str] = frozenset()
+        self.results: list[dict[str, Any]] = []
+        self.next_cursor: str | None = None
+
+    def load(self) -> None:
+        fields = self.lazy_query.fields | {"id"}
+        data = self.lazy_query.fetch(self.cursor, fields)
+        if not self.results:
+            self.results = [result for result in data["results"] if result is not None]
+        else:
+            # same cursor, so the same results: add the new fields to the raw data the entities already hold
+            by_id = {result["id"]: result for result in data["results"] if result}
+            for result in self.results:
+                result.update(by_id.get(result["id"], {}))
+        self.next_cursor = data["meta"]["next_cursor"] if data["results"] else None
+        self.selected = frozenset(fields)
+
+    def require(self, name: str) -> None:
+        self.lazy_query.fields.add(name)
+        self.load()
+
+
+@functools.cache
+def projected_type(data_class: type[T]) -> type[T]:
+    """
+    Return the projected variant of `data_class`: a lazy instance (see `parsing.lazy_type`) that fetches
+    fields left out by `select=` when they are first read.
+    """
+    base = parsing.lazy_type(data_class)
+    fields = base.__lazy_fields__
+
+    def __getattr__(self: Any, name: str) -> Any:
+        page = self._page
+        if name in fields and name not in page.selected:
+            page.require(name)
+        return base.__getattr__(self, name)
+
+    def __repr__(self: Any) -> str:
+        loaded = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for name in fields
+            if name in self._page.selected
+        )
+        return f"{type(self).__name__}({loaded})"
+
+    namespace = {
+        "__slots__": ("_page",),
+        "__getattr__": __getattr__,
+        "__repr__": __repr__,
+        "__module__": data_class.__module__,
+    }
+    return type(f"Projected{data_class.__name__}", (base,), namespace)
+
+
+def _projected(data_class: type[T], raw: dict[str, Any], page: _Page) -> T:
+    instance = object.__new__(projected_type(data_class))
+    object.__setattr__(instance, "_raw", raw)
+    object.__setattr__(instance, "_config", default_dacite_config)
+    object.__setattr__(instance, "_page", page)
+    return instance
+
+
+# --------
+# lazy queries
+# --------
+
+
+class LazyQuery(Generic[T]):
+    """
+    A lazily evaluated query on an entity endpoint, see the module docs.
+    Like `Query`, the methods return updated copies; the fields that are recorded during iteration are
+    shared by copies made after that point, and kept when iterating again.
+    """
+
+    endpoint: ClassVar[Endpoint]
+
+    def __init__(
+        self,
+        query: Query[T] | None = None,
+        *,
+        client: Client | None = None,
+        fields: Iterable[str] = (),
+    ):
+        self.query: Query[T] = query or self.endpoint.query()
+        self.client = client
+        self.fields: set[str] = set(fields)
+
+    def _copy(self, query: Query[T], fields: Iterable[str] = ()) -> Self:
+        return type(self)(query, client=self.client, fields=self.fields | set(fields))
+
+    def where(self, **filters: FilterValue) -> Self:
+        return self._copy(self.query.where(**filters))
+
+    def select(self, *fields: str) -> Self:
+        """Include `fields` in the selection from the first page on."""
+        unknown = (
+            set(fields)
+            - projected_type(self.query.endpoint.entity).__lazy_fields__.keys()
+        )
+        if unknown:
+            raise ValueError(
+                f"unknown fields for {self.query.endpoint.path}: {unknown}"
+            )
+        return self._copy(self.query, fields)
+
+    def fetch(self, cursor: str, fields: Iterable[str]) -> dict[str, Any]:
+        """Request a single page of raw results with the given selection."""
+        client = self.client or default_client()
+        params = client.page_params(self.query, cursor, None)
+        params["select"] = ",".join(sorted(fields))
+        response = client.request(f"/{self.query.endpoint.path}", params)
+        return msgspec.json.decode(response.content)
+
+    def __iter__(self) -> Iterator[T]:
+        entity = self.query.endpoint.entity
+        cursor: str | None = "*"
+        while cursor:
+            page = _Page(self, cursor)
+            page.load()
+            for raw in page.results:
+                yield _projected(entity, raw, page)
+            cursor = page.next_cursor
+
+
+class Works(LazyQuery[Work]):
+    endpoint = WORKS
+
+    @classmethod
+    def from_institution(
+        cls,
+        id: str | None = None,
+        *,
+        name: str | None = None,
+        client: Client | None = None,
+    ) -> Works:
+        """
+        Works with at least one author affiliated with an institution (or one of its child institutions),
+        given by OpenAlex id or by name. Names are resolved to the best matching institution when iterated.
+        """
+        if (id is None) == (name is None):
+            raise ValueError("give either the id or the name of the institution")
+        return _ByInstitution(id, name, client=client)
+
+    @classmethod
+    def from_author(cls, id: str, *, client: Client | None = None) -> Works:
+        return cls(WORKS.query(**{"authorships.author.id": id}), client=client)
+
+    def get_journals(self) -> Iterator[DehydratedSource]:
+        """Yield the journals of all works, see `Work.get_journals`, fetching only their locations."""
+        for work in self.select("locations"):
+            yield from work.get_journals()
+
+
+class _ByInstitution(Works):
+    """`Works.from_institution`: resolves an institution name to its id on first use."""
+
+    def __init__(
+        self,
+        id: str | None,
+        name: str | None,
+        *,
+        client: Client | None = None,
+        query: Query[Work] | None = None,
+        fields: Iterable[str] = (),
+    ):
+        super().__init__(query, client=client, fields=fields)
+        self.institution_id = id
+        self.institution_name = name
+
+    def _copy(self, query: Query[Work], fields: Iterable[str] = ()) -> Self:
+        return type(self)(
+            self.institution_id,
+            self.institution_name,
+            client=self.client,
+            query=query,
+            fields=self.fields | set(fields),
+        )
+
+    def fetch(self, cursor: str, fields: Iterable[str]) -> dict[str, Any]:
+        if self.institution_id is None:
+            client = self.client or default_client()
+            params = {"search": self.institution_name, "per-page": "1", "select": "id"}
+            results = msgspec.json.decode(
+                client.request(f"/{INSTITUTIONS.path}", params).content
+            )["results"]
+            if not results:
+                raise LookupError(f"no institution found for {self.institution_name!r}")
+            self.institution_id = results[0]["id"]
+        if "authorships.institutions.lineage" not in self.query.filter:
+            self.query = self.query.where(
+                **{
+                    "authorships.institutions.lineage": self.institution_id.rsplit(
+                        "/", 1
+                    )[-1]
+                }
+            )
+        return super().fetch(cursor, fields)
+
+
+class Authors(LazyQuery[Author]):
+    endpoint = AUTHORS
+
+
+class Sources(LazyQuery[Source]):
+    endpoint = SOURCES
+
+
+class Institutions(LazyQuery[Institution]):
+    endpoint = INSTITUTIONS
@@ -0,0 +1,251 @@
+"""
+aletheca.metrics
+
+per-request instrumentation: timings of each phase of a request, from waiting for a rate limit token to parsing
+
+Clients call their `hooks` with a `RequestMetrics` for every request they make (including cache hits and
+requests that fail). `MetricsCollector` is a built-in hook that summarizes them in percentiles, exports them
+in the Prometheus text format or as JSON, and splits the total time in waiting, network, server and parse time,
+which tells whether a slow crawl is limited by the rate limit, the network, the OpenAlex servers or parsing:
+
+    metrics = MetricsCollector()
+    with Client(hooks=[metrics]) as client:
+        ...
+    print(metrics.breakdown())
+
+Network phases are taken from the trace events of httpcore. Name resolution happens within the TCP connect
+and is included in `connect_seconds`; requests on a reused connection have no connect time.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import numpy as np
+
+
+@dataclass(slots=True, kw_only=True)
+class RequestMetrics:
+    """What happened during a single (logical) request, including its retries. Unknown values are None."""
+
+    path: str
+    endpoint: str
+    status: int | None = None
+    cached: bool = False
+    retries: int = 0
+    # bytes received over the network (compressed), and the size of the response body
+    bytes_downloaded: int = 0
+    content_bytes: int = 0
+    # time spent in the rate limiter and in backoff delays between retries
+    wait_seconds: float = 0.0
+    # phases of the last attempt: TCP connect (including name resolution) and TLS handshake,
+    # from sending the request to the response headers, and receiving the response body
+    connect_seconds: float | None = None
+    tls_seconds: float | None = None
+    ttfb_seconds: float | None = None
+    download_seconds: float | None = None
+    # `Meta.db_response_time_ms` of result pages
+    server_seconds: float | None = None
+    # JSON to dicts (strict parsing only), and to entities (with the bytes decoder, this includes decoding)
+    decode_seconds: float | None = None
+    parse_seconds: float | None = None
+    # from the start of the request until it was returned (and parsed)
+    total_seconds: float = 0.0
+
+
+RequestHook = Callable[[RequestMetrics], None]
+
+
+class Trace:
+    """
+    Callback for the `trace` extension of httpx (see the httpcore docs), that records the time of the events
+    of one attempt and fills in the network phases of a `RequestMetrics`. Use `atrace` for async clients.
+    """
+
+    def __init__(self):
+        self.events: dict[str, float] = {}
+
+    def __call__(self, name: str, info: dict[str, Any]) -> None:
+        # "http11.receive_response_body.complete" -> "receive_response_body.complete"
+        if name.startswith("http"):
+            name = name.partition(".")[2]
+        self.events[name] = time.perf_counter()
+
+    async def atrace(self, name: str, info: dict[str, Any]) -> None:
+        self(name, info)
+
+    def _phase(self, name: str) -> float | None:
+        started = self.events.get(f"{name}.started")
+        complete = self.events.get(f"{name}.complete")
+        if started is None or complete is None:
+            return None
+        return complete - started
+
+    def apply(self, metrics: RequestMetrics) -> None:
+        metrics.connect_seconds = self._phase("connection.connect_tcp")
+        metrics.tls_seconds = self._phase("connection.start_tls")
+        metrics.download_seconds = self._phase("receive_response_body")
+        sent = self.events.get("send_request_headers.started")
+        headers = self.events.get("receive_response_headers.complete")
+        if sent is not None and headers is not None:
+            metrics.ttfb_seconds = headers - sent
+
+
+# --------
+# collecting
+# --------
+
+# the timings that are summarized, with their descriptions
+TIMINGS = {
+    "wait_seconds": "Time spent waiting for rate limit tokens and between retries",
+    "connect_seconds": "TCP connect time, including name resolution",
+    "tls_seconds": "TLS handshake time",
+    "ttfb_seconds": "Time from sending a request to receiving the response headers",
+    "download_seconds": "Time to receive the response body",
+    "server_seconds": "Database time reported by the API in Meta.db_response_time_ms",
+    "decode_seconds": "Time to decode JSON response bodies to dicts",
+    "parse_seconds": "Time to parse responses into entities",
+    "total_seconds": "Total time per request, including waiting and parsing",
+}
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class MetricsCollector:
+    """
+    Request hook that keeps the metrics of the last `maxlen` requests, with running totals of all requests.
+    Percentiles are taken over the kept requests; `timing_sums` and `timing_counts` add up the timings of all
+    requests, like `totals`. Safe to share between clients and threads.
+    """
+
+    def __init__(self, maxlen: int = 100_000):
+        self.requests: deque[RequestMetrics] = deque(maxlen=maxlen)
+        self.totals = {
+            "requests": 0,
+            "errors": 0,
+            "cache_hits": 0,
+            "retries": 0,
+            "bytes_downloaded": 0,
+        }
+        # running sum and number of the known values of each timing
+        self.timing_sums = dict.fromkeys(TIMINGS, 0.0)
+        self.timing_counts = dict.fromkeys(TIMINGS, 0)
+        self._lock = threading.Lock()
+
+    def __call__(self, metrics: RequestMetrics) -> None:
+        with self._lock:
+            self.requests.append(metrics)
+            self.totals["requests"] += 1
+            self.totals["errors"] += metrics.status is None or metrics.status >= 400
+            self.totals["cache_hits"] += metrics.cached
+            self.totals["retries"] += metrics.retries
+            self.totals["bytes_downloaded"] += metrics.bytes_downloaded
+            for name in TIMINGS:
+                value = getattr(metrics, name)
+                if value is not None:
+                    self.timing_sums[name] += value
+                    self.timing_counts[name] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            for name in self.totals:
+                self.totals[name] = 0
+            for name in TIMINGS:
+                self.timing_sums[name] = 0.0
+                self.timing_counts[name] = 0
+
+    def _values(self, name: str) -> list[float]:
+        with self._lock:
+            values = [getattr(metrics, name) for metrics in self.requests]
+        return [value for value in values if value is not None]
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """For each timing: the count, sum and mean, the p50/p95/p99, and the maximum over the kept requests."""
+        summary: dict[str, dict[str, float]] = {}
+        for name in TIMINGS:
+            values = self._values(name)
+            if not values:
+                continue
+            quantiles = np.quantile(values, QUANTILES)
+            summary[name] = {
+                "count": len(values),
+                "sum": float(np.sum(values)),
+                "mean": float(np.mean(values)),
+                **{
+                    f"p{round(q * 100)}": float(value)
+                    for q, value in zip(QUANTILES, quantiles, strict=True)
+                },
+                "max": float(np.max(values)),
+            }
+        return summary
+
+    def breakdown(self) -> dict[str, float]:
+        """
+        Split the total time of the kept requests in the share (0-1) spent waiting for the rate limit,
+        in the network (connect, TLS, time to first byte minus server time, download), in the API's database,
+        and in decoding and parsing. The largest share is what limits the throughput.
+        """
+        with self._lock:
+            requests = list(self.requests)
+        parts = {"wait": 0.0, "network": 0.0, "server": 0.0, "parse": 0.0}
+        for m in requests:
+            server = m.server_seconds or 0.0
+            parts["wait"] += m.wait_seconds
+            parts["server"] += server
+            parts["network"] += (
+                (m.connect_seconds or 0.0)
+                + (m.tls_seconds or 0.0)
+                + max(0.0, (m.ttfb_seconds or 0.0) - server)
+                + (m.download_seconds or 0.0)
+            )
+            parts["parse"] += (m.decode_seconds or 0.0) + (m.parse_seconds or 0.0)
+        total = sum(parts.values())
+        return {name: value / total if total else 0.0 for name, value in parts.items()}
+
+    def to_json(self, *, requests: bool = False) -> str:
+        """Export the totals, summary and breakdown as JSON; with `requests`, include every kept request."""
+        report: dict[str, Any] = {
+            "totals": dict(self.totals),
+            "summary": self.summary(),
+            "breakdown": self.breakdown(),
+        }
+        if requests:
+            with self._lock:
+                report["requests"] = [asdict(metrics) for metrics in self.requests]
+        return json.dumps(report, indent=2)
+
+    def to_prometheus(self, prefix: str = "aletheca") -> str:
+        """
+        Export the totals as counters and the timings as summaries, in the Prometheus text format. The quantiles
+        are those of the kept requests, `_sum` and `_count` are counters over all requests, so that rates over
+        them stay correct once requests drop out of the window.
+        """
+        lines: list[str] = []
+        for name, value in self.totals.items():
+            metric = f"{prefix}_{name}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        summary = self.summary()
+        with self._lock:
+            sums, counts = dict(self.timing_sums), dict(self.timing_counts)
+        for name, description in TIMINGS.items():
+            if not counts[name]:
+                continue
+            metric = f"{prefix}_request_{name}"
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} summary"]
+            if name in summary:
+                lines += [
+                    f'{metric}{{quantile="{q}"}} {summary[name][f"p{round(q * 100)}"]}'
+                    for q in QUANTILES
+                ]
+            lines += [
+                f"{metric}_sum {sums[name]}",
+                f"{metric}_count {counts[name]}",
+            ]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,194 @@
+"""
+aletheca.parquet
+
+incremental, partitioned Parquet export of entity batches
+
+`ParquetSink` takes batches of entities from any source (pages from `Client.paginate`, DataFrames from
+`snapshot.read_snapshot_frames`, lists of decoded records) and writes them to a directory of Parquet files,
+optionally partitioned hive-style on one or more columns:
+
+    works/publication_year=2024/type=article/part-00000.parquet
+
+The schema is fixed for each entity type, see `frames.polars_schema`: `Literal` fields are stored as
+dictionary-encoded enum columns, and every file has the same schema whatever is in its batch. Rows are buffered
+per partition and written once a partition holds a full file, so files get large, evenly sized row groups
+(good for scanning) while only a bounded amount of data is ever kept in memory.
+
+    with ParquetSink("works", Work, partition_by="publication_year") as sink:
+        for page in client.paginate(query):
+            sink.write(page.results)
+
+    pl.scan_parquet("works").filter(pl.col("publication_year") == 2024)
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Mapping, Sequence
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+from urllib.parse import quote
+
+import polars as pl
+
+from aletheca.frames import frame_from_dicts, frame_from_entities, polars_schema
+
+# name of the partition directory for null values, as used by hive (and understood by polars)
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+MiB = 1024**2
+
+
+class ParquetSink:
+    """
+    Append batches of `result_type` entities to a (partitioned) Parquet dataset at `path`, see the module docs.
+
+    Sizes are estimated in-memory sizes (`pl.DataFrame.estimated_size`), so files on disk are a few times
+    smaller after compression:
+    - a partition is written to a new file once it buffers `file_bytes`, in row groups of about
+      `row_group_bytes`;
+    - when all partitions together buffer more than `max_buffered_bytes`, the largest one is written early.
+
+    Call `close` (or use the sink as a context manager) to write the remaining buffers. Existing files in
+    `path` are never overwritten: numbering continues after the highest existing part.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        result_type: type,
+        *,
+        partition_by: str | Sequence[str] = (),
+        file_bytes: int = 512 * MiB,
+        row_group_bytes: int = 128 * MiB,
+        max_buffered_bytes: int = 1024 * MiB,
+        compression: str = "zstd",
+    ):
+        self.path = Path(path)
+        self.result_type = result_type
+        self.schema = polars_schema(result_type)
+        self.partition_by = (
+            [partition_by] if isinstance(partition_by, str) else list(partition_by)
+        )
+        unknown = [name for name in self.partition_by if name not in self.schema]
+        if unknown:
+            raise ValueError(
+                f"cannot partition {result_type.__name__} on unknown columns {unknown}"
+            )
+        if not row_group_bytes <= file_bytes <= max_buffered_bytes:
+            raise ValueError(
+                "sizes should satisfy row_group_bytes <= file_bytes <= max_buffered_bytes"
+            )
+        self.file_bytes = file_bytes
+        self.row_group_bytes = row_group_bytes
+        self.max_buffered_bytes = max_buffered_bytes
+        self.compression = compression
+        self.files: list[Path] = []
+        self._buffers: dict[tuple[Any, ...], list[pl.DataFrame]] = {}
+        self._buffered: dict[tuple[Any, ...], int] = {}
+        self._next_part: dict[Path, int] = {}
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def write(self, batch: pl.DataFrame | Iterable[Any]) -> None:
+        """
+        Add a batch of records: a DataFrame with (a subset of) the columns of the schema, or a sequence of
+        entities or of decoded API records (dicts). None records in a sequence are skipped.
+        """
+        frame = self._frame(batch)
+        if not len(frame):
+            return
+        if self.partition_by:
+            parts = frame.partition_by(
+                self.partition_by, as_dict=True, maintain_order=True
+            )
+        else:
+            parts = {(): frame}
+        for key, part in parts.items():
+            self._buffers.setdefault(key, []).append(part)
+            self._buffered[key] = self._buffered.get(key, 0) + part.estimated_size()
+            if self._buffered[key] >= self.file_bytes:
+                self._flush(key)
+        while sum(self._buffered.values()) > self.max_buffered_bytes:
+            self._flush(max(self._buffered, key=self._buffered.__getitem__))
+
+    def close(self) -> list[Path]:
+        """Write all buffered rows, and return the paths of all files written by this sink."""
+        for key in list(self._buffers):
+            self._flush(key)
+        return self.files
+
+    def _frame(self, batch: pl.DataFrame | Iterable[Any]) -> pl.DataFrame:
+        if isinstance(batch, pl.DataFrame):
+            return batch.select(
+                pl.col(name).cast(dtype)
+                if name in batch.columns
+                else pl.lit(None, dtype).alias(name)
+                for name, dtype in self.schema.items()
+            )
+        # pages can hold null results; they would become all-null rows, in the null partitions
+        records = [record for record in batch if record is not None]
+        if records and isinstance(records[0], Mapping):
+            return frame_from_dicts(records, self.result_type)
+        return frame_from_entities(records, self.result_type)
+
+    def _flush(self, key: tuple[Any, ...]) -> None:
+        frame = pl.concat(self._buffers.pop(key), rechunk=True)
+        self._buffered.pop(key)
+        directory = self.path.joinpath(
+            *(
+                f"{name}={NULL_PARTITION if value is None else quote(str(value), safe='')}"
+                for name, value in zip(self.partition_by, key, strict=True)
+            )
+        )
+        path = directory / f"part-{self._part_number(directory):05d}.parquet"
+        row_size = max(1, frame.estimated_size() // len(frame))
+        frame.write_parquet(
+            path,
+            compression=self.compression,
+            row_group_size=max(1, self.row_group_bytes // row_size),
+            statistics=True,
+        )
+        self.files.append(path)
+
+    def _part_number(self, directory: Path) -> int:
+        if directory not in self._next_part:
+            directory.mkdir(parents=True, exist_ok=True)
+            existing = [
+                int(file.stem.removeprefix("part-"))
+                for file in directory.glob("part-*.parquet")
+            ]
+            self._next_part[directory] = max(existing, default=-1) + 1
+        number = self._next_part[directory]
+        self._next_part[directory] += 1
+        return number
+
+
+def write_parquet(
+    batches: Iterable[pl.DataFrame | Iterable[Any]],
+    path: str | os.PathLike[str],
+    result_type: type,
+    *,
+    partition_by: str | Sequence[str] = (),
+    **options: Any,
+) -> list[Path]:
+    """
+    Write all batches to a Parquet dataset with a `ParquetSink`, and return the paths of the written files.
+
+        write_parquet(snapshot.read_snapshot_frames(root), "works", Work, partition_by="type")
+    """
+    with ParquetSink(path, result_type, partition_by=partition_by, **options) as sink:
+        for batch in batches:
+            sink.write(batch)
+    return sink.files
@@ -0,0 +1,281 @@
+"""
+aletheca.snapshot
+
+read the OpenAlex snapshot (gzipped JSON lines) from local disk, decoding the part files in parallel processes
+
+The snapshot (https://docs.openalex.org/download-all-data/openalex-snapshot) holds a directory per entity type,
+partitioned by the date the records were last updated:
+
+    <root>/data/works/updated_date=2025-01-01/part_000.gz
+
+Worker processes each decompress one part file at a time and decode it in batches of lines, either into
+entities (`read_snapshot`) or into polars DataFrames with the schema of `aletheca.frames` (`read_snapshot_frames`).
+Batches are handed to the calling process through bounded queues: workers that get ahead of the consumer
+pause, so memory stays bounded by about `processes * queue_size` batches, whatever the size of the snapshot.
+
+Results come in snapshot order (by update date, then part number, then line) with `ordered=True`, or in
+the order the batches are finished with `ordered=False`, which keeps all workers busy when part files differ
+in size. Any directory with the same layout works, e.g. a small fixture snapshot for tests.
+
+Workers are started with the "spawn" method by default: a forked child of a process that has already used
+polars (or any other threaded library) can deadlock on a lock held by one of the parent's threads. As with any
+spawned process, scripts that read the snapshot in parallel need an `if __name__ == "__main__":` guard.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import gzip
+import io
+import multiprocessing
+import os
+import re
+from collections.abc import Iterator
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from typing import Any
+
+import msgspec
+import polars as pl
+
+from aletheca import parsing
+from aletheca.endpoints import ENDPOINTS
+from aletheca.entities import BaseOpenAlex
+from aletheca.frames import polars_schema
+
+# default size of the batches of lines that are decoded at once, in (decompressed) bytes
+BATCH_BYTES = 16 * 1024**2
+
+_PART = re.compile(r"part_(\d+)\.gz")
+
+
+def snapshot_files(
+    root: str | os.PathLike[str],
+    entity: str = "works",
+    *,
+    updated_since: str | None = None,
+) -> list[Path]:
+    """
+    Return the part files of an entity type in snapshot order: by update date, then by part number.
+    With `updated_since` (an ISO date), only the partitions updated on or after that date are included.
+    """
+    directory = Path(root, "data", entity)
+    if not directory.is_dir():
+        raise FileNotFoundError(f"no {entity} in snapshot at {root}")
+    files: list[tuple[str, int, Path]] = []
+    for path in directory.glob("updated_date=*/part_*.gz"):
+        updated = path.parent.name.removeprefix("updated_date=")
+        match = _PART.fullmatch(path.name)
+        if match is None or (updated_since is not None and updated < updated_since):
+            continue
+        files.append((updated, int(match.group(1)), path))
+    return [path for *_, path in sorted(files)]
+
+
+# --------
+# decoding
+# --------
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class _Decode:
+    result_type: type
+    columnar: bool
+    batch_bytes: int
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class _Failed:
+    path: str
+    error: str
+
+
+def _decode_file(path: Path, decode: _Decode) -> Iterator[Any]:
+    # decoded batches of a single part file: lists of entities, or DataFrames
+    with gzip.open(path, "rb") as file:
+        while lines := file.readlines(decode.batch_bytes):
+            chunk = b"".join(lines)
+            if decode.columnar:
+                yield pl.read_ndjson(
+                    io.BytesIO(chunk), schema=polars_schema(decode.result_type)
+                )
+            else:
+                yield parsing.json_decoder(decode.result_type).decode_lines(chunk)
+
+
+@functools.cache
+def _msgpack_decoder(result_type: type) -> msgspec.msgpack.Decoder:
+    return msgspec.msgpack.Decoder(list[result_type])
+
+
+def _worker(
+    tasks: multiprocessing.Queue, output: multiprocessing.Queue, decode: _Decode
+) -> None:
+    # decode the files from `tasks` until None, putting their batches on `output`, each file followed by None.
+    # Entities are sent as msgpack: decoding that in the calling process is much cheaper than unpickling them.
+    encoder = msgspec.msgpack.Encoder()
+    while (path := tasks.get()) is not None:
+        try:
+            for batch in _decode_file(path, decode):
+                output.put(batch if decode.columnar else encoder.encode(batch))
+        except Exception as exc:  # noqa: BLE001 - re-raised in the calling process
+            output.put(_Failed(path=str(path), error=repr(exc)))
+        output.put(None)
+
+
+def _batches(
+    files: list[Path],
+    decode: _Decode,
+    processes: int,
+    ordered: bool,
+    queue_size: int,
+    context: BaseContext,
+) -> Iterator[Any]:
+    if processes == 0:
+        for path in files:
+            yield from _decode_file(path, decode)
+        return
+    processes = min(processes, len(files))
+    if ordered:
+        # files are dealt round-robin, each worker with its own output queue, which are read in file order
+        task_queues = [context.Queue() for _ in range(processes)]
+        outputs = [context.Queue(queue_size) for _ in range(processes)]
+        for index, path in enumerate(files):
+            task_queues[index % processes].put(path)
+        for tasks in task_queues:
+            tasks.put(None)
+    else:
+        # workers take the next file when they are done, and share a single output queue
+        task_queues = [context.Queue()]
+        outputs = [context.Queue(queue_size * processes)]
+        for path in [*files, *[None] * processes]:
+            task_queues[0].put(path)
+    workers = [
+        context.Process(
+            target=_worker,
+            args=(task_queues[k % len(task_queues)], outputs[k % len(outputs)], decode),
+            daemon=True,
+        )
+        for k in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        remaining = len(files)
+        index = 0
+        while remaining:
+            item = outputs[index % len(outputs)].get()
+            if item is None:
+                remaining -= 1
+                index += 1
+            elif isinstance(item, _Failed):
+                raise RuntimeError(f"failed to read {item.path}: {item.error}")
+            elif decode.columnar:
+                yield item
+            else:
+                yield _msgpack_decoder(decode.result_type).decode(item)
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.join()
+        for queue in (*task_queues, *outputs):
+            queue.cancel_join_thread()
+            queue.close()
+
+
+def _read(
+    root: str | os.PathLike[str],
+    entity: str,
+    columnar: bool,
+    processes: int | None,
+    ordered: bool,
+    updated_since: str | None,
+    batch_bytes: int,
+    queue_size: int,
+    mp_context: BaseContext | None,
+) -> Iterator[Any]:
+    if entity not in ENDPOINTS:
+        raise ValueError(f"unknown entity type {entity!r}")
+    files = snapshot_files(root, entity, updated_since=updated_since)
+    if not files:
+        return iter(())
+    decode = _Decode(
+        result_type=ENDPOINTS[entity].entity, columnar=columnar, batch_bytes=batch_bytes
+    )
+    if processes is None:
+        processes = os.cpu_count() or 1
+    context = mp_context or multiprocessing.get_context("spawn")
+    return _batches(files, decode, processes, ordered, queue_size, context)
+
+
+# --------
+# readers
+# --------
+
+
+def read_snapshot(
+    root: str | os.PathLike[str],
+    entity: str = "works",
+    *,
+    processes: int | None = None,
+    ordered: bool = True,
+    updated_since: str | None = None,
+    batch_bytes: int = BATCH_BYTES,
+    queue_size: int = 2,
+    mp_context: BaseContext | None = None,
+) -> Iterator[BaseOpenAlex]:
+    """
+    Yield all entities of a type (`works`, `authors`, ...) from a local copy of the snapshot, see the module docs.
+
+    Files are read by `processes` worker processes (default: one per core; 0 reads them in the calling process),
+    started from `mp_context` (default: `multiprocessing.get_context("spawn")`, see the module docs).
+    Records are decoded as with `parsing.from_json`, so fields that are not in the entity dataclass are skipped,
+    and strings from small vocabularies are interned (in the calling process, see `parsing.interned_strings`).
+    Errors in a part file raise `RuntimeError` with the path of the file.
+    """
+    batches = _read(
+        root,
+        entity,
+        False,
+        processes,
+        ordered,
+        updated_since,
+        batch_bytes,
+        queue_size,
+        mp_context,
+    )
+    intern = parsing.string_interner(list[ENDPOINTS[entity].entity])
+    for batch in batches:
+        if intern is not None:
+            intern(batch)
+        yield from batch
+
+
+def read_snapshot_frames(
+    root: str | os.PathLike[str],
+    entity: str = "works",
+    *,
+    processes: int | None = None,
+    ordered: bool = True,
+    updated_since: str | None = None,
+    batch_bytes: int = BATCH_BYTES,
+    queue_size: int = 2,
+    mp_context: BaseContext | None = None,
+) -> Iterator[pl.DataFrame]:
+    """
+    Like `read_snapshot`, but yield batches of records as DataFrames with the schema of `frames.polars_schema`,
+    parsed by polars' own JSON reader in the worker processes. This is the fastest way to load the snapshot:
+    the calling process only receives the finished columns.
+    """
+    yield from _read(
+        root,
+        entity,
+        True,
+        processes,
+        ordered,
+        updated_since,
+        batch_bytes,
+        queue_size,
+        mp_context,
+    )
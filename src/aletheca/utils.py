@@ -7,30 +7,162 @@ split into several groups:
     - ...
 """
 
+import re
+from collections.abc import Iterable, Mapping, Sequence
+from itertools import chain, pairwise
+from operator import itemgetter
+from typing import Literal
+
+import numpy as np
 
 # --------
 # Parse and normalize functions
 # --------
 
+IdType = Literal[
+    "openalex", "doi", "orcid", "ror", "issn", "pmid", "pmcid", "mag", "wikidata"
+]
+
+# patterns for each id type, matching both the url form as used in the API data and the bare id;
+# group 1 is the id in its short form
+_ID_PATTERNS: dict[IdType, re.Pattern[str]] = {
+    "openalex": re.compile(
+        r"(?:https?://openalex\.org/)?([WASITCPF]\d+)", re.IGNORECASE
+    ),
+    "doi": re.compile(
+        r"(?:https?://(?:dx\.)?doi\.org/|doi:\s*)?(10\.\d{4,9}/\S+)", re.IGNORECASE
+    ),
+    "orcid": re.compile(
+        r"(?:https?://orcid\.org/)?(\d{4}-\d{4}-\d{4}-\d{3}[\dX])", re.IGNORECASE
+    ),
+    "ror": re.compile(r"(?:https?://ror\.org/)?(0[a-z0-9]{6}\d{2})", re.IGNORECASE),
+    "issn": re.compile(r"(\d{4}-\d{3}[\dX])", re.IGNORECASE),
+    "pmid": re.compile(
+        r"(?:https?://pubmed\.ncbi\.nlm\.nih\.gov/|pmid:\s*)?(\d+)/?", re.IGNORECASE
+    ),
+    "pmcid": re.compile(
+        r"(?:https?://www\.ncbi\.nlm\.nih\.gov/pmc/articles/|pmcid:\s*)?(?:PMC)?(\d+)/?",
+        re.IGNORECASE,
+    ),
+    "mag": re.compile(r"(?:mag:\s*)?(\d+)", re.IGNORECASE),
+    "wikidata": re.compile(
+        r"(?:https?://www\.wikidata\.org/wiki/)?(Q\d+)", re.IGNORECASE
+    ),
+}
+
 
 def normalize_doi(doi: str) -> str:
-    # normalize doi to canonical form: https://doi.org/10.xxxx/xxxxx, all lowercase
-    ...
+    """Normalize a doi to its canonical form: https://doi.org/10.xxxx/xxxxx, all lowercase."""
+    return f"https://doi.org/{short_doi(doi)}"
 
 
 def short_doi(doi: str) -> str:
-    # convert full doi url to short form: 10.xxxx/xxxxx
-    ...
+    """Convert a doi in any common form (url, `doi:` prefix, bare) to its short form: 10.xxxx/xxxxx, all lowercase."""
+    match = _ID_PATTERNS["doi"].fullmatch(doi.strip())
+    if match is None:
+        raise ValueError(f"not a doi: {doi!r}")
+    return match.group(1).lower()
+
+
+def determine_id_type(id_str: str) -> IdType:
+    """
+    Determine the type of an identifier string, e.g. doi, openalex id, orcid, ror, etc.
+    Both url forms (as used in the API data) and bare ids are recognized. Pubmed and MAG ids are plain
+    numbers, so they need a `pmid:`/`mag:` prefix (or the pubmed url). Raises `ValueError` for unknown ids.
+    """
+    id_str = id_str.strip()
+    if id_str.isdigit():
+        raise ValueError(
+            f"ambiguous identifier, add a `pmid:` or `mag:` prefix: {id_str!r}"
+        )
+    for id_type, pattern in _ID_PATTERNS.items():
+        if pattern.fullmatch(id_str):
+            return id_type
+    raise ValueError(f"unknown type of identifier: {id_str!r}")
+
+
+def short_id(id_str: str, id_type: IdType | None = None) -> str:
+    """
+    Return the short, canonical form of an identifier: `W123` for OpenAlex ids, `10.xxxx/xxxxx` for dois,
+    `0000-0000-0000-0000` for orcids, etc. Equal ids in different forms give the same short id.
+    """
+    id_str = id_str.strip()
+    if id_type is None:
+        id_type = determine_id_type(id_str)
+    match = _ID_PATTERNS[id_type].fullmatch(id_str)
+    if match is None:
+        raise ValueError(f"not a valid {id_type} id: {id_str!r}")
+    short = match.group(1)
+    if id_type == "pmcid":
+        return f"PMC{short}"
+    return short.lower() if id_type in ("doi", "ror") else short.upper()
+
+
+InvertedAbstract = Mapping[str, Sequence[int]]
+
+
+def parse_inverted_abstract(inv_abstract: InvertedAbstract | None) -> str | None:
+    """
+    Rebuild the abstract text from an `abstract_inverted_index` ({word: [positions]}).
+    Missing or empty indexes give None; gaps in the positions are skipped.
+    """
+    if not inv_abstract:
+        return None
+    # sorting (position, word) pairs on the int position only is cheaper than filling a list word by word
+    pairs = [
+        (position, word)
+        for word, positions in inv_abstract.items()
+        for position in positions
+    ]
+    pairs.sort(key=itemgetter(0))
+    return " ".join([word for _, word in pairs]) or None
 
 
-def determine_id_type(id_str: str) -> str:
-    # determines the type of identifier string, e.g. doi, openalex_id, orcid, ror, etc
-    ...
+def _reading_order(
+    rows: np.ndarray, positions: np.ndarray, n: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Scatter the (row, position) pairs of `n` rows into a single buffer, with a slice per row up to its last
+    position, and return the indices of the pairs in reading order and the bounds of every row in that order.
+    Gaps are skipped; of pairs with the same row and position, one is kept.
+    """
+    sizes = np.zeros(n, np.int64)
+    np.maximum.at(sizes, rows, positions + 1)
+    offsets = np.zeros(n + 1, np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    slots = np.full(offsets[-1], -1, np.int64)
+    slots[offsets[rows] + positions] = np.arange(len(rows))
+    filled = slots >= 0
+    return slots[filled], np.concatenate([[0], np.cumsum(filled)])[offsets]
 
 
-def parse_inverted_abstract(inv_abstract: dict[int, str]) -> str:
-    # parse inverted abstract dict to normal abstract string
-    ...
+def parse_inverted_abstracts(
+    inv_abstracts: Iterable[InvertedAbstract | None],
+) -> list[str | None]:
+    """
+    Rebuild many abstracts at once, see `parse_inverted_abstract`.
+    The indexes of the whole batch are flattened into arrays of words, rows and positions, and every word is
+    scattered to its position in a single buffer (a slice per abstract), so no abstract is sorted on its own.
+    If several words claim the same position, one of them is kept.
+    For abstracts that are already in a polars DataFrame, use `frames.abstract_expr` instead.
+    """
+    indexes = [inv_abstract or {} for inv_abstract in inv_abstracts]
+    # the words of all indexes, and for every position the index of its word and its row
+    position_lists = list(chain.from_iterable(index.values() for index in indexes))
+    words = np.fromiter(
+        chain.from_iterable(indexes), dtype=object, count=len(position_lists)
+    )
+    counts = np.fromiter(map(len, position_lists), np.int64, len(position_lists))
+    positions = np.fromiter(
+        chain.from_iterable(position_lists), np.int64, int(counts.sum())
+    )
+    token_words = np.repeat(np.arange(len(position_lists)), counts)
+    rows = np.repeat(np.arange(len(indexes)), np.fromiter(map(len, indexes), np.int64))
+    order, bounds = _reading_order(rows[token_words], positions, len(indexes))
+    tokens = words[token_words[order]].tolist()
+    return [
+        " ".join(tokens[start:end]) or None for start, end in pairwise(bounds.tolist())
+    ]
 
 
 # --------
@@ -0,0 +1,19 @@
+import pytest
+
+from aletheca.config import BaseAlethecaConfig
+from tests.support.mock_server import Faults, MockOpenAlex
+
+
+@pytest.fixture(scope="session")
+def server():
+    with MockOpenAlex(results=500) as server:
+        yield server
+
+
+@pytest.fixture
+def config(server):
+    server.faults = Faults()
+    server.stats.clear()
+    return BaseAlethecaConfig(
+        api_base_url=server.url, rate_limit=50, backoff_factor=0.01, max_retries=3
+    )
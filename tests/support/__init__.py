@@ -0,0 +1 @@
+"""Helpers shared by the tests and the benchmarks: the mock OpenAlex API and its response pages."""
@@ -0,0 +1,537 @@
+"""
+A local stand-in for the OpenAlex API, to benchmark the clients (pagination, rate limiting, retries) offline.
+
+Every entity endpoint (`/works`, `/authors`, `/sources`, ...) serves `--results` records, filled from the
+fixture page of its entity type in `tests/fixtures/pages` as in `tests.support.pages.load_page` (so their nested
+ids, optional fields and list sizes vary like those of real results), with distinct ids and varied years,
+types, counts and countries, so that filters and groups give realistic answers. List requests support
+`filter` (OR-values with `|`, negation with `!`, ranges with `<`, `>` and `a-b`), `search`, `sort`, `select`,
+`sample`/`seed`, `group_by` (with `:include_unknown`), and both basic (`page`) and cursor (`cursor=*`) paging.
+Single entities are served at `/<entity>/<id>`.
+
+Faults can be injected to test resilience: a fixed `--latency` (plus random `--jitter`) per request,
+`--error-rate` of 500/502/503 responses, `--throttle-rate` of random 429 responses, and 429 responses above
+`--rate-limit` requests per second, all with a `Retry-After` header of `--retry-after` seconds. `GET /__stats`
+returns the number of responses per status.
+
+    uv run python -m tests.support.mock_server --port 8000 --results 10000 --latency 0.05 --error-rate 0.01
+
+or in-process, from a test or a benchmark:
+
+    with MockOpenAlex(results=10_000, faults=Faults(latency=0.05)) as server:
+        client = Client(BaseAlethecaConfig(api_base_url=server.url))
+"""
+
+import argparse
+import base64
+import functools
+import random
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Self
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import msgspec
+
+from tests.support.pages import ENTITY_TYPES, load_page
+
+# limits of the real API
+MAX_PER_PAGE = 200
+MAX_BASIC_PAGING_RESULTS = 10_000
+DEFAULT_PER_PAGE = 25
+
+FILTER_ALIASES = {
+    "openalex": "id",
+    "openalex_id": "id",
+    "is_oa": "open_access.is_oa",
+    "oa_status": "open_access.oa_status",
+}
+
+# values to vary the tiled records with
+COUNTRY_CODES = ["US", "GB", "DE", "NL", "CN", "JP", "FR", "BR", "IN", "ZA"]
+OA_STATUSES = ["gold", "green", "hybrid", "bronze", "closed", "diamond"]
+
+
+@dataclass(slots=True, kw_only=True)
+class Faults:
+    """What the server does wrong, and how slowly; all disabled by default."""
+
+    latency: float = 0.0  # seconds, added to every request
+    jitter: float = 0.0  # up to this many extra seconds, uniformly random
+    error_rate: float = 0.0  # share of requests that fail with a 500, 502 or 503
+    throttle_rate: float = 0.0  # share of requests that get a 429
+    rate_limit: float = 0.0  # requests per second before responding 429, 0 for no limit
+    # `Retry-After` of 429 responses, None to leave it out
+    retry_after: float | None = 1.0
+
+
+# --------
+# data
+# --------
+
+
+def _vary(record: dict[str, Any], entity_type: str, rng: random.Random) -> None:
+    """Give a tiled record its own values for the fields that are commonly filtered and grouped on."""
+    if "publication_year" in record:
+        year = rng.randrange(1950, 2026)
+        record["publication_year"] = year
+        record["publication_date"] = f"{year}-{rng.randrange(1, 13):02d}-01"
+    for name in ("cited_by_count", "works_count"):
+        if name in record:
+            record[name] = int(rng.paretovariate(1.2)) - 1
+    if entity_type == "works":
+        record["type"] = rng.choices(
+            ["article", "book-chapter", "dataset", "preprint", "review", "book"],
+            weights=[70, 10, 5, 8, 5, 2],
+        )[0]
+        if record.get("open_access"):
+            status = rng.choice(OA_STATUSES)
+            record["open_access"]["oa_status"] = status
+            record["open_access"]["is_oa"] = status != "closed"
+    if "country_code" in record:
+        record["country_code"] = rng.choice(COUNTRY_CODES)
+
+
+def load_records(entity_type: str, results: int, seed: int = 0) -> list[dict[str, Any]]:
+    """
+    Return `results` records of `entity_type`, filled from its fixture page (see `tests.support.pages.load_page`),
+    with ids `<letter>1`, `<letter>2`, ...
+    """
+    records = msgspec.json.decode(load_page(entity_type, results, seed))["results"]
+    rng = random.Random(f"{seed}-{entity_type}")
+    for index, record in enumerate(records):
+        base, _, short = record["id"].rpartition("/")
+        record["id"] = f"{base}/{short[0]}{index + 1}"
+        _vary(record, entity_type, rng)
+    return records
+
+
+def _short_id(openalex_id: str) -> str:
+    return openalex_id.rpartition("/")[2].upper()
+
+
+def _values(data: Any, path: list[str]) -> Iterator[tuple[Any, Any]]:
+    """Yield the (value, parent) pairs at a dotted path, through nested lists."""
+    if isinstance(data, list):
+        for item in data:
+            yield from _values(item, path)
+        return
+    if not isinstance(data, dict) or path[0] not in data:
+        return
+    value = data[path[0]]
+    if len(path) > 1:
+        yield from _values(value, path[1:])
+    elif isinstance(value, list):
+        for item in value:
+            yield item, data
+    elif value is not None:
+        yield value, data
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value).lower()
+
+
+def _number(value: str) -> float | None:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _matches_one(value: Any, wanted: str) -> bool:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if wanted[:1] in "<>" and (bound := _number(wanted[1:])) is not None:
+            return value < bound if wanted[0] == "<" else value > bound
+        low, dash, high = wanted.partition("-")
+        if dash and (_number(low) is not None or _number(high) is not None):
+            return (not low or value >= float(low)) and (
+                not high or value <= float(high)
+            )
+    text = _text(value)
+    wanted = wanted.lower()
+    # ids and dois match both in full and in their short form
+    return text == wanted or text.endswith(f"/{wanted}")
+
+
+def _matches(record: dict[str, Any], key: str, wanted: str) -> bool:
+    if key in ("from_publication_date", "to_publication_date"):
+        date = record.get("publication_date") or ""
+        return date >= wanted if key.startswith("from") else date <= wanted
+    if key.endswith(".search"):
+        name = key.removesuffix(".search")
+        name = "display_name" if name in ("title", "default") else name
+        return any(
+            wanted.lower() in _text(v) for v, _ in _values(record, name.split("."))
+        )
+    negate = wanted.startswith("!")
+    options = wanted.removeprefix("!").split("|")
+    path = FILTER_ALIASES.get(key, key).split(".")
+    found = any(
+        _matches_one(value, option)
+        for value, _ in _values(record, path)
+        for option in options
+    )
+    return found != negate
+
+
+class BadRequest(Exception):
+    """A request the real API would reject, answered with a 400 response."""
+
+
+def _parse_filter(filter_param: str) -> list[tuple[str, str]]:
+    filters = []
+    for part in filter(None, filter_param.split(",")):
+        key, colon, value = part.partition(":")
+        if not colon or not value:
+            raise BadRequest(f"invalid filter {part!r}")
+        filters.append((key, value))
+    return filters
+
+
+def _sort_key(path: list[str]) -> Any:
+    def key(record: dict[str, Any]) -> tuple[bool, Any]:
+        value = next(_values(record, path), (None, None))[0]
+        return (value is None, _text(value) if isinstance(value, str) else value or 0)
+
+    return key
+
+
+# --------
+# server
+# --------
+
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"offset:{offset}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> int:
+    if cursor == "*":
+        return 0
+    try:
+        return int(base64.urlsafe_b64decode(cursor).decode().removeprefix("offset:"))
+    except ValueError as exc:
+        raise BadRequest(f"invalid cursor {cursor!r}") from exc
+
+
+@dataclass(slots=True)
+class _Response:
+    status: int
+    body: bytes = b""
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class MockOpenAlex:
+    """
+    The mock API, listening on `host`:`port` (0 picks a free port) once started. Use as a context manager,
+    or call `start` and `stop`. `respond` answers a request without any networking.
+    """
+
+    def __init__(
+        self,
+        *,
+        results: int = 1000,
+        faults: Faults | None = None,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.faults = faults or Faults()
+        self.data = {
+            entity_type: load_records(entity_type, results, seed)
+            for entity_type in ENTITY_TYPES
+        }
+        self.by_id = {
+            entity_type: {_short_id(record["id"]): record for record in records}
+            for entity_type, records in self.data.items()
+        }
+        self.stats: Counter[int] = Counter()
+        self._rng = random.Random(seed)
+        self._recent: deque[float] = deque()
+        self._lock = threading.Lock()
+        self._matching = functools.lru_cache(maxsize=256)(self._filter_and_sort)
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> Self:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    # --------
+    # requests
+    # --------
+
+    def respond(self, path: str, params: dict[str, str]) -> _Response:
+        """Answer `GET path?params`, after the configured latency and faults."""
+        if path == "/__stats":
+            return self._json(
+                200, {str(status): n for status, n in sorted(self.stats.items())}
+            )
+        started = time.perf_counter()
+        if (fault := self._fault()) is not None:
+            return fault
+        delay = self.faults.latency + self._uniform(self.faults.jitter)
+        if delay:
+            time.sleep(delay)
+        entity_type, _, openalex_id = path.strip("/").partition("/")
+        if entity_type not in self.data:
+            return self._error(404, f"unknown endpoint {path!r}")
+        try:
+            if openalex_id:
+                return self._single(entity_type, unquote(openalex_id))
+            return self._list(entity_type, params, started)
+        except BadRequest as exc:
+            return self._error(400, str(exc))
+
+    def _uniform(self, high: float) -> float:
+        with self._lock:
+            return self._rng.uniform(0, high) if high else 0.0
+
+    def _fault(self) -> _Response | None:
+        faults = self.faults
+        with self._lock:
+            now = time.monotonic()
+            throttled = False
+            if faults.rate_limit:
+                while self._recent and self._recent[0] <= now - 1:
+                    self._recent.popleft()
+                throttled = len(self._recent) >= faults.rate_limit
+                if not throttled:
+                    self._recent.append(now)
+            roll = self._rng.random()
+            status = self._rng.choice([500, 502, 503])
+        if throttled or roll < faults.throttle_rate:
+            headers = {}
+            if faults.retry_after is not None:
+                headers["Retry-After"] = f"{faults.retry_after:g}"
+            response = self._error(429, "rate limit exceeded")
+            response.headers.update(headers)
+            return response
+        if roll < faults.throttle_rate + faults.error_rate:
+            return self._error(status, "injected error")
+        return None
+
+    def _json(self, status: int, data: Any) -> _Response:
+        return _Response(
+            status, msgspec.json.encode(data), {"Content-Type": "application/json"}
+        )
+
+    def _error(self, status: int, message: str) -> _Response:
+        return self._json(status, {"error": message, "message": message})
+
+    def _single(self, entity_type: str, openalex_id: str) -> _Response:
+        record = self.by_id[entity_type].get(
+            _short_id(openalex_id.removeprefix("openalex:"))
+        )
+        if record is None:
+            return self._error(404, f"{openalex_id} not found")
+        return self._json(200, record)
+
+    def _filter_and_sort(
+        self, entity_type: str, filter_param: str, search: str, sort: str
+    ) -> list[dict[str, Any]]:
+        filters = _parse_filter(filter_param)
+        records = [
+            record
+            for record in self.data[entity_type]
+            if all(_matches(record, key, value) for key, value in filters)
+        ]
+        if search:
+            records = [r for r in records if _matches(r, "default.search", search)]
+        for part in reversed(list(filter(None, sort.split(",")))):
+            name, _, order = part.partition(":")
+            records.sort(key=_sort_key(name.split(".")), reverse=order == "desc")
+        return records
+
+    def _list(
+        self, entity_type: str, params: dict[str, str], started: float
+    ) -> _Response:
+        per_page = params.get("per-page", params.get("per_page", str(DEFAULT_PER_PAGE)))
+        if not per_page.isdigit() or not 1 <= int(per_page) <= MAX_PER_PAGE:
+            raise BadRequest(f"per-page should be between 1 and {MAX_PER_PAGE}")
+        per_page = int(per_page)
+        records = self._matching(
+            entity_type,
+            params.get("filter", ""),
+            params.get("search", ""),
+            params.get("sort", ""),
+        )
+        if "sample" in params:
+            rng = random.Random(params.get("seed"))
+            records = rng.sample(records, min(int(params["sample"]), len(records)))
+        if "group_by" in params:
+            return self._groups(records, params, per_page, started)
+
+        offset, page, next_cursor = self._page(params, per_page, len(records))
+        results = records[offset : offset + per_page]
+        if "select" in params:
+            fields = params["select"].split(",")
+            results = [{name: r.get(name) for name in fields} for r in results]
+        meta = {
+            "count": len(records),
+            "db_response_time_ms": round((time.perf_counter() - started) * 1000),
+            "page": page,
+            "per_page": per_page,
+            "groups_count": None,
+            "next_cursor": next_cursor,
+        }
+        return self._json(200, {"meta": meta, "results": results, "group_by": []})
+
+    def _page(
+        self, params: dict[str, str], per_page: int, count: int
+    ) -> tuple[int, int | None, str | None]:
+        """Return the offset, page number and next cursor of a request."""
+        if "cursor" in params:
+            offset = _decode_cursor(params["cursor"])
+            following = offset + per_page
+            return (
+                offset,
+                None,
+                _encode_cursor(following) if following < count else None,
+            )
+        page = params.get("page", "1")
+        if not page.isdigit() or int(page) < 1:
+            raise BadRequest(f"invalid page {page!r}")
+        if int(page) * per_page > MAX_BASIC_PAGING_RESULTS:
+            raise BadRequest(
+                f"basic paging is limited to {MAX_BASIC_PAGING_RESULTS} results, use cursor paging"
+            )
+        return (int(page) - 1) * per_page, int(page), None
+
+    def _groups(
+        self,
+        records: list[dict[str, Any]],
+        params: dict[str, str],
+        per_page: int,
+        started: float,
+    ) -> _Response:
+        name, _, option = params["group_by"].partition(":")
+        path = FILTER_ALIASES.get(name, name).split(".")
+        counts: Counter[str] = Counter()
+        names: dict[str, str] = {}
+        for record in records:
+            keys = set()
+            for value, parent in _values(record, path):
+                key = _text(value) if isinstance(value, bool) else str(value)
+                keys.add(key)
+                if path[-1] == "id" and parent.get("display_name"):
+                    names.setdefault(key, parent["display_name"])
+            if not keys and option == "include_unknown":
+                keys.add("unknown")
+            counts.update(keys)
+        groups = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        offset, page, next_cursor = self._page(params, per_page, len(groups))
+        page_groups = [
+            {"key": key, "key_display_name": names.get(key, key), "count": count}
+            for key, count in groups[offset : offset + per_page]
+        ]
+        meta = {
+            "count": len(records),
+            "db_response_time_ms": round((time.perf_counter() - started) * 1000),
+            "page": page,
+            "per_page": per_page,
+            "groups_count": len(page_groups),
+            "next_cursor": next_cursor,
+        }
+        return self._json(200, {"meta": meta, "results": [], "group_by": page_groups})
+
+
+def _handler(server: MockOpenAlex) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        # keep connections open, like the real API
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            params = {
+                key: values[-1]
+                for key, values in parse_qs(url.query, keep_blank_values=True).items()
+            }
+            response = server.respond(url.path, params)
+            with server._lock:
+                server.stats[response.status] += 1
+            self.send_response(response.status)
+            for name, value in response.headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(response.body)))
+            self.end_headers()
+            self.wfile.write(response.body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--results", type=int, default=1000, help="records per endpoint"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per request"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="extra random latency"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--rate-limit", type=float, default=0.0, help="requests per second"
+    )
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    args = parser.parse_args()
+
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+    )
+    server = MockOpenAlex(
+        results=args.results,
+        faults=faults,
+        seed=args.seed,
+        host=args.host,
+        port=args.port,
+    )
+    print(f"serving {args.results} records per endpoint at {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Response pages for tests and benchmarks, built from the recorded pages in `tests/fixtures/pages`, one per entity
+type.
+
+`load_page` fills a recorded page up to any number of results with copies of the recorded ones. Each copy has
+its own id, and the ids of its nested entities (authors, institutions, sources, concepts, topics, ...), the ids
+it lists (references, lineages) and its country codes are drawn again, from pools about the size of OpenAlex's
+and with a skew towards common values. Copies then share nested entities about as often as the results of a
+real page do, which matters for the identity map and string interning.
+
+Copies also differ in shape, like real results do: optional fields (`X | None` in the entity) are left out
+(null) at about the rates of real pages, lists (authorships, locations, references, concepts, ...) are
+shorter or longer than the recorded ones, with items drawn from them, and abstracts have their own length.
+Pages recorded with `bench_parsing --record` hold real results, which are used as they are.
+"""
+
+import functools
+import json
+import random
+import re
+from dataclasses import is_dataclass
+from pathlib import Path
+from types import NoneType, UnionType
+from typing import Any, Union, get_args, get_origin, get_type_hints
+
+from aletheca.endpoints import ENDPOINTS
+
+FIXTURES = Path(__file__).parents[1] / "fixtures" / "pages"
+
+# entity types with a fixture page
+ENTITY_TYPES = [
+    "works",
+    "authors",
+    "sources",
+    "institutions",
+    "topics",
+    "concepts",
+    "publishers",
+    "funders",
+]
+
+
+def recorded_page(entity_type: str) -> dict[str, Any]:
+    """Return the recorded fixture page of `entity_type`."""
+    return json.loads((FIXTURES / f"{entity_type}.json").read_text())
+
+
+# approximate number of entities per kind of OpenAlex id, from which nested ids are drawn again
+ID_POOLS = {
+    "W": 250_000_000,
+    "A": 100_000_000,
+    "S": 260_000,
+    "I": 110_000,
+    "F": 32_000,
+    "P": 10_000,
+    "C": 65_000,
+    "T": 4_500,
+    "keywords": 30_000,
+    "subfields": 252,
+    "fields": 26,
+    "domains": 4,
+    "sdg": 17,
+}
+# kinds whose ids are drawn uniformly; the others are skewed towards low numbers, like citations of venues
+UNIFORM = frozenset({"W", "A"})
+# the most common countries of affiliations, most common first
+_COUNTRIES = (
+    "US CN GB DE JP FR IN IT CA ES AU KR BR NL RU CH SE PL TR IR BE TW DK AT NO "
+    "FI IL PT MX ZA SG CZ GR IE NZ EG MY SA PK AR TH CL NG HU RO CO ID UA VN KE"
+)
+COUNTRY_CODES = _COUNTRIES.split()
+
+_OPENALEX_ID = re.compile(
+    r"(?P<prefix>https://openalex\.org/)(?:(?P<letter>[WASIFPCT])\d+"
+    r"|(?P<path>keywords|subfields|fields|domains)/.+)"
+    r"|(?P<sdg>https://metadata\.un\.org/sdg/)\d+"
+)
+
+
+def _draw(pool: int, uniform: bool, rng: random.Random) -> int:
+    if uniform:
+        return rng.randrange(1, pool)
+    # log-uniform: value k is drawn with a probability of about 1/k, as in a Zipf distribution
+    return int(pool ** rng.random())
+
+
+def _redraw_id(value: str, rng: random.Random) -> str:
+    match = _OPENALEX_ID.fullmatch(value)
+    if match is None:
+        return value
+    if match["sdg"]:
+        return f"{match['sdg']}{_draw(ID_POOLS['sdg'], False, rng)}"
+    kind = match["letter"] or match["path"]
+    number = _draw(ID_POOLS[kind], kind in UNIFORM, rng)
+    if match["letter"]:
+        return f"{match['prefix']}{kind}{number}"
+    return f"{match['prefix']}{kind}/{number}"
+
+
+def _vary(value: Any, key: str, rng: random.Random, names: dict[str, str]) -> Any:
+    # a copy of a nested value, with its ids and country codes drawn again. Names follow the ids:
+    # every occurrence of a drawn id gets the same display name.
+    if isinstance(value, dict):
+        varied = {name: _vary(item, name, rng, names) for name, item in value.items()}
+        if (
+            isinstance(value.get("id"), str)
+            and isinstance(value.get("display_name"), str)
+            and varied["id"] != value["id"]
+        ):
+            varied["display_name"] = names.setdefault(
+                varied["id"],
+                f"{value['display_name']} {varied['id'].rpartition('/')[2]}",
+            )
+        return varied
+    if isinstance(value, list):
+        return [_vary(item, key, rng, names) for item in value]
+    if isinstance(value, str):
+        if key in ("country_code", "countries"):
+            return COUNTRY_CODES[_draw(len(COUNTRY_CODES) + 1, False, rng) - 1]
+        return _redraw_id(value, rng)
+    return value
+
+
+# share of copies in which an optional field is null; fields that are often missing in real pages have
+# their own rate
+NULL_RATE = 0.1
+NULL_RATES = {
+    "id": 0.0,
+    "abstract_inverted_index": 0.35,
+    "apc_list": 0.7,
+    "apc_paid": 0.85,
+    "best_oa_location": 0.5,
+    "citation_normalized_percentile": 0.3,
+    "cited_by_percentile_year": 0.3,
+    "doi": 0.3,
+    "first_page": 0.4,
+    "fwci": 0.4,
+    "host_organization": 0.3,
+    "issn": 0.3,
+    "issn_l": 0.3,
+    "issue": 0.5,
+    "last_page": 0.5,
+    "license": 0.5,
+    "license_id": 0.5,
+    "oa_url": 0.5,
+    "orcid": 0.5,
+    "pdf_url": 0.6,
+    "ror": 0.2,
+    "source": 0.25,
+    "version": 0.4,
+    "volume": 0.4,
+}
+# lists of copies are as long as the recorded list times a log-normal factor with this sigma, up to a maximum
+LENGTH_SIGMA = 0.9
+MAX_LENGTH = 250
+
+
+def _shape(tp: Any) -> tuple[bool, type | None]:
+    # whether a type hint allows None, and the dataclass it holds (directly or in a list), if any
+    args = get_args(tp) if get_origin(tp) in (Union, UnionType) else (tp,)
+    for arg in args:
+        if get_origin(arg) is list:
+            arg = get_args(arg)[0]
+        if is_dataclass(arg):
+            return NoneType in args, arg
+    return NoneType in args, None
+
+
+@functools.cache
+def _shapes(data_class: type) -> dict[str, tuple[bool, type | None]]:
+    return {name: _shape(tp) for name, tp in get_type_hints(data_class).items()}
+
+
+def _length(recorded: int, rng: random.Random) -> int:
+    return min(MAX_LENGTH, round(recorded * rng.lognormvariate(0, LENGTH_SIGMA)))
+
+
+def _abstract(index: dict[str, list[int]], rng: random.Random) -> dict[str, list[int]]:
+    # an abstract of its own length, from the words of the recorded one; real abstracts have ~150-250 words
+    words = list(index)
+    abstract: dict[str, list[int]] = {}
+    for position in range(max(1, int(rng.lognormvariate(5.2, 0.5)))):
+        abstract.setdefault(rng.choice(words), []).append(position)
+    return abstract
+
+
+def _resample(
+    record: dict[str, Any], data_class: type, rng: random.Random
+) -> dict[str, Any]:
+    # a copy of a record with nulled optional fields and resized lists; the items are not copied yet
+    shapes = _shapes(data_class)
+    resampled = {}
+    for key, value in record.items():
+        optional, nested = shapes.get(key, (False, None))
+        if value is None:
+            pass
+        elif optional and rng.random() < NULL_RATES.get(key, NULL_RATE):
+            value = None
+        elif key == "abstract_inverted_index" and value:
+            value = _abstract(value, rng)
+        elif isinstance(value, list) and value:
+            value = [
+                value[rng.randrange(len(value))]
+                for _ in range(_length(len(value), rng))
+            ]
+            if nested is not None:
+                value = [
+                    _resample(item, nested, rng) if isinstance(item, dict) else item
+                    for item in value
+                ]
+        elif isinstance(value, dict) and nested is not None:
+            value = _resample(value, nested, rng)
+        resampled[key] = value
+    # counts of resized lists, like `locations_count`
+    for key in resampled:
+        listed = resampled.get(key.removesuffix("_count"))
+        if key.endswith("_count") and isinstance(listed, list):
+            resampled[key] = len(listed)
+    return resampled
+
+
+def load_page(entity_type: str, results: int, seed: int = 0) -> bytes:
+    """
+    Return the fixture page of `entity_type`, filled up to `results` results with varied copies of the recorded
+    ones (see the module docs).
+    """
+    page = recorded_page(entity_type)
+    recorded = page["results"]
+    entity = ENDPOINTS[entity_type].entity
+    rng = random.Random(f"{seed}-{entity_type}")
+    names: dict[str, str] = {}
+    filled = []
+    for index in range(results):
+        if index < len(recorded):
+            filled.append(recorded[index])
+            continue
+        record = _resample(recorded[index % len(recorded)], entity, rng)
+        filled.append(
+            {
+                name: f"{value}{index}"
+                if name == "id"
+                else _vary(value, name, rng, names)
+                for name, value in record.items()
+            }
+        )
+    page["results"] = filled
+    page["meta"].update(count=results, per_page=results)
+    return json.dumps(page).encode()
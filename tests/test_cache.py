@@ -0,0 +1,133 @@
+from types import SimpleNamespace
+
+import pytest
+
+from aletheca import cache
+from aletheca.api import Client
+from aletheca.cache import ResponseCache, cache_key, is_cacheable
+from aletheca.endpoints import WORKS
+from aletheca.metrics import MetricsCollector
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # the wall clock of the cache, advanced by hand
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def test_cache_key_is_canonical():
+    assert cache_key("/works", {"filter": "a:1,b:2", "select": "id,doi"}) == cache_key(
+        "works", {"select": "doi,id", "filter": "b:2,a:1", "mailto": "me@example.org"}
+    )
+    assert cache_key("/works", {"filter": "a:1"}) != cache_key(
+        "/authors", {"filter": "a:1"}
+    )
+
+
+def test_samples_without_seed_are_not_cacheable():
+    assert is_cacheable({"filter": "a:1"})
+    assert is_cacheable({"sample": "10", "seed": "1"})
+    assert not is_cacheable({"sample": "10"})
+
+
+def test_ttl(clock):
+    responses = ResponseCache(":memory:", ttl=60, ttls={"works": 10})
+    responses.set("/works", {"page": "1"}, b"works")
+    responses.set("/authors/A1", {}, b"author")
+    clock.value += 10
+    assert responses.get("/works", {"page": "1"}) == b"works"
+    clock.value += 1
+    assert responses.get("/works", {"page": "1"}) is None
+    assert responses.get("/authors/A1", {}) == b"author"
+    clock.value += 50
+    assert responses.get("/authors/A1", {}) is None
+    assert responses.size() == 0
+
+
+def _fill(responses: ResponseCache, clock, pages: range) -> None:
+    for page in pages:
+        clock.value += 1
+        responses.set("/works", {"page": str(page)}, b"x" * 100)
+
+
+def _cached_pages(responses: ResponseCache, pages: range) -> list[int]:
+    return [
+        page
+        for page in pages
+        if responses.get("/works", {"page": str(page)}) is not None
+    ]
+
+
+def test_lru_eviction(clock):
+    responses = ResponseCache(":memory:", max_bytes=1000)
+    _fill(responses, clock, range(10))
+    assert responses.size() == 1000
+    # reading page 0 makes page 1 the least recently used one
+    clock.value += 1
+    assert responses.get("/works", {"page": "0"}) is not None
+    _fill(responses, clock, range(10, 11))
+    # evicted down to 90% of the budget
+    assert responses.size() == 900
+    assert _cached_pages(responses, range(11)) == [0, *range(3, 11)]
+
+
+def test_eviction_drops_expired_entries_first(clock):
+    responses = ResponseCache(":memory:", max_bytes=1000, ttls={"authors": 5})
+    _fill(responses, clock, range(5))
+    responses.set("/authors/A1", {}, b"x" * 100)
+    _fill(responses, clock, range(5, 9))
+    clock.value += 10
+    _fill(responses, clock, range(9, 10))
+    # the expired author goes, although page 0 was used less recently; then page 0 goes to get within 90%
+    assert responses.get("/authors/A1", {}) is None
+    assert _cached_pages(responses, range(10)) == list(range(1, 10))
+
+
+def test_running_total_size(clock):
+    responses = ResponseCache(":memory:", max_bytes=1000, ttls={"authors": 5})
+    statements = []
+    responses._db.set_trace_callback(statements.append)
+    _fill(responses, clock, range(5))
+    # replaced, expired on read, evicted and cleared entries all update the total
+    responses.set("/works", {"page": "0"}, b"x" * 50)
+    responses.set("/authors/A1", {}, b"x" * 70)
+    clock.value += 10
+    assert responses.get("/authors/A1", {}) is None
+    _fill(responses, clock, range(5, 15))
+    responses._db.set_trace_callback(None)
+    # writes never sum the sizes of all entries
+    assert statements
+    assert not any("SUM(" in statement.upper() for statement in statements)
+    (total,) = responses._db.execute("SELECT SUM(size) FROM responses").fetchone()
+    assert responses.size() == total <= 900
+    responses.clear()
+    assert responses.size() == 0
+
+
+def test_bodies_over_budget_are_not_stored():
+    responses = ResponseCache(":memory:", max_bytes=10)
+    responses.set("/works", {}, b"x" * 11)
+    assert responses.get("/works", {}) is None
+
+
+def test_size_is_shared_between_processes(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    first, second = (ResponseCache(path, max_bytes=1000) for _ in range(2))
+    for page in range(8):
+        clock.value += 1
+        first.set("/works", {"page": str(page)}, b"x" * 100)
+        second.set("/authors", {"page": str(page)}, b"x" * 100)
+    assert first.size() == second.size() <= 1000
+
+
+def test_client_serves_cached_responses(config, server, tmp_path):
+    metrics = MetricsCollector()
+    responses = ResponseCache(str(tmp_path / "cache.db"))
+    with Client(config, cache=responses, hooks=[metrics]) as client:
+        first = client.get_page(WORKS.query(type="article"))
+        served = sum(server.stats.values())
+        assert client.get_page(WORKS.query(type="article")) == first
+        assert sum(server.stats.values()) == served
+    assert [m.cached for m in metrics.requests] == [False, True]
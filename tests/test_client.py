@@ -0,0 +1,244 @@
+import asyncio
+import time
+
+import pytest
+
+from aletheca.api import AsyncClient, Client
+from aletheca.endpoints import WORKS
+from aletheca.entities import Work
+from aletheca.identity import IdentityMap
+from tests.support.mock_server import Faults, MockOpenAlex
+
+# --------
+# batched lookups
+# --------
+
+
+def test_get_many(config, server):
+    records = server.data["works"]
+    ids = [
+        records[3]["id"],
+        "W10",
+        "https://openalex.org/W99999999",
+        "not an id",
+        records[3]["id"],
+        records[0]["doi"],
+    ] + [f"W{n}" for n in range(100, 160)]
+    with Client(config) as client:
+        lookup = client.get_many(WORKS, ids)
+    assert lookup.ids == ids
+    assert [work.id if work else None for work in lookup.results[:5]] == [
+        records[3]["id"],
+        "https://openalex.org/W10",
+        None,
+        None,
+        records[3]["id"],
+    ]
+    # copies of the recorded work share its doi, when they have one
+    assert lookup.results[5].doi == records[0]["doi"]
+    assert [work.id for work in lookup.results[6:]] == [
+        f"https://openalex.org/W{n}" for n in range(100, 160)
+    ]
+    assert lookup.missing == ["https://openalex.org/W99999999"]
+    assert lookup.invalid == ["not an id"]
+    # 63 distinct openalex ids in two OR-filter requests of at most `MAX_OR_VALUES`, one for the doi
+    assert sum(server.stats.values()) == 3
+
+
+def test_async_get_many(config):
+    async def lookup():
+        async with AsyncClient(config) as client:
+            return await client.get_many(WORKS, [f"W{n}" for n in range(1, 11)])
+
+    result = asyncio.run(lookup())
+    assert [work.id.rpartition("/")[2] for work in result.results] == [
+        f"W{n}" for n in range(1, 11)
+    ]
+
+
+@pytest.fixture
+def shared_dois(config):
+    # 60 works with 3 dois, each shared by 20 works, in pages of 25
+    with MockOpenAlex(results=60) as server:
+        for index, work in enumerate(server.data["works"]):
+            work["doi"] = f"https://doi.org/10.1234/{index // 20}"
+        config.api_base_url = server.url
+        config.per_page = 25
+        yield server
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_get_many_reads_further_pages(config, shared_dois, asynchronous):
+    works = shared_dois.data["works"]
+    ids = ["10.1234/0", "10.1234/2", "10.1234/1"]
+
+    async def lookup_async(ids):
+        async with AsyncClient(config) as client:
+            return await client.get_many(WORKS, ids)
+
+    def lookup(ids):
+        if asynchronous:
+            return asyncio.run(lookup_async(ids))
+        with Client(config) as client:
+            return client.get_many(WORKS, ids)
+
+    # the first page only has works with the first two dois
+    result = lookup(ids)
+    assert [work.id for work in result.results] == [works[n]["id"] for n in (0, 40, 20)]
+    assert result.missing == []
+    assert shared_dois.stats[200] == 2
+    # an id without a match reads every page of its request before it is reported missing
+    shared_dois.stats.clear()
+    result = lookup(["10.1234/0", "10.1234/1", "10.1234/9"])
+    assert result.missing == ["10.1234/9"]
+    assert shared_dois.stats[200] == 2
+
+
+# --------
+# identity map
+# --------
+
+
+@pytest.mark.parametrize("strict_parsing", [False, True])
+def test_identity_map(config, server, strict_parsing):
+    config.strict_parsing = strict_parsing
+    with Client(config, identity_map=IdentityMap()) as client:
+        first = client.get(WORKS, "W5")
+        assert client.get(WORKS, "https://openalex.org/W5") is first
+        assert sum(server.stats.values()) == 1
+
+
+def test_identity_map_expires_with_the_cache_ttl(config, server):
+    config.cache_ttls = {"works": 0}
+    with Client(config, identity_map=IdentityMap()) as client:
+        first = client.get(WORKS, "W5")
+        second = client.get(WORKS, "W5")
+    assert second == first
+    assert second is not first
+    assert sum(server.stats.values()) == 2
+
+
+# --------
+# counts
+# --------
+
+
+# queries, with the records they match
+QUERIES = [
+    (WORKS.query(), lambda work: True),
+    (WORKS.query(type="article"), lambda work: work["type"] == "article"),
+    (WORKS.query(publication_year=2000), lambda work: work["publication_year"] == 2000),
+    (
+        WORKS.query(publication_year=[2000, 2001, 2002], type="preprint"),
+        lambda work: (
+            work["publication_year"] in (2000, 2001, 2002)
+            and work["type"] == "preprint"
+        ),
+    ),
+]
+
+
+@pytest.fixture
+def counts(server):
+    return [sum(map(matches, server.data["works"])) for _, matches in QUERIES]
+
+
+def test_count_many(config, server, counts):
+    assert counts[0] == len(server.data["works"])
+    queries = [query for query, _ in QUERIES]
+    with Client(config) as client:
+        assert client.count_many(queries) == counts
+        served = sum(server.stats.values())
+        # counts are remembered by the client
+        assert client.count(queries[1]) == counts[1]
+        assert sum(server.stats.values()) == served
+        client.count(queries[1], refresh=True)
+        assert sum(server.stats.values()) == served + 1
+
+
+def test_async_count_many(config, counts):
+    async def count_many():
+        async with AsyncClient(config) as client:
+            return await client.count_many(query for query, _ in QUERIES)
+
+    assert asyncio.run(count_many()) == counts
+
+
+# --------
+# pagination
+# --------
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_paginate(config, server, prefetch):
+    config.per_page = 60
+    expected = [
+        work["id"] for work in server.data["works"] if work["type"] == "article"
+    ]
+    with Client(config) as client:
+        pages = list(client.paginate(WORKS.query(type="article"), prefetch=prefetch))
+        assert [len(page.results) for page in pages[:-1]] == [60] * (len(pages) - 1)
+        assert [work.id for page in pages for work in page.results] == expected
+        works = client.iterate(WORKS.query(type="article"), prefetch=prefetch)
+        assert [work.id for work in works] == expected
+
+
+def _read_slowly(client: Client, prefetch: bool) -> float:
+    started = time.monotonic()
+    for _ in client.paginate(WORKS.query(), prefetch=prefetch):
+        time.sleep(0.05)
+    return time.monotonic() - started
+
+
+def test_prefetch_overlaps_requests_with_processing(config, server):
+    config.per_page = 100
+    server.faults = Faults(latency=0.05)
+    with Client(config) as client:
+        sequential = _read_slowly(client, prefetch=False)
+        prefetched = _read_slowly(client, prefetch=True)
+    # 5 pages: 5 x (request + processing) against one request plus 5 x processing
+    assert sequential >= 0.5
+    assert prefetched < sequential * 0.8
+
+
+def test_prefetch_fetches_one_page_ahead(config, server):
+    config.per_page = 50
+    with Client(config) as client:
+        pages = client.paginate(WORKS.query())
+        next(pages)
+        time.sleep(0.2)
+        assert sum(server.stats.values()) == 2
+        pages.close()
+    assert sum(server.stats.values()) == 2
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_async_paginate(config, server, prefetch):
+    config.per_page = 60
+
+    async def paginate():
+        async with AsyncClient(config) as client:
+            return [
+                work.id
+                async for work in client.iterate(
+                    WORKS.query(type="article"), prefetch=prefetch
+                )
+            ]
+
+    expected = [
+        work["id"] for work in server.data["works"] if work["type"] == "article"
+    ]
+    assert asyncio.run(paginate()) == expected
+
+
+def test_selected_queries_return_partial_entities(config, server):
+    config.per_page = 200
+    query = WORKS.query(type="article").selecting("id", "doi")
+    with Client(config) as client:
+        works = list(client.iterate(query))
+    assert {type(work) for work in works} == {Work.partial("id", "doi")}
+    assert [(work.id, work.doi) for work in works] == [
+        (work["id"], work["doi"])
+        for work in server.data["works"]
+        if work["type"] == "article"
+    ]
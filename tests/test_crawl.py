@@ -0,0 +1,98 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from aletheca import crawl
+from aletheca.api import AsyncClient
+from aletheca.endpoints import WORKS
+
+
+def _run(config, work):
+    async def run():
+        async with AsyncClient(config) as client:
+            return await work(client)
+
+    return asyncio.run(run())
+
+
+def _filters(shard: crawl.Shard) -> dict:
+    return dict(
+        part.split(":", 1) for part in shard.query.params()["filter"].split(",")
+    )
+
+
+@pytest.mark.parametrize("target", [40, 200])
+def test_plan_shards_partitions_the_query(config, server, target):
+    shards = _run(
+        config,
+        lambda client: crawl.plan_shards(
+            client, WORKS.query(), ("publication_year", "type"), target
+        ),
+    )
+    works = server.data["works"]
+    assert sum(shard.count for shard in shards) == len(works)
+    # every work is in exactly one shard
+    owners = Counter()
+    for shard in shards:
+        filters = _filters(shard)
+        years = filters["publication_year"].split("|")
+        types = filters.get("type", "").split("|") if "type" in filters else None
+        matching = [
+            work["id"]
+            for work in works
+            if str(work["publication_year"]) in years
+            and (types is None or work["type"] in types)
+        ]
+        assert len(matching) == shard.count
+        owners.update(matching)
+    assert len(owners) == len(works)
+    assert set(owners.values()) == {1}
+    # shards of a single value can be larger than the target only if they can't be split further
+    for shard in shards:
+        if shard.count > target:
+            assert "type" in _filters(shard)
+
+
+def test_crawl_yields_every_result_once(config, server):
+    async def work(client):
+        return [work.id async for work in crawl.crawl(client, WORKS.query(), streams=4)]
+
+    ids = _run(config, work)
+    assert Counter(ids) == Counter(work["id"] for work in server.data["works"])
+
+
+def test_crawl_of_a_filtered_query(config, server):
+    async def work(client):
+        query = WORKS.query(type="article")
+        return [
+            work.id
+            async for work in crawl.crawl(client, query, by=("publication_year",))
+        ]
+
+    ids = _run(config, work)
+    expected = [
+        work["id"] for work in server.data["works"] if work["type"] == "article"
+    ]
+    assert sorted(ids) == sorted(expected)
+
+
+def test_plan_shards_rejects_partitions_that_miss_results(config, server):
+    # a count that the partitions on `type` cannot add up to
+    count = len(server.data["works"]) + 1
+
+    async def work(client):
+        return await crawl.plan_shards(
+            client, WORKS.query(), ("type",), 100, count=count
+        )
+
+    with pytest.raises(ValueError, match="partitions on 'type'"):
+        _run(config, work)
+
+
+def test_partitioning_on_unsupported_fields(config):
+    async def work(client):
+        return await crawl.plan_shards(client, WORKS.query(), ("title",), 100)
+
+    with pytest.raises(ValueError, match="only Literal and int fields"):
+        _run(config, work)
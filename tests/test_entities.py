@@ -0,0 +1,122 @@
+import dataclasses
+
+import dacite
+import msgspec
+import pytest
+
+from aletheca import parsing
+from aletheca.entities import (
+    Partial,
+    Work,
+    WorkIds,
+    default_dacite_config,
+    partial_type,
+)
+from tests.support.pages import load_page
+
+# required fields of a work: the fields without a default
+REQUIRED = [
+    f.name
+    for f in dataclasses.fields(Work)
+    if f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING
+]
+
+
+def _work() -> dict:
+    return msgspec.json.decode(load_page("works", 1))["results"][0]
+
+
+def test_entities_are_keyword_only():
+    with pytest.raises(TypeError):
+        WorkIds("https://openalex.org/W1")  # type: ignore[misc]
+    ids = WorkIds(openalex="https://openalex.org/W1")
+    assert ids.doi is None
+    assert ids.pmid is None
+
+
+def test_required_fields_have_no_default():
+    assert "publication_year" in REQUIRED
+    assert "authorships" in REQUIRED
+    with pytest.raises(TypeError, match="openalex"):
+        WorkIds()  # type: ignore[call-arg]
+
+
+@pytest.mark.parametrize("name", REQUIRED)
+def test_from_dict_rejects_missing_required_fields(name):
+    assert default_dacite_config.strict
+    work = _work()
+    del work[name]
+    with pytest.raises(dacite.MissingValueError) as error:
+        parsing.from_dict(Work, work, default_dacite_config)
+    assert error.value.field_path == name
+    with pytest.raises(dacite.MissingValueError):
+        Work.from_dict(work)
+    with pytest.raises(
+        msgspec.ValidationError, match=f"missing required field `{name}`"
+    ):
+        Work.from_json(msgspec.json.encode(work))
+
+
+def test_missing_optional_fields_are_none():
+    work = _work()
+    del work["doi"], work["ids"]["doi"]
+    parsed = Work.from_dict(work)
+    assert parsed.doi is None
+    assert parsed.ids.doi is None
+    assert Work.from_json(msgspec.json.encode(work)) == parsed
+
+
+# --------
+# partial entities
+# --------
+
+
+def test_partial_types_are_cached():
+    partial = Work.partial("id", "doi", "title")
+    assert partial_type(Work, ["title", "doi", "id"]) is partial
+    assert partial.__name__ == "PartialWork"
+    assert partial.__partial_of__ is Work
+    assert issubclass(partial, Partial)
+    # fields keep the order of the entity
+    assert [f.name for f in dataclasses.fields(partial)] == ["id", "title", "doi"]
+    assert Work.partial("id") is not partial
+
+
+def test_partial_types_reject_unknown_fields():
+    with pytest.raises(ValueError, match=r"unknown fields for Work: \['nope'\]"):
+        Work.partial("id", "nope")
+
+
+def test_partial_types_keep_required_fields():
+    partial = Work.partial("id", "publication_year", "doi")
+    with pytest.raises(TypeError, match="publication_year"):
+        partial(id="https://openalex.org/W1")
+    assert partial(id="https://openalex.org/W1", publication_year=2000).doi is None
+    with pytest.raises(dacite.MissingValueError):
+        partial.from_dict({"id": "https://openalex.org/W1"})
+
+
+def test_partial_types_keep_selected_interned_fields():
+    assert Work.partial("id", "language").interned_fields == {"language"}
+    assert Work.partial("id", "doi").interned_fields == frozenset()
+
+
+def test_partial_types_parse_selected_responses():
+    fields = ("id", "doi", "authorships", "open_access")
+    partial = Work.partial(*fields)
+    work = _work()
+    selected = {name: work[name] for name in fields}
+    full = Work.from_dict(work)
+    for parsed in (
+        partial.from_dict(selected),
+        partial.from_json(msgspec.json.encode(selected)),
+    ):
+        assert {name: getattr(parsed, name) for name in fields} == {
+            name: getattr(full, name) for name in fields
+        }
+    # a selected response is validated just as strictly as a complete one
+    selected["open_access"]["is_oa"] = "yes"
+    with pytest.raises(dacite.WrongTypeError):
+        partial.from_dict(selected)
+    with pytest.raises(msgspec.ValidationError):
+        partial.from_json(msgspec.json.encode(selected))
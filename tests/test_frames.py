@@ -0,0 +1,233 @@
+import io
+import json
+import random
+
+import polars as pl
+import pytest
+
+from aletheca import frames, utils
+from aletheca.endpoints import ENDPOINTS
+from aletheca.entities import Response, Work
+from tests.support.pages import ENTITY_TYPES, load_page
+
+
+def test_polars_schema_of_works():
+    schema = frames.polars_schema(Work)
+    assert isinstance(schema["type"], pl.Enum)
+    assert "article" in schema["type"].categories
+    assert schema["publication_year"] == pl.Int64
+    assert isinstance(schema["open_access"], pl.Struct)
+    assert isinstance(schema["authorships"], pl.List)
+    assert isinstance(schema["authorships"].inner, pl.Struct)
+    # mixed `int | str` ids are strings
+    assert dict(schema["ids"].to_schema())["mag"] == pl.String
+    # free-form dicts have no fixed schema
+    assert "abstract_inverted_index" not in schema
+
+
+@pytest.mark.parametrize("entity_type", ENTITY_TYPES)
+def test_frame_from_json_matches_parsed_entities(entity_type):
+    body = load_page(entity_type, 30)
+    result_type = ENDPOINTS[entity_type].entity
+    frame = frames.frame_from_json(body, result_type)
+    assert frame.schema == frames.polars_schema(result_type)
+    assert frame["id"].to_list() == [r["id"] for r in json.loads(body)["results"]]
+    entities = Response.from_json(body, result_type).results
+    assert frame.equals(frames.frame_from_entities(entities, result_type))
+    assert frame.equals(
+        frames.frame_from_dicts(json.loads(body)["results"], result_type)
+    )
+
+
+def test_frame_from_several_pages():
+    page = json.loads(load_page("works", 10))
+    first, second = dict(page), dict(page)
+    first["results"] = page["results"][:4] + [None]
+    second["results"] = page["results"][4:]
+    frame = frames.frame_from_json(
+        [json.dumps(first), json.dumps(second).encode()], Work
+    )
+    # null results are dropped
+    assert frame["id"].to_list() == [r["id"] for r in page["results"]]
+
+
+def test_frame_without_pages():
+    frame = frames.frame_from_json([], Work)
+    assert frame.is_empty()
+    assert frame.schema == frames.polars_schema(Work)
+
+
+def test_unknown_literal_values_raise():
+    page = json.loads(load_page("works", 1))
+    page["results"][0]["type"] = "novel"
+    with pytest.raises(pl.exceptions.PolarsError):
+        frames.frame_from_json(json.dumps(page), Work)
+
+
+# --------
+# abstracts
+# --------
+
+
+def _indexes(rows: int, seed: int = 0) -> list[dict[str, list[int]] | None]:
+    rng = random.Random(seed)
+    indexes: list[dict[str, list[int]] | None] = [None, {}, {"gap": [3], "at": [0]}]
+    for _ in range(rows):
+        index: dict[str, list[int]] = {}
+        for position in rng.sample(range(60), rng.randrange(0, 40)):
+            index.setdefault(f"w{rng.randrange(30)}", []).append(position)
+        indexes.append(index or None)
+    return indexes
+
+
+def test_parse_inverted_abstracts_matches_the_scalar_function():
+    indexes = _indexes(200)
+    expected = list(map(utils.parse_inverted_abstract, indexes))
+    assert expected[:3] == [None, None, "at gap"]
+    assert utils.parse_inverted_abstracts(indexes) == expected
+    assert utils.parse_inverted_abstracts(iter(indexes)) == expected
+    assert utils.parse_inverted_abstracts([]) == []
+    assert utils.parse_inverted_abstracts([{"empty": []}]) == [None]
+
+
+def test_abstracts_from_a_list_column():
+    indexes = _indexes(200)
+    inverted = pl.Series(
+        "abstract_inverted_index",
+        [
+            [{"word": w, "positions": p} for w, p in index.items()]
+            if index is not None
+            else None
+            for index in indexes
+        ],
+        dtype=frames.INVERTED_INDEX_DTYPE,
+    )
+    result = frames.abstracts(inverted)
+    assert result.name == "abstract_inverted_index"
+    assert result.to_list() == list(map(utils.parse_inverted_abstract, indexes))
+
+
+def test_abstracts_from_a_map_column():
+    # a map column read from parquet: (key, value) structs with int32 positions
+    indexes = _indexes(50)
+    dtype = pl.List(pl.Struct({"key": pl.String, "value": pl.List(pl.Int32)}))
+    inverted = pl.Series(
+        [
+            [{"key": w, "value": p} for w, p in index.items()] if index else None
+            for index in indexes
+        ],
+        dtype=dtype,
+    )
+    expected = list(map(utils.parse_inverted_abstract, indexes))
+    assert frames.abstracts(inverted).to_list() == expected
+
+
+def test_abstracts_from_a_struct_column(monkeypatch):
+    # small chunks, so some hold no words at all
+    monkeypatch.setattr(frames, "_STRUCT_CHUNK_ROWS", 4)
+    indexes = [None] * 5 + _indexes(40)
+    works = pl.read_json(
+        io.BytesIO(
+            json.dumps([{"abstract_inverted_index": i} for i in indexes]).encode()
+        ),
+        infer_schema_length=None,
+    )
+    assert isinstance(works.schema["abstract_inverted_index"], pl.Struct)
+    expected = list(map(utils.parse_inverted_abstract, indexes))
+    assert (
+        works.select(frames.abstract_expr())["abstract_inverted_index"].to_list()
+        == expected
+    )
+
+
+def test_abstracts_without_words():
+    for inverted in (
+        pl.Series([None, None], dtype=frames.INVERTED_INDEX_DTYPE),
+        pl.Series([None, None]),
+        pl.Series([], dtype=pl.Struct({"word": pl.List(pl.Int64)})),
+    ):
+        result = frames.abstracts(inverted)
+        assert result.dtype == pl.String
+        assert result.to_list() == [None] * len(inverted)
+
+
+def test_abstract_of_a_recorded_work():
+    work = json.loads(load_page("works", 1))["results"][0]
+    works = pl.read_json(io.BytesIO(json.dumps([work]).encode()))
+    abstract = works.select(frames.abstract_expr()).item()
+    assert abstract == utils.parse_inverted_abstract(work["abstract_inverted_index"])
+    assert abstract.startswith("This contribution is part of a debate")
+
+
+# --------
+# identifiers
+# --------
+
+IDS = [
+    "https://doi.org/10.1234/ABC.def",
+    "http://dx.doi.org/10.1000/182",
+    "doi: 10.5555/x(1)",
+    " 10.31269/triplec.v16i2.1027 ",
+    "https://openalex.org/W2802148931",
+    "a5060947607",
+    "https://orcid.org/0000-0002-1499-8751",
+    "0000-0002-1499-875X",
+    "https://ror.org/00453a208",
+    "pmid:29456894",
+    "https://pubmed.ncbi.nlm.nih.gov/29456894",
+    "PMC1234567",
+    "mag:2802148931",
+    "https://www.wikidata.org/wiki/Q2519156",
+    "1234-5678",
+    "29456894",
+    "not an id",
+    "",
+]
+
+
+def _or_none(function, *args):
+    # the scalar functions raise on invalid input, the expressions give null
+    def wrapped(value):
+        try:
+            return function(value, *args)
+        except ValueError:
+            return None
+
+    return wrapped
+
+
+@pytest.mark.parametrize(
+    ("scalar", "expr"),
+    [
+        (utils.short_doi, frames.short_doi_expr("id")),
+        (utils.normalize_doi, frames.normalize_doi_expr("id")),
+        (utils.determine_id_type, frames.id_type_expr("id").cast(pl.String)),
+        (utils.short_id, frames.short_id_expr("id")),
+    ],
+    ids=["short_doi", "normalize_doi", "determine_id_type", "short_id"],
+)
+def test_identifier_expressions_match_the_scalar_functions(scalar, expr):
+    ids = pl.DataFrame({"id": IDS + [None]})
+    expected = [_or_none(scalar)(value) for value in IDS] + [None]
+    assert ids.select(expr).to_series().to_list() == expected
+    # the values cover valid and invalid input
+    assert None in expected[:-1]
+    assert len(set(expected)) > 2
+
+
+@pytest.mark.parametrize("id_type", ["doi", "openalex", "orcid", "pmid", "pmcid"])
+def test_short_id_expression_of_a_given_type(id_type):
+    ids = pl.DataFrame({"id": IDS})
+    expected = [_or_none(utils.short_id, id_type)(value) for value in IDS]
+    assert (
+        ids.select(frames.short_id_expr("id", id_type)).to_series().to_list()
+        == expected
+    )
+    assert any(expected)
+
+
+def test_id_type_expression_is_an_enum():
+    dtype = (
+        pl.DataFrame({"id": IDS}).select(frames.id_type_expr("id")).to_series().dtype
+    )
+    assert dtype == frames.ID_TYPE_DTYPE
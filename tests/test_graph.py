@@ -0,0 +1,108 @@
+import random
+from collections import defaultdict
+from types import SimpleNamespace
+
+import numpy as np
+import polars as pl
+import pytest
+
+from aletheca.graph import CitationGraph, GraphBuilder
+
+
+def _works(n: int = 300, seed: int = 18) -> list[SimpleNamespace]:
+    # works W1000..W(1000+n), referencing other works and some works that are not in the batch
+    rng = random.Random(seed)
+    return [
+        SimpleNamespace(
+            id=f"https://openalex.org/W{1000 + k}",
+            referenced_works=[
+                f"https://openalex.org/W{rng.randrange(900, 1000 + n + 50)}"
+                for _ in range(rng.randrange(0, 12))
+            ],
+        )
+        for k in range(n)
+    ]
+
+
+def _naive(works: list[SimpleNamespace]) -> tuple[dict, dict]:
+    out, into = defaultdict(list), defaultdict(list)
+    for work in works:
+        for target in work.referenced_works:
+            out[work.id].append(target)
+            into[target].append(work.id)
+    return out, into
+
+
+@pytest.fixture(scope="module")
+def works():
+    return _works()
+
+
+@pytest.fixture(scope="module")
+def graph(works, tmp_path_factory):
+    # a small chunk size, so that edges are spilled and sorted over many chunks
+    with GraphBuilder(tmp_path_factory.mktemp("graph"), chunk_edges=37) as builder:
+        for start in range(0, len(works), 50):
+            builder.add(works[start : start + 50])
+    return CitationGraph.load(builder.path)
+
+
+def test_graph_matches_adjacency_lists(works, graph):
+    out, into = _naive(works)
+    nodes = {work.id for work in works} | set(into)
+    assert len(graph) == len(nodes)
+    assert graph.edge_count == sum(len(targets) for targets in out.values())
+    for node in nodes:
+        assert sorted(graph.references(node)) == sorted(out.get(node, []))
+        assert sorted(graph.cited_by(node)) == sorted(into.get(node, []))
+    assert graph.out_degree().sum() == graph.in_degree().sum() == graph.edge_count
+
+
+def test_frames_build_the_same_graph(works, graph, tmp_path):
+    frame = pl.DataFrame(
+        {
+            "id": [work.id for work in works],
+            "referenced_works": [work.referenced_works for work in works],
+        }
+    )
+    with GraphBuilder(tmp_path, chunk_edges=37) as builder:
+        builder.add(frame)
+    from_frame = CitationGraph.load(tmp_path, mmap=False)
+    for name in ("ids", "out_indptr", "out_indices", "in_indptr", "in_indices"):
+        assert np.array_equal(getattr(from_frame, name), getattr(graph, name))
+
+
+def test_unknown_work(graph):
+    with pytest.raises(KeyError):
+        graph.index("W1")
+
+
+def _naive_bfs(works, source: str, max_depth: int) -> list[set[str]]:
+    out, _ = _naive(works)
+    levels, seen = [{source}], {source}
+    while len(levels) <= max_depth:
+        reached = {t for node in levels[-1] for t in out.get(node, [])} - seen
+        if not reached:
+            break
+        seen |= reached
+        levels.append(reached)
+    return levels
+
+
+@pytest.mark.parametrize(
+    "sources",
+    [
+        lambda index: index,
+        lambda index: [index],
+        lambda index: np.array([index]),
+        lambda index: (i for i in [index, index]),
+        lambda index: iter([index]),
+    ],
+    ids=["int", "list", "array", "generator", "iterator"],
+)
+def test_bfs(works, graph, sources):
+    source = works[0].id
+    levels = graph.bfs(sources(graph.index(source)), max_depth=3)
+    assert [set(graph.openalex_ids(level)) for level in levels] == _naive_bfs(
+        works, source, 3
+    )
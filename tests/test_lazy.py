@@ -0,0 +1,149 @@
+import pytest
+
+from aletheca.api import Client
+from aletheca.lazy import Works
+from tests.support.mock_server import MockOpenAlex
+
+
+class RecordingClient(Client):
+    """A client that records the path and parameters of every request."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests: list[tuple[str, dict[str, str]]] = []
+
+    def request(self, path, params=None):
+        self.requests.append((path, dict(params or {})))
+        return super().request(path, params)
+
+
+def _selects(client: RecordingClient) -> list[str]:
+    return [params["select"] for _, params in client.requests]
+
+
+# --------
+# select pushdown
+# --------
+
+
+def test_creating_a_query_sends_no_request(config):
+    with RecordingClient(config) as client:
+        works = Works(client=client).where(type="article").select("doi")
+        assert client.requests == []
+        assert works.fields == {"doi"}
+
+
+def test_pages_are_requested_with_a_minimal_selection(config, server):
+    config.per_page = 100
+    with RecordingClient(config) as client:
+        ids = [work.id for work in Works(client=client)]
+    assert ids == [work["id"] for work in server.data["works"]]
+    assert set(_selects(client)) == {"id"}
+
+
+def test_unselected_fields_are_fetched_on_first_access(config, server):
+    config.per_page = 100
+    records = server.data["works"]
+    with RecordingClient(config) as client:
+        works = iter(Works(client=client))
+        first = next(works)
+        assert _selects(client) == ["id"]
+        # the current page is requested again with the field, for all of its works
+        assert first.doi == records[0]["doi"]
+        assert _selects(client) == ["id", "doi,id"]
+        second = next(works)
+        assert second.title == records[1]["title"]
+        assert second.doi == records[1]["doi"]
+        assert _selects(client) == ["id", "doi,id", "doi,id,title"]
+        # and following pages include every field that was read
+        rest = list(works)
+    assert len(rest) == len(records) - 2
+    assert set(_selects(client)[3:]) == {"doi,id,title"}
+    assert [work.title for work in rest] == [work["title"] for work in records[2:]]
+    assert len(client.requests) == 3 + len(records) // 100 - 1
+
+
+def test_select_rejects_unknown_fields(config):
+    with pytest.raises(ValueError, match="unknown fields for works"):
+        Works(client=Client(config)).select("doi", "nope")
+
+
+def test_get_journals_fetches_only_locations(config, server):
+    config.per_page = 200
+    expected = [
+        source_id
+        for work in server.data["works"]
+        for source_id in dict.fromkeys(
+            location["source"]["id"]
+            for location in work["locations"]
+            if location["source"] and location["source"]["type"] == "journal"
+        )
+    ]
+    assert expected
+    with RecordingClient(config) as client:
+        journals = list(Works(client=client).get_journals())
+    assert [journal.id for journal in journals] == expected
+    assert set(_selects(client)) == {"id,locations"}
+
+
+# --------
+# works of an institution
+# --------
+
+
+INSTITUTION = "https://openalex.org/I999999999"
+
+
+@pytest.fixture
+def institution_server(config):
+    # the first institution has a unique name and id, and every third work with an affiliation has it
+    with MockOpenAlex(results=30) as server:
+        institution = server.data["institutions"][0]
+        institution.update(id=INSTITUTION, display_name="University of Twente")
+        affiliated = [
+            work
+            for work in server.data["works"]
+            if work["authorships"] and work["authorships"][0]["institutions"]
+        ]
+        for work in affiliated[::3]:
+            work["authorships"][0]["institutions"][0]["lineage"] = [INSTITUTION]
+        config.api_base_url = server.url
+        yield server
+
+
+def _affiliated(server: MockOpenAlex) -> list[str]:
+    return [
+        work["id"]
+        for work in server.data["works"]
+        if any(
+            INSTITUTION in institution["lineage"]
+            for authorship in work["authorships"]
+            for institution in authorship["institutions"]
+        )
+    ]
+
+
+def test_works_from_institution_by_name(config, institution_server):
+    expected = _affiliated(institution_server)
+    assert expected
+    with RecordingClient(config) as client:
+        works = Works.from_institution(name="University of Twente", client=client)
+        assert client.requests == []
+        assert [work.id for work in works] == expected
+    (path, search), (_, page) = client.requests
+    assert path == "/institutions"
+    assert search["search"] == "University of Twente"
+    assert page["filter"] == "authorships.institutions.lineage:I999999999"
+
+
+def test_works_from_institution_by_id(config, institution_server):
+    expected = _affiliated(institution_server)
+    with RecordingClient(config) as client:
+        works = Works.from_institution(INSTITUTION, client=client)
+        assert [work.id for work in works] == expected
+    assert [path for path, _ in client.requests] == ["/works"]
+
+
+def test_works_from_institution_needs_an_id_or_a_name():
+    with pytest.raises(ValueError, match="either the id or the name"):
+        Works.from_institution()
@@ -0,0 +1,66 @@
+from aletheca.metrics import MetricsCollector, RequestMetrics
+
+
+def _request(total_seconds: float, **kwargs) -> RequestMetrics:
+    return RequestMetrics(
+        path="/works",
+        endpoint="works",
+        status=200,
+        total_seconds=total_seconds,
+        **kwargs,
+    )
+
+
+def _samples(exported: str, metric: str) -> dict[str, float]:
+    # the samples of one metric, by name (with labels)
+    return {
+        sample: float(value)
+        for sample, _, value in (
+            line.rpartition(" ") for line in exported.splitlines() if line[0] != "#"
+        )
+        if sample.startswith(metric)
+    }
+
+
+# --------
+# prometheus
+# --------
+
+
+def test_prometheus_sums_and_counts_cover_all_requests():
+    metrics = MetricsCollector(maxlen=2)
+    for seconds in (1.0, 2.0, 3.0, 4.0):
+        metrics(_request(seconds, parse_seconds=seconds / 10))
+    exported = metrics.to_prometheus()
+    total = _samples(exported, "aletheca_request_total_seconds")
+    # the quantiles are those of the last two requests
+    assert total['aletheca_request_total_seconds{quantile="0.5"}'] == 3.5
+    assert total["aletheca_request_total_seconds_sum"] == 10.0
+    assert total["aletheca_request_total_seconds_count"] == 4
+    parse = _samples(exported, "aletheca_request_parse_seconds")
+    assert parse["aletheca_request_parse_seconds_sum"] == 1.0
+    assert _samples(exported, "aletheca_requests_total") == {
+        "aletheca_requests_total": 4
+    }
+    # the summary keeps describing the kept requests
+    assert metrics.summary()["total_seconds"]["count"] == 2
+
+
+def test_prometheus_leaves_out_timings_without_values():
+    metrics = MetricsCollector()
+    metrics(_request(1.0, connect_seconds=0.1))
+    metrics(_request(2.0))
+    exported = metrics.to_prometheus()
+    assert _samples(exported, "aletheca_request_connect_seconds_count") == {
+        "aletheca_request_connect_seconds_count": 1
+    }
+    assert "tls_seconds" not in exported
+
+
+def test_clear_resets_the_timing_counters():
+    metrics = MetricsCollector()
+    metrics(_request(1.0))
+    metrics.clear()
+    assert metrics.timing_counts["total_seconds"] == 0
+    assert metrics.timing_sums["total_seconds"] == 0.0
+    assert "total_seconds" not in metrics.to_prometheus()
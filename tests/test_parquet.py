@@ -0,0 +1,50 @@
+import json
+
+import polars as pl
+
+from aletheca.entities import Response, Work
+from aletheca.parquet import NULL_PARTITION, ParquetSink, write_parquet
+from tests.support.pages import load_page
+
+
+def _records(results: int, seed: int = 0) -> list[dict]:
+    return json.loads(load_page("works", results, seed))["results"]
+
+
+def test_write_pages_of_dicts_and_entities(tmp_path):
+    records = _records(40)
+    entities = Response.from_json(load_page("works", 40, seed=1), Work).results
+    files = write_parquet([records, entities], tmp_path, Work)
+    assert files == [tmp_path / "part-00000.parquet"]
+    frame = pl.read_parquet(tmp_path)
+    assert frame["id"].to_list() == [r["id"] for r in records] + [
+        work.id for work in entities
+    ]
+
+
+def test_null_records_are_skipped(tmp_path):
+    records = _records(20)
+    with ParquetSink(tmp_path, Work, partition_by="publication_year") as sink:
+        sink.write([None, *records[:10], None])
+        sink.write(
+            Response.from_json(load_page("works", 10, seed=1), Work).results + [None]
+        )
+        sink.write([None])
+    assert not (tmp_path / f"publication_year={NULL_PARTITION}").exists()
+    frame = pl.read_parquet(tmp_path, hive_partitioning=True)
+    assert len(frame) == 20
+    assert frame["id"].null_count() == 0
+
+
+def test_partitions_and_part_numbers(tmp_path):
+    records = _records(60)
+    write_parquet([records], tmp_path, Work, partition_by=["type"])
+    files = write_parquet([records], tmp_path, Work, partition_by=["type"])
+    types = {record["type"] for record in records}
+    # a second export continues the numbering of each partition
+    assert sorted(file.parent.name for file in files) == sorted(
+        f"type={value}" for value in types
+    )
+    assert {file.name for file in files} == {"part-00001.parquet"}
+    frame = pl.read_parquet(tmp_path, hive_partitioning=True)
+    assert len(frame) == 2 * len(records)
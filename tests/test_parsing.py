@@ -0,0 +1,277 @@
+import copy
+import dataclasses
+import json
+
+import dacite
+import pytest
+from loguru import logger
+
+from aletheca import entities, parsing
+from aletheca.endpoints import ENDPOINTS
+from aletheca.entities import Work, default_dacite_config
+from aletheca.identity import IdentityMap
+from tests.support.pages import ENTITY_TYPES, load_page
+
+
+def _results(entity_type: str, results: int = 40) -> list[dict]:
+    return json.loads(load_page(entity_type, results))["results"]
+
+
+def _dacite(data_class: type, data: dict):
+    return dacite.from_dict(data_class, data, config=default_dacite_config)
+
+
+@pytest.mark.parametrize("entity_type", ENTITY_TYPES)
+def test_from_dict_matches_dacite(entity_type):
+    data_class = ENDPOINTS[entity_type].entity
+    for result in _results(entity_type):
+        expected = _dacite(data_class, result)
+        assert parsing.from_dict(data_class, result, default_dacite_config) == expected
+
+
+def _work() -> dict:
+    return _results("works", 1)[0]
+
+
+def _set(path: str, value):
+    def change(work: dict) -> None:
+        *parents, name = path.split(".")
+        for part in parents:
+            work = work[int(part)] if part.isdigit() else work[part]
+        work[name] = value
+
+    return change
+
+
+def _delete_required(work: dict) -> None:
+    required = next(
+        f.name
+        for f in dataclasses.fields(Work)
+        if f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING
+    )
+    del work[required]
+
+
+INVALID = {
+    "wrong type": _set("publication_year", "2020"),
+    "wrong nested type": _set("authorships.0.author.display_name", 5),
+    "none for required": _set("authorships", None),
+    "unknown literal": _set("type", "novel"),
+    "unexpected key": _set("unexpected", 1),
+    "unexpected nested key": _set("open_access.unexpected", 1),
+    "missing value": _delete_required,
+}
+
+
+@pytest.mark.parametrize("change", INVALID.values(), ids=INVALID.keys())
+def test_from_dict_errors_match_dacite(change):
+    work = _work()
+    change(work)
+    with pytest.raises(dacite.DaciteError) as expected:
+        _dacite(Work, work)
+    with pytest.raises(dacite.DaciteError) as error:
+        parsing.from_dict(Work, work, default_dacite_config)
+    assert type(error.value) is type(expected.value)
+    assert str(error.value) == str(expected.value)
+
+
+@pytest.mark.parametrize("entity_type", ENTITY_TYPES)
+def test_from_json_matches_dacite(entity_type):
+    data_class = ENDPOINTS[entity_type].entity
+    for result in _results(entity_type):
+        assert parsing.from_json(data_class, json.dumps(result)) == _dacite(
+            data_class, result
+        )
+
+
+# --------
+# lazy parsing
+# --------
+
+
+def _is_built(obj, name: str) -> bool:
+    # the slot of a field that was not read yet is empty
+    try:
+        Work.__dict__[name].__get__(obj, type(obj))
+    except AttributeError:
+        return False
+    return True
+
+
+def test_lazy_matches_eager():
+    for result in _results("works"):
+        lazy = parsing.lazy_from_dict(Work, result, default_dacite_config)
+        assert isinstance(lazy, Work)
+        assert lazy == _dacite(Work, result)
+
+
+def test_lazy_builds_fields_on_first_access():
+    work = _work()
+    lazy = Work.from_dict(work, lazy=True)
+    assert not _is_built(lazy, "authorships")
+    authorships = lazy.authorships
+    assert _is_built(lazy, "authorships")
+    assert not _is_built(lazy, "locations")
+    assert lazy.authorships is authorships
+    assert lazy.authorships == _dacite(Work, work).authorships
+
+
+def test_lazy_reports_errors_on_access():
+    work = _work()
+    work["publication_year"] = "2020"
+    with pytest.raises(dacite.WrongTypeError) as expected:
+        _dacite(Work, work)
+    lazy = Work.from_dict(work, lazy=True)
+    assert lazy.id == work["id"]
+    with pytest.raises(dacite.WrongTypeError) as error:
+        _ = lazy.publication_year
+    assert str(error.value) == str(expected.value)
+
+
+def test_lazy_reports_unexpected_keys_right_away():
+    work = _work()
+    work["unexpected"] = 1
+    with pytest.raises(dacite.UnexpectedDataError):
+        Work.from_dict(work, lazy=True)
+
+
+# --------
+# identity map
+# --------
+
+
+def _copies() -> tuple[dict, dict]:
+    # two works by the same author
+    first = _work()
+    second = copy.deepcopy(first)
+    second["id"] = "https://openalex.org/W1"
+    return first, second
+
+
+def test_identity_map_shares_known_entities():
+    first, second = _copies()
+    with IdentityMap().active():
+        works = [Work.from_dict(first), Work.from_dict(second)]
+    assert works[1].authorships[0].author is works[0].authorships[0].author
+
+
+KNOWN_INVALID = {
+    "unexpected key": _set("authorships.0.author.unexpected", 1),
+    "wrong type": _set("authorships.0.author.orcid", 5),
+}
+
+
+@pytest.mark.parametrize("change", KNOWN_INVALID.values(), ids=KNOWN_INVALID.keys())
+def test_identity_map_validates_known_entities(change):
+    first, second = _copies()
+    change(second)
+    with pytest.raises(dacite.DaciteError) as expected:
+        _dacite(Work, second)
+    with IdentityMap().active():
+        Work.from_dict(first)
+        with pytest.raises(dacite.DaciteError) as error:
+            Work.from_dict(second)
+    assert type(error.value) is type(expected.value)
+    assert str(error.value) == str(expected.value)
+
+
+# --------
+# string interning
+# --------
+
+
+def _interned_records() -> dict[str, list[dict]]:
+    # results of every type with a value in each interned field, also in those that are null in the fixtures
+    records = {entity_type: _results(entity_type, 5) for entity_type in ENTITY_TYPES}
+    institution = next(
+        institution
+        for work in records["works"]
+        for authorship in work["authorships"]
+        for institution in authorship["institutions"]
+    )
+    for work in records["works"]:
+        work["license"] = "cc-by"
+        work["apc_list"] = {
+            "value": 1500,
+            "currency": "EUR",
+            "value_usd": 1700,
+            "provenance": "doaj",
+        }
+        for location in work["locations"]:
+            if location["source"]:
+                location["source"]["raw_type"] = "journal-article"
+    for source in records["sources"]:
+        source["country_code"] = "NL"
+        source["apc_prices"] = [{"price": 1500, "currency": "EUR"}]
+    for related in records["institutions"]:
+        related["associated_institutions"] = [
+            {**institution, "country_code": "NL", "relationship": "parent"}
+        ]
+    for publisher in records["publishers"]:
+        publisher["country_codes"] = ["NL", "US"]
+    return records
+
+
+def _interned_values(entity, found: dict[tuple[str, str], list[str]]) -> None:
+    # collect the strings in the interned fields of `entity` and its nested dataclasses, by class and field
+    if isinstance(entity, list):
+        for item in entity:
+            _interned_values(item, found)
+        return
+    if not dataclasses.is_dataclass(entity):
+        return
+    for name in getattr(entity, "interned_fields", ()):
+        value = getattr(entity, name)
+        strings = value if isinstance(value, list) else [value]
+        found.setdefault((type(entity).__name__, name), []).extend(
+            string for string in strings if string is not None
+        )
+    for field in dataclasses.fields(entity):
+        _interned_values(getattr(entity, field.name), found)
+
+
+PARSERS = {
+    "from_dict": lambda data_class, record: parsing.from_dict(
+        data_class, record, default_dacite_config
+    ),
+    "from_json": lambda data_class, record: parsing.from_json(
+        data_class, json.dumps(record)
+    ),
+}
+
+
+@pytest.mark.parametrize("parse", PARSERS.values(), ids=PARSERS.keys())
+def test_interned_fields_share_their_strings(parse):
+    found: dict[tuple[str, str], list[str]] = {}
+    for entity_type, records in _interned_records().items():
+        data_class = ENDPOINTS[entity_type].entity
+        # each record is decoded on its own, so equal values start out as separate objects
+        for record in records:
+            _interned_values(parse(data_class, json.loads(json.dumps(record))), found)
+    interned = {
+        (data_class.__name__, name)
+        for data_class in vars(entities).values()
+        if isinstance(data_class, type) and dataclasses.is_dataclass(data_class)
+        for name in getattr(data_class, "interned_fields", ())
+    }
+    assert {field for field, values in found.items() if values} == interned
+    for values in found.values():
+        assert all(value is parsing.interned_strings[value] for value in values)
+
+
+def test_full_intern_table_is_reported_once(monkeypatch):
+    messages: list[str] = []
+    sink = logger.add(messages.append, level="WARNING")
+    monkeypatch.setattr(
+        parsing, "MAX_INTERNED_STRINGS", len(parsing.interned_strings) + 1
+    )
+    try:
+        assert parsing.interned_strings["first new value"] == "first new value"
+        assert parsing.interned_strings["second new value"] == "second new value"
+        assert parsing.interned_strings["third new value"] == "third new value"
+    finally:
+        logger.remove(sink)
+        parsing.interned_strings.pop("first new value")
+    assert "second new value" not in parsing.interned_strings
+    assert len(messages) == 1
+    assert "interned_strings is full" in messages[0]
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from aletheca.api import AsyncClient, RateLimiter
+from aletheca.endpoints import WORKS
+
+
+def test_rate_limiter_spaces_out_tokens():
+    limiter = RateLimiter(rate=10)
+    delays = [limiter.reserve() for _ in range(4)]
+    assert delays[0] == 0
+    assert delays[1:] == pytest.approx([0.1, 0.2, 0.3], abs=0.01)
+
+
+def test_rate_limiter_burst_after_idle():
+    limiter = RateLimiter(rate=100, burst=3)
+    time.sleep(0.05)
+    assert [limiter.reserve() for _ in range(3)] == [0, 0, 0]
+    assert limiter.reserve() > 0
+
+
+def test_rate_limiter_pause():
+    limiter = RateLimiter(rate=10)
+    limiter.pause(0.5)
+    assert limiter.reserve() == pytest.approx(0.5, abs=0.01)
+    # after the pause, callers resume one by one at the normal rate
+    assert limiter.reserve() == pytest.approx(0.6, abs=0.01)
+
+
+def test_unlimited_rate():
+    limiter = RateLimiter(rate=0)
+    limiter.pause(10)
+    assert [limiter.reserve() for _ in range(5)] == [0] * 5
+
+
+def test_async_client_paces_concurrent_requests(config):
+    config.rate_limit = 20
+
+    async def fetch():
+        async with AsyncClient(config) as client:
+            started = time.monotonic()
+            await asyncio.gather(*(client.get(WORKS, f"W{n}") for n in range(1, 11)))
+            return time.monotonic() - started
+
+    # the first request goes right away, the other nine at 1/20 s intervals
+    assert asyncio.run(fetch()) >= 0.44
+
+
+def test_clients_share_a_rate_limiter(config):
+    limiter = RateLimiter(rate=20)
+
+    async def fetch():
+        async with (
+            AsyncClient(config, rate_limiter=limiter) as first,
+            AsyncClient(config, rate_limiter=limiter) as second,
+        ):
+            started = time.monotonic()
+            await asyncio.gather(
+                *(
+                    client.get(WORKS, f"W{n}")
+                    for n in range(1, 6)
+                    for client in (first, second)
+                )
+            )
+            return time.monotonic() - started
+
+    assert asyncio.run(fetch()) >= 0.44
@@ -0,0 +1,142 @@
+import time
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from aletheca.api import Backoff, CircuitBreaker, Client, RateLimiter, retry_after
+from aletheca.config import BaseAlethecaConfig
+from aletheca.metrics import MetricsCollector
+
+# --------
+# backoff and Retry-After
+# --------
+
+
+def test_backoff_delays():
+    backoff = Backoff(retries=50, base=0.1, cap=2.0)
+    delays = [backoff.next() for _ in range(50)]
+    assert all(0.1 <= delay <= 2.0 for delay in delays)
+    assert max(delays) > 0.3
+    assert backoff.next() is None
+
+
+def _response(**headers: str) -> httpx.Response:
+    return httpx.Response(429, headers=headers)
+
+
+def test_retry_after():
+    assert retry_after(_response()) is None
+    assert retry_after(_response(**{"Retry-After": "2.5"})) == 2.5
+    assert retry_after(_response(**{"Retry-After": "-1"})) == 0
+    assert retry_after(_response(**{"Retry-After": "soon"})) is None
+    moment = datetime.now(UTC) + timedelta(seconds=30)
+    date = format_datetime(moment, usegmt=True)
+    assert retry_after(_response(**{"Retry-After": date})) == pytest.approx(30, abs=2)
+
+
+# --------
+# circuit breaker
+# --------
+
+
+def test_circuit_breaker_opens_and_closes():
+    breaker = CircuitBreaker(window=4, threshold=0.5, cooldown=0.05)
+    assert [breaker.record(outcome) for outcome in (True, False, True)] == [0, 0, 0]
+    assert breaker.record(False) == 0.05
+    assert breaker.is_open
+    # outcomes of requests that were sent before the circuit opened
+    assert breaker.record(False) == 0
+    time.sleep(0.06)
+    assert not breaker.is_open
+    assert breaker.record(True) == 0
+    assert breaker.cooldown == 0.05
+
+
+def test_circuit_breaker_doubles_its_cooldown():
+    breaker = CircuitBreaker(window=2, threshold=1, cooldown=0.02, max_cooldown=0.05)
+    breaker.record(False)
+    assert breaker.record(False) == 0.02
+    time.sleep(0.03)
+    assert breaker.record(False) == 0.04
+    time.sleep(0.05)
+    assert breaker.record(False) == 0.05
+
+
+# --------
+# retries of the client
+# --------
+
+
+def _client(responses: list[httpx.Response], **settings) -> tuple[Client, list]:
+    # a client whose requests get `responses` in order
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((time.monotonic(), request))
+        return responses[min(len(requests), len(responses)) - 1]
+
+    settings = {"rate_limit": 0, "backoff_factor": 0.01, **settings}
+    config = BaseAlethecaConfig(api_base_url="https://api.test", **settings)
+    http = httpx.Client(
+        base_url=config.api_base_url, transport=httpx.MockTransport(handler)
+    )
+    return Client(config, http_client=http), requests
+
+
+OK = httpx.Response(200, json={"id": "https://openalex.org/W1"})
+
+
+@pytest.mark.parametrize("rate_limit", [0, 1000])
+def test_retry_after_header_is_honoured(rate_limit):
+    client, requests = _client(
+        [httpx.Response(429, headers={"Retry-After": "0.3"}), OK],
+        rate_limit=rate_limit,
+    )
+    metrics = MetricsCollector()
+    client.hooks.append(metrics)
+    assert client.request("/works/W1").status_code == 200
+    assert len(requests) == 2
+    assert requests[1][0] - requests[0][0] >= 0.29
+    assert metrics.totals["retries"] == 1
+
+
+def test_retry_after_beyond_max_backoff_raises():
+    client, requests = _client(
+        [httpx.Response(429, headers={"Retry-After": "120"}), OK], max_backoff=60
+    )
+    with pytest.raises(httpx.HTTPStatusError):
+        client.request("/works/W1")
+    assert len(requests) == 1
+
+
+def test_server_errors_are_retried_with_backoff():
+    client, requests = _client([httpx.Response(503), httpx.Response(502), OK])
+    assert client.request("/works/W1").status_code == 200
+    assert len(requests) == 3
+
+
+def test_retries_run_out():
+    client, requests = _client([httpx.Response(500)], max_retries=2)
+    with pytest.raises(httpx.HTTPStatusError):
+        client.request("/works/W1")
+    assert len(requests) == 3
+
+
+def test_client_errors_are_not_retried():
+    client, requests = _client([httpx.Response(404), OK])
+    with pytest.raises(httpx.HTTPStatusError):
+        client.request("/works/W1")
+    assert len(requests) == 1
+
+
+def test_open_circuit_pauses_the_rate_limiter():
+    breaker = CircuitBreaker(window=2, threshold=1, cooldown=0.3)
+    client, requests = _client(
+        [httpx.Response(503), httpx.Response(503), OK], max_retries=3
+    )
+    client.circuit_breaker = breaker
+    client.rate_limiter = RateLimiter(rate=1000)
+    assert client.request("/works/W1").status_code == 200
+    assert requests[2][0] - requests[1][0] >= 0.29
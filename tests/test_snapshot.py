@@ -0,0 +1,83 @@
+import gzip
+import shutil
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from aletheca import snapshot
+
+SNAPSHOT = Path(__file__).parent / "fixtures" / "snapshot"
+
+
+def test_snapshot_files_in_snapshot_order():
+    files = snapshot.snapshot_files(SNAPSHOT)
+    assert [(path.parent.name, path.name) for path in files] == [
+        ("updated_date=2024-01-01", "part_000.gz"),
+        ("updated_date=2024-01-01", "part_001.gz"),
+        ("updated_date=2024-02-15", "part_000.gz"),
+    ]
+    assert len(snapshot.snapshot_files(SNAPSHOT, updated_since="2024-02-01")) == 1
+    with pytest.raises(FileNotFoundError):
+        snapshot.snapshot_files(SNAPSHOT, "authors")
+
+
+@pytest.fixture(scope="module")
+def works():
+    return list(snapshot.read_snapshot(SNAPSHOT, processes=0))
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return pl.concat(snapshot.read_snapshot_frames(SNAPSHOT, processes=0))
+
+
+def test_read_snapshot(works):
+    assert len(works) == 12
+    assert len({work.id for work in works}) == 12
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_read_snapshot_in_processes(works, ordered):
+    parallel = list(
+        snapshot.read_snapshot(SNAPSHOT, processes=2, ordered=ordered, batch_bytes=1)
+    )
+    if not ordered:
+        parallel.sort(key=lambda work: [work.id for work in works].index(work.id))
+    assert parallel == works
+
+
+def test_frames_match_entities(works, frame):
+    assert frame["id"].to_list() == [work.id for work in works]
+    assert frame["publication_year"].to_list() == [
+        work.publication_year for work in works
+    ]
+    assert frame["type"].to_list() == [work.type for work in works]
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_read_snapshot_frames_in_processes(frame, ordered):
+    parallel = pl.concat(
+        snapshot.read_snapshot_frames(SNAPSHOT, processes=2, ordered=ordered)
+    )
+    if not ordered:
+        parallel = parallel.sort("id")
+        frame = frame.sort("id")
+    assert parallel.equals(frame)
+
+
+def test_processes_after_polars_in_parent(frame):
+    # forked workers deadlocked once polars had started its thread pool in the calling process
+    pl.DataFrame({"x": range(100_000)}).select(pl.col("x").sum())
+    parallel = pl.concat(snapshot.read_snapshot_frames(SNAPSHOT, processes=3))
+    assert parallel.equals(frame)
+
+
+def test_failed_part_file_names_the_file(tmp_path):
+    root = tmp_path / "snapshot"
+    shutil.copytree(SNAPSHOT, root)
+    broken = root / "data" / "works" / "updated_date=2024-02-15" / "part_001.gz"
+    with gzip.open(broken, "wb") as file:
+        file.write(b'{"id": \n')
+    with pytest.raises(RuntimeError, match="part_001.gz"):
+        list(snapshot.read_snapshot(root, processes=2))